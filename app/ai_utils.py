@@ -1,35 +1,102 @@
 # app/ai_utils.py
 
+import json
 import os
+import re
+import threading
 import time
-from google import genai
-from google.genai import types
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from app import metrics
+from app.summary_cache import get_cache
+from app.rate_limiter import (
+    GEMINI_MAX_RETRIES,
+    PERMANENT,
+    backoff_delay,
+    classify_error,
+    estimate_tokens,
+    get_rate_limiter,
+)
 
 load_dotenv()
 
 api_key = os.getenv("GEMINI_API_KEY")
+# google.genai는 import만 2초 가까이 걸리므로 첫 AI 호출 때 get_client()에서 생성
+# (테스트/벤치마크는 ai_utils.client에 대역 객체를 직접 넣어도 됨)
 client = None
+_client_lock = threading.Lock()
 
-if api_key:
-    client = genai.Client(api_key=api_key)
+# JSON 배열만 받도록 강제하는 설정. types.GenerateContentConfig 대신 dict로 넘겨 google.genai.types import를 피함
+JSON_RESPONSE_CONFIG = {"response_mime_type": "application/json"}
 
-def generate_with_retry(prompt, model_name="gemini-flash-latest", retries=3):
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-flash-latest")
+
+# 한 번의 generate_content 호출에 묶어 보낼 기사 수 (배치 요약)
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", 8))
+
+# 요약 프롬프트(작성 규칙)를 바꾸면 버전을 올릴 것 → 이전 프롬프트로 만든 캐시는 자동으로 무시됨
+SUMMARY_PROMPT_VERSION = "summary:v1"
+
+# 인사이트: 기사 수가 INSIGHT_MAP_REDUCE_THRESHOLD를 넘으면 주제 그룹별 요약(map) → 종합(reduce) 방식
+# INSIGHT_WORKERS : 그룹 요약을 동시에 요청할 개수 (호출 속도는 공용 RateLimiter가 제한)
+INSIGHT_MAP_REDUCE_THRESHOLD = int(os.getenv("INSIGHT_MAP_REDUCE_THRESHOLD", 40))
+INSIGHT_WORKERS = int(os.getenv("INSIGHT_WORKERS", 4))
+# 그룹 요약/종합 프롬프트를 바꾸면 버전을 올릴 것 (캐시 무효화)
+INSIGHT_PROMPT_VERSION = "insight:v1"
+
+SHORT_TEXT_MESSAGE = "본문 내용이 너무 짧아 요약할 수 없습니다."
+
+# generate_with_retry가 실패 시 돌려주는 문구들. 캐시에 저장하면 안 되는 결과 판별용
+FAILURE_PREFIXES = ("API Key 누락", "에러 발생:", "요약 실패")
+
+def is_failed_result(text):
+    return not text or text.startswith(FAILURE_PREFIXES)
+
+def _summary_cache_key(full_text):
+    return get_cache().make_key(full_text, SUMMARY_PROMPT_VERSION, MODEL_NAME)
+
+def get_client():
+    """
+    Gemini 클라이언트 (최초 호출 시 google.genai import + 생성). API 키가 없으면 None
+    """
+    global client
+    if client is None and api_key:
+        with _client_lock:
+            if client is None:
+                from google import genai
+                client = genai.Client(api_key=api_key)
+    return client
+
+def generate_with_retry(prompt, model_name=MODEL_NAME, retries=GEMINI_MAX_RETRIES, config=None):
     """
-    [유틸리티] 429(Too Many Requests) 에러 발생 시 대기 후 재시도하는 함수
+    [유틸리티] 공용 RateLimiter(RPM/TPM)로 호출 속도를 맞추고, 일시적 오류만 backoff 후 재시도하는 함수
+    config: GenerateContentConfig 또는 같은 키의 dict (JSON 응답 강제 등). 없으면 기본 설정
     """
+    client = get_client()
     if not client:
         return "API Key 누락"
-    
-    time.sleep(2)
+
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(prompt)
 
     for attempt in range(retries):
+        # 고정 sleep 대신 할당량 여유가 생길 때까지만 대기
+        with metrics.timer("llm_wait"):
+            limiter.acquire(estimated_tokens)
+        metrics.inc("llm_requests_total")
         try:
             # API 호출
-            response = client.models.generate_content(
-                model=model_name,
-                contents=prompt
-            )
+            with metrics.timer("llm_request"):
+                response = client.models.generate_content(
+                    model=model_name,
+                    contents=prompt,
+                    config=config
+                )
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None:
+                limiter.settle(estimated_tokens, getattr(usage, "total_token_count", None))
+                metrics.inc("llm_tokens_total", getattr(usage, "total_token_count", None) or 0)
+
             # [수정 2] 경고 제거를 위한 안전한 텍스트 추출 로직
             # response.text 대신 parts를 직접 확인하여 텍스트만 합칩니다.
             extracted_text = ""
@@ -46,25 +113,39 @@ def generate_with_retry(prompt, model_name="gemini-flash-latest", retries=3):
             return extracted_text.strip()
             
         except Exception as e:
-            error_msg = str(e)
+            kind, status, retry_after = classify_error(e)
+            metrics.inc("llm_errors_total", kind=kind)
+            if status == 429:
+                metrics.inc("llm_rate_limited_total")
             print(f"\n[ 에러 분석] 시도 {attempt+1}/{retries}")
             print(f" - 모델: {model_name}")
-            print(f" - 메시지: {error_msg}")
-            
-            # 429 에러(Resource Exhausted)가 뜨면 대기
-            if "429" in error_msg or "429" in str(e):
-                print(" -> 구글 서버 과부하 또는 할당량 초과. 60초 대기합니다.")
-                time.sleep(60) # 확실하게 1분 쉽니다.
-            else:
-                # 429가 아닌 다른 에러면 바로 중단 (불필요한 재시도 방지)
+            print(f" - 분류: {kind} (status={status})")
+            print(f" - 메시지: {e}")
+
+            if kind == PERMANENT:
+                # 요청 자체가 잘못된 경우(400/401/403 등)는 재시도해도 소용 없으므로 바로 중단
                 return f"에러 발생: {e}"
+
+            if attempt == retries - 1:
+                break
+
+            # 서버가 알려준 대기 시간이 있으면 그대로 따르고, 없으면 지수 backoff + jitter
+            delay = retry_after if retry_after is not None else backoff_delay(attempt)
+            metrics.inc("llm_retries_total")
+            if status == 429:
+                # 할당량 초과는 다른 스레드도 같이 멈춰야 의미가 있으므로 limiter 전체를 멈춤
+                print(f" -> 할당량 초과. {delay:.1f}초 동안 전체 호출 일시 정지")
+                limiter.pause(delay)
+            else:
+                print(f" -> 일시적 오류. {delay:.1f}초 후 재시도")
+                time.sleep(delay)
     
     return "요약 실패 (재시도 초과)"
 
-def generate_3_line_summary(full_text):
-    if not full_text or len(full_text) < 50:
-        return "본문 내용이 너무 짧아 요약할 수 없습니다."
-
+def _request_3_line_summary(full_text):
+    """
+    단건 요약 AI 호출 (캐시 미사용)
+    """
     prompt = f"""
     너는 뉴스레터 에디터야. 아래 뉴스 기사 본문을 읽고, 바쁜 현대인을 위해 핵심 내용만 딱 3줄로 요약해줘.
     [작성 규칙]
@@ -77,7 +158,116 @@ def generate_3_line_summary(full_text):
     """
     
     # 여기서 위에서 만든 재시도 함수를 호출합니다.
-    return generate_with_retry(prompt)
+    summary = generate_with_retry(prompt)
+    if not is_failed_result(summary):
+        get_cache().set(_summary_cache_key(full_text), summary)
+    return summary
+
+def generate_3_line_summary(full_text):
+    if not full_text or len(full_text) < 50:
+        return SHORT_TEXT_MESSAGE
+
+    # 같은 본문을 이미 요약한 적이 있으면 AI 호출 없이 캐시에서 반환
+    cached = get_cache().get(_summary_cache_key(full_text))
+    if cached is not None:
+        return cached
+
+    return _request_3_line_summary(full_text)
+
+def _parse_batch_response(raw_text):
+    """
+    배치 요약 응답(JSON 배열)을 {id: summary} 딕셔너리로 변환.
+    코드블록(```json ... ```)으로 감싸서 오는 경우도 처리. 파싱 불가 시 빈 딕셔너리
+    """
+    if not raw_text:
+        return {}
+
+    cleaned = re.sub(r"^```(?:json)?\s*|\s*```$", "", raw_text.strip())
+    try:
+        items = json.loads(cleaned)
+    except ValueError:
+        return {}
+
+    if not isinstance(items, list):
+        return {}
+
+    parsed = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get("id")
+        summary = item.get("summary")
+        # summary가 줄 목록으로 오는 경우도 허용
+        if isinstance(summary, list):
+            summary = "\n".join(str(line).strip() for line in summary if str(line).strip())
+        if isinstance(item_id, int) and isinstance(summary, str) and summary.strip():
+            parsed[item_id] = summary.strip()
+    return parsed
+
+def generate_batch_summaries(full_texts):
+    """
+    여러 기사 본문을 하나의 프롬프트로 묶어 한 번의 호출로 3줄 요약.
+    응답에서 빠졌거나 파싱에 실패한 기사는 generate_3_line_summary로 개별 재요청.
+
+    Args:
+        full_texts: 기사 본문 리스트
+
+    Returns:
+        입력 순서와 같은 순서의 요약 리스트
+    """
+    summaries = [None] * len(full_texts)
+
+    # 너무 짧은 본문과 캐시에 있는 본문은 AI 호출 없이 바로 처리
+    cache = get_cache()
+    targets = []
+    cache_hits = 0
+    for index, text in enumerate(full_texts):
+        if not text or len(text) < 50:
+            summaries[index] = SHORT_TEXT_MESSAGE
+            continue
+        cached = cache.get(_summary_cache_key(text))
+        if cached is not None:
+            summaries[index] = cached
+            cache_hits += 1
+        else:
+            targets.append(index)
+    metrics.inc("summary_cache_hits_total", cache_hits)
+    metrics.inc("articles_summarized_total", len(targets))
+
+    if len(targets) > 1:
+        articles_text = "\n\n".join(
+            f"[기사 {index}]\n{full_texts[index][:1000]}" for index in targets
+        )
+        prompt = f"""
+    너는 뉴스레터 에디터야. 아래 여러 개의 뉴스 기사 본문을 각각 읽고, 기사마다 핵심 내용만 딱 3줄로 요약해줘.
+    [작성 규칙]
+    1. 한국어로 작성.
+    2. 명사형 종결어미("~함") 사용.
+    3. 각 줄의 시작은 적절한 이모지로 시작할 것.
+    4. [중요] 각 문장은 반드시 줄바꿈(\\n)으로 구분할 것.
+    5. [중요] 아래 형식의 JSON 배열만 출력할 것. id는 [기사 N]의 N 숫자 그대로 사용.
+       [{{"id": 0, "summary": "첫째 줄\\n둘째 줄\\n셋째 줄"}}]
+    [기사 목록]
+    {articles_text}
+    """
+        raw = generate_with_retry(
+            prompt,
+            config=JSON_RESPONSE_CONFIG
+        )
+        parsed = _parse_batch_response(raw)
+        for index in targets:
+            if index in parsed:
+                summaries[index] = parsed[index]
+                cache.set(_summary_cache_key(full_texts[index]), parsed[index])
+
+    # 배치에서 누락된 기사(또는 단건)는 개별 요약으로 보완
+    missing = [index for index in targets if summaries[index] is None]
+    if missing and len(targets) > 1:
+        print(f"  -> 배치 응답에서 {len(missing)}건 누락, 개별 요약으로 재시도")
+    for index in missing:
+        summaries[index] = _request_3_line_summary(full_texts[index])
+
+    return summaries
 
 def generate_daily_insight(article_titles):
     if not article_titles:
@@ -95,4 +285,77 @@ def generate_daily_insight(article_titles):
     {titles_text}
     """
 
-    return generate_with_retry(prompt)
\ No newline at end of file
+    return generate_with_retry(prompt)
+
+
+def _generate_cached(prompt, namespace):
+    """
+    프롬프트 전체를 키로 SummaryCache를 조회하고, 없을 때만 AI 호출 (실패 결과는 저장하지 않음)
+    """
+    cache = get_cache()
+    key = cache.make_key(prompt, namespace, MODEL_NAME)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = generate_with_retry(prompt)
+    if not is_failed_result(result):
+        cache.set(key, result)
+    return result
+
+def generate_group_summary(articles):
+    """
+    [map] 주제가 비슷한 기사 묶음 → 3~4줄 흐름 요약.
+    같은 기사 묶음이면 캐시에서 반환 (하루 중 재실행 시 새 기사가 들어간 그룹만 다시 요청)
+
+    Args:
+        articles: [(제목, 요약), ...]
+    """
+    lines = []
+    for title, summary in articles:
+        summary_text = " ".join(line.strip() for line in (summary or "").split("\n") if line.strip())
+        lines.append(f"- {title} :: {summary_text[:200]}")
+    articles_text = "\n".join(lines)
+
+    prompt = f"""
+    너는 산업 애널리스트야. 아래는 같은 주제로 묶인 오늘 기사들의 제목과 요약이야.
+    이 묶음의 공통 주제와 핵심 흐름을 3~4줄로 정리해줘. 한국어, 명사형 종결어미("~함") 사용.
+    [기사 목록]
+    {articles_text}
+    """
+    return _generate_cached(prompt, f"{INSIGHT_PROMPT_VERSION}:group")
+
+def generate_map_reduce_insight(groups, workers=INSIGHT_WORKERS):
+    """
+    [reduce] 그룹 요약들을 동시에 만든 뒤 하나의 '오늘의 인더스트리 브리핑'으로 종합.
+
+    Args:
+        groups: [[(제목, 요약), ...], ...] (app.topics.group_articles 결과)
+    """
+    if not groups:
+        return "분석할 기사가 충분하지 않습니다."
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        group_summaries = list(pool.map(generate_group_summary, groups))
+
+    sections = [
+        f"[주제 {index} · 기사 {len(group)}건]\n{summary}"
+        for index, (group, summary) in enumerate(zip(groups, group_summaries), 1)
+        if not is_failed_result(summary)
+    ]
+    if not sections:
+        return "요약 실패 (그룹 요약을 모두 만들지 못했습니다)"
+    print(f" 그룹 요약 {len(sections)}/{len(groups)}개로 종합 인사이트를 생성합니다.")
+
+    groups_text = "\n\n".join(sections)
+    prompt = f"""
+    너는 수석 애널리스트야. 아래는 오늘 기사들을 주제별로 묶어 정리한 내용이야.
+    기사 수가 많은 주제를 비중 있게 다뤄서 '오늘의 인더스트리 브리핑'을 10줄 내외로 작성해줘.
+    [형식]
+    🌤️ 오늘의 분위기:
+    🔍 주요 키워드:
+    💡 인사이트:
+    [주제별 정리]
+    {groups_text}
+    """
+    return _generate_cached(prompt, f"{INSIGHT_PROMPT_VERSION}:reduce")
@@ -0,0 +1,217 @@
+# app/api_cache.py
+'''
+API 서버용 메모리 캐시 (프로세스 안에서만 유지)
+
+- LRUCache : 최근에 쓴 값 위주로 max_entries개 / max_bytes까지 보관 (ttl을 주면 그 시간 뒤 만료)
+  같은 키를 여러 요청이 동시에 읽어도 DB 조회는 한 번만 (나머지는 첫 조회 결과를 기다림)
+- TTLCache : 자주 호출되지만 조금 늦어도 되는 값(구독자 수, 상태별 기사 수 등)을 ttl초 동안 재사용
+- CachedBody : 응답 본문 + 미리 압축한 gzip/brotli 본문 + strong ETag. 한 번 만들면 요청마다 다시 압축하지 않음
+'''
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
+
+# API_COUNT_CACHE_TTL : 건수 API 결과를 재사용할 시간(초). 0이면 캐시 안 함
+API_COUNT_CACHE_TTL = float(os.getenv("API_COUNT_CACHE_TTL", 5))
+
+# 응답 본문 캐시 (뉴스레터 아카이브 / 기사 목록)
+# API_RESPONSE_CACHE_ENTRIES : 보관할 최대 응답 수
+# API_RESPONSE_CACHE_MB : 보관할 본문(압축본 포함) 총 크기 상한
+# API_COMPRESS_MIN_BYTES : 이보다 작은 본문은 압축하지 않음 (헤더 비용이 더 큼)
+# API_GZIP_LEVEL / API_BROTLI_QUALITY : 본문당 한 번만 압축하므로 최고 압축률 기본
+API_RESPONSE_CACHE_ENTRIES = int(os.getenv("API_RESPONSE_CACHE_ENTRIES", 512))
+API_RESPONSE_CACHE_MB = int(os.getenv("API_RESPONSE_CACHE_MB", 64))
+API_COMPRESS_MIN_BYTES = int(os.getenv("API_COMPRESS_MIN_BYTES", 512))
+API_GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", 9))
+API_BROTLI_QUALITY = int(os.getenv("API_BROTLI_QUALITY", 11))
+
+# brotli는 선택 의존성 (pip install brotli). 없으면 gzip만 제공
+HAS_BROTLI = find_spec("brotli") is not None
+
+
+class LRUCache:
+    """
+    키별로 loader() 결과를 보관. 가득 차면 가장 오래 안 쓴 값부터 버림. 스레드 안전
+
+    Args:
+        ttl: 값 유지 시간(초). None이면 만료 없음, 0 이하면 캐시 안 함
+        max_bytes: 값 크기 합계 상한 (값에 size 속성이 있을 때만 계산)
+    """
+
+    def __init__(self, ttl=None, max_entries=256, max_bytes=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._values = OrderedDict()   # key -> (만료 시각 또는 None, 값)
+        self._key_locks = {}           # key -> 조회 중 잠금 (같은 키 동시 조회 방지)
+        self._lock = threading.Lock()
+
+    def _fresh(self, key, now):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] <= now:
+            self._remove(key)
+            return None
+        self._values.move_to_end(key)
+        return entry
+
+    def _remove(self, key):
+        _, value = self._values.pop(key)
+        self.total_bytes -= getattr(value, "size", 0)
+
+    def _store(self, key, value):
+        if key in self._values:
+            self._remove(key)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._values[key] = (expires, value)
+        self.total_bytes += getattr(value, "size", 0)
+        while self._values and (
+            len(self._values) > self.max_entries
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self._values) > 1)
+        ):
+            self._remove(next(iter(self._values)))
+
+    def get(self, key):
+        """
+        만료되지 않은 값 (없으면 None). loader를 기다리지 않으므로 이벤트 루프에서 바로 불러도 됨
+        """
+        with self._lock:
+            entry = self._fresh(key, time.monotonic())
+        return entry[1] if entry is not None else None
+
+    def get_or_load(self, key, loader):
+        """
+        만료되지 않은 값이 있으면 반환, 없으면 loader()로 읽어서 저장 후 반환
+        """
+        if self.ttl is not None and self.ttl <= 0:
+            return loader()
+        with self._lock:
+            entry = self._fresh(key, time.monotonic())
+            if entry is not None:
+                return entry[1]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        try:
+            with key_lock:
+                # 기다리는 동안 다른 요청이 이미 읽어 왔으면 그 값을 사용
+                with self._lock:
+                    entry = self._fresh(key, time.monotonic())
+                if entry is not None:
+                    return entry[1]
+                value = loader()
+                with self._lock:
+                    self._store(key, value)
+                return value
+        finally:
+            with self._lock:
+                if self._key_locks.get(key) is key_lock:
+                    del self._key_locks[key]
+
+    def invalidate(self, key=None):
+        """
+        key의 값(없으면 전체)을 버림. 작업이 끝나 내용이 바뀌었을 때 호출
+        """
+        with self._lock:
+            if key is None:
+                self._values.clear()
+                self.total_bytes = 0
+            elif key in self._values:
+                self._remove(key)
+
+
+class TTLCache(LRUCache):
+    """
+    ttl초 동안만 재사용하는 작은 캐시 (건수 API용)
+    """
+
+    def __init__(self, ttl=API_COUNT_CACHE_TTL, max_entries=256):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+
+
+def response_cache(ttl=None):
+    """
+    응답 본문(CachedBody)용 LRUCache (API_RESPONSE_CACHE_ENTRIES개 / API_RESPONSE_CACHE_MB)
+    """
+    return LRUCache(ttl=ttl, max_entries=API_RESPONSE_CACHE_ENTRIES, max_bytes=API_RESPONSE_CACHE_MB * 1024 * 1024)
+
+
+class CachedBody:
+    """
+    응답 본문 한 벌. 만들 때 gzip(+brotli)로 한 번 압축해 두고, 요청마다 Accept-Encoding에 맞는 것을 골라 씀
+
+    ETag는 원문 sha256 기반 strong ETag. 인코딩마다 바이트가 다르므로 "해시" / "해시-gzip" / "해시-br"로 구분
+    """
+
+    def __init__(self, body, media_type):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.media_type = media_type
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.encodings = {"identity": body}
+        if len(body) >= API_COMPRESS_MIN_BYTES:
+            self.encodings["gzip"] = gzip.compress(body, compresslevel=API_GZIP_LEVEL, mtime=0)
+            if HAS_BROTLI:
+                import brotli
+
+                self.encodings["br"] = brotli.compress(body, quality=API_BROTLI_QUALITY)
+        self.size = sum(len(data) for data in self.encodings.values())
+
+    def etag(self, encoding="identity"):
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.digest}{suffix}"'
+
+    def choose(self, accept_encoding):
+        """
+        Accept-Encoding에 맞는 인코딩 중 가장 작은 것 → (인코딩, 본문)
+        """
+        accepted = parse_accept_encoding(accept_encoding)
+        candidates = [
+            (len(data), encoding) for encoding, data in self.encodings.items()
+            if encoding == "identity" or accepted.get(encoding, accepted.get("*", 0)) > 0
+        ]
+        _, encoding = min(candidates)
+        return encoding, self.encodings[encoding]
+
+    def matches(self, if_none_match):
+        """
+        If-None-Match에 이 본문의 ETag(어느 인코딩이든)가 있으면 True → 304
+        """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        own = {self.etag(encoding) for encoding in self.encodings}
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]   # If-None-Match는 weak 비교
+            if tag in own:
+                return True
+        return False
+
+
+def parse_accept_encoding(header):
+    """
+    "gzip, br;q=0.8, *;q=0" → {"gzip": 1.0, "br": 0.8, "*": 0.0}
+    """
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+    return accepted
@@ -2,133 +2,269 @@
 FileName : crawler.py 
 #2025-12-26 : 정준영
 '''
-import requests # 웹페이지 접속 처리를 위한 request import
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from requests.exceptions import RequestException # RequestException 처리를 위한 선언
-from bs4 import BeautifulSoup # BeatifulSoup 모듈 import https://pypi.org/project/beautifulsoup4/ 참고
+from sqlalchemy import insert # 대량 INSERT용 Core insert
 from sqlalchemy.orm import Session # Python ORM 사용을 위한 sqlalchemy import
-from app import models
-from app.database import SessionLocal, engine
+from app import http_client, metrics # http_client: 커넥션 풀을 공유하는 공용 Session / metrics: 단계별 계측
+from app.database import SessionLocal
+from app.dedup import text_fingerprint
+from app.extractor import get_extractor # lxml + 리스트 컨테이너 부분 파싱, 호스트별 셀렉터 캐시
 from app.models import CrawledArticle
 
-def crawl_fashion_breaking_news():
+# IN (...) 조회 / INSERT 한 번에 넣을 최대 건수 (SQLite 바인딩 변수 개수 제한 대비)
+BULK_CHUNK_SIZE = 500
+
+# 크롤링할 섹션 목록 (쉼표로 구분). URL에 {page}를 넣으면 페이지를 넘기며 수집
+# 예) CRAWL_SECTIONS="https://news.naver.com/main/list.naver?mode=LS2D&sid1=103&sid2=376&page={page},..."
+# 크롤링할 url에 따라 extractor.LIST_SELECTORS / parse_news_item 셀렉터 수정 요망
+#url = "https://news.naver.com/breakingnews/section/103/376"
+CRAWL_SECTIONS = [
+    section.strip()
+    for section in os.getenv("CRAWL_SECTIONS", "크롤링할 url").split(",")
+    if section.strip()
+]
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 10))          # 섹션당 최대 페이지 수
+CRAWL_PAGE_WINDOW = int(os.getenv("CRAWL_PAGE_WINDOW", 2))       # 섹션 안에서 동시에 받을 페이지 수
+CRAWL_SECTION_CONCURRENCY = int(os.getenv("CRAWL_SECTION_CONCURRENCY", 4))  # 동시에 크롤링할 섹션 수
+
+
+def parse_news_item(item):
     """
-    Need: 하드코딩된 url에 접속하여 크롤링.
+    리스트 아이템(li.sa_item) 하나에서 저장할 값 추출.
+
+    Returns:
+        {"link", "title", "summary"} 딕셔너리. 링크/제목이 없으면 None
+    """
+    # 제목 및 링크 추출
+    title_tag = item.select_one(".sa_text_title")
+    if not title_tag:
+        title_tag = item.select_one("a[href*='/article/']")
+
+    if not title_tag:
+        return None
+
+    if title_tag.name == 'a':
+        link = title_tag['href']
+    else:
+        parent_a = title_tag.find_parent('a')
+        link = parent_a['href'] if parent_a else ""
+
+    title = title_tag.get_text(strip=True)
+
+    if link and link.startswith("/"):
+        link = f"https://news.naver.com{link}"
+
+    if not link:
+        return None
+
+    summary_tag = item.select_one(".sa_text_lede")
+    summary = summary_tag.get_text(strip=True) if summary_tag else ""
+
+    # source_tag는 모델에 저장할 곳이 없으므로 추출만 하고 저장은 안함
+    # source_tag = item.select_one(".sa_text_press")
+    # source = source_tag.get_text(strip=True) if source_tag else "Unknown"
+
+    return {"link": link, "title": title, "summary": summary}
+
+
+def find_existing_links(db, links):
+    """
+    이미 DB에 있는 링크 집합. 아이템마다 SELECT 하지 않고 IN 조회 한 번(청크 단위)으로 처리
+    """
+    existing = set()
+    links = list(links)
+    for start in range(0, len(links), BULK_CHUNK_SIZE):
+        chunk = links[start:start + BULK_CHUNK_SIZE]
+        rows = db.query(CrawledArticle.link).filter(CrawledArticle.link.in_(chunk)).all()
+        existing.update(link for (link,) in rows)
+    return existing
+
+
+class RunLinks:
+    """
+    이번 실행에서 저장한 링크 집합. 여러 섹션 스레드가 함께 쓰므로 락으로 보호
+    """
+
+    def __init__(self):
+        self._links = set()
+        self._lock = threading.Lock()
+
+    def add(self, links):
+        with self._lock:
+            self._links.update(links)
+
+    def has_unknown(self, links):
+        """
+        links 중 이번 실행에서 저장하지 않은(= 이전 실행에서 수집한) 링크가 있으면 True
+        """
+        with self._lock:
+            return any(link not in self._links for link in links)
+
+
+def save_new_articles(db, candidates):
+    """
+    후보 기사들 중 DB에 없는 것만 대량 INSERT. (commit은 호출 측에서)
 
     Args:
+        candidates: parse_news_item 결과 리스트
 
     Returns:
-        크롤링 요소들
+        실제로 INSERT된 기사 딕셔너리 리스트
+        (조회 후 다른 섹션/프로세스가 먼저 넣어 ON CONFLICT로 건너뛴 기사는 제외)
     """
+    # 같은 페이지 안의 중복 링크 제거 (먼저 나온 것 유지)
+    unique = {}
+    for candidate in candidates:
+        unique.setdefault(candidate["link"], candidate)
 
-    models.Base.metadata.create_all(bind=engine)
-    # model 파일에 정의된 table 정보를 바탕으로 engine에 연결된 DB 테이블 유/무에 따른 생성
-    # DB 테이블이 없으면 생성
+    existing = find_existing_links(db, unique.keys())
+    new_rows = [
+        {
+            "link": candidate["link"],      # original_url -> link
+            "title": candidate["title"],
+            "summary": candidate["summary"],
+            "content": "",                  # 현재 리스트에서는 본문이 없으므로 빈 문자열 처리
+            "status": "PENDING",
+            "simhash": text_fingerprint(candidate["title"], candidate["summary"]),  # 중복 기사 검사용 제목+리드 지문
+        }
+        for link, candidate in unique.items()
+        if link not in existing
+    ]
 
-    print("🚀 [패션/뷰티] 실시간 뉴스 크롤링 시작...")
+    if not new_rows:
+        return []
 
+    # 조회와 INSERT 사이에 다른 프로세스가 같은 링크를 넣었어도 unique 에러 없이 건너뜀
+    # ON CONFLICT DO NOTHING 지원 dialect는 사용하는 것만 import (postgresql 모듈은 로딩이 무거움)
+    # 건너뛴 행은 RETURNING에 나오지 않으므로 실제로 들어간 링크만 돌려받음
+    dialect_name = db.bind.dialect.name
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects import sqlite
+        stmt = sqlite.insert(CrawledArticle).on_conflict_do_nothing(index_elements=["link"])
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects import postgresql
+        stmt = postgresql.insert(CrawledArticle).on_conflict_do_nothing(index_elements=["link"])
+    else:
+        stmt = None
 
-    # 요청정보 디폴트 세팅
-    #url = "https://news.naver.com/breakingnews/section/103/376"
-    url = "크롤링할 url"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
-        "Accept-Language" : "ko-KR,ko;q=0.9,en;q=0.8",
-        "Referer": "https://news.naver.com/"
-    }
-    # User-Agent : **“이 요청을 보낸 클라이언트가 누구인지(브라우저/앱/봇 등)”**를 서버에 알려주는 문자열.
-    # Accept : 클라이언트가 어떤 MIME 타입을 받을 수 있는지 서버에 전달
+    inserted_links = set()
+    with metrics.timer("db_write"):
+        for start in range(0, len(new_rows), BULK_CHUNK_SIZE):
+            chunk = new_rows[start:start + BULK_CHUNK_SIZE]
+            if stmt is None:
+                # ON CONFLICT 미지원 dialect: 충돌 시 예외가 나므로 성공하면 모두 신규
+                db.execute(insert(CrawledArticle), chunk)
+                inserted_links.update(row["link"] for row in chunk)
+            else:
+                result = db.execute(stmt.returning(CrawledArticle.link), chunk)
+                inserted_links.update(result.scalars())
+    inserted = [row for row in new_rows if row["link"] in inserted_links]
+    metrics.inc("db_rows_written_total", len(inserted), table="crawled_articles")
+    return inserted
 
-    # request 실행
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except RequestException as exc:
-        print(f"❌ 요청 실패: {exc}")
-        return
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    
-    list_selectors = [
-        "ul.sa_list_news > li.sa_item",
-        "div.sa_list_news > ul > li.sa_item",
-        "div.sa_list > ul > li.sa_item",
-        "div.sa_list .sa_item",
-        "li.sa_item",
-        ".sa_item",
-    ]
 
-    matched_selector = None
-    news_items = []
-    for selector in list_selectors:
-        news_items = soup.select(selector)
-        if news_items:
-            matched_selector = selector
-            break
+def build_page_url(section_url, page):
+    """
+    섹션 URL에 {page} 자리표시자가 있으면 페이지 번호를 채움. 없으면 1페이지만 존재하는 것으로 간주
+    """
+    if "{page}" in section_url:
+        return section_url.format(page=page)
+    return section_url if page == 1 else None
 
-    print(f"🔎 매칭된 selector: {matched_selector} / items: {len(news_items)}")
 
-    if not news_items:
-        print(f"⚠️ 기사 리스트를 찾지 못했습니다. (HTML 길이: {len(response.text)})")
-        return
+def fetch_list_page(url):
+    """
+    리스트 페이지 1개 다운로드 + 파싱.
 
-    print(f"✅ 기사 아이템 {len(news_items)}개를 발견했습니다. DB 저장을 시작합니다...")
+    Returns:
+        parse_news_item 결과 리스트 (파싱 실패 아이템은 None으로 포함)
+    """
+    # 헤더(User-Agent/Accept 등)와 타임아웃은 http_client 공용 Session에 설정되어 있음
+    response = http_client.get(url)
+    response.raise_for_status()
 
-    db: Session = SessionLocal()
-    count = 0
+    with metrics.timer("parse_list"):
+        matched_selector, news_items = get_extractor().find_list_items(response.text, url)
+        parsed_items = [parse_news_item(item) for item in news_items]
+    print(f"🔎 {url} 매칭된 selector: {matched_selector} / items: {len(news_items)}")
+    return parsed_items
 
-    try:
-        for item in news_items:
-            # 제목 및 링크 추출
-            title_tag = item.select_one(".sa_text_title")
-            if not title_tag:
-                title_tag = item.select_one("a[href*='/article/']")
-            
-            if not title_tag:
-                continue
-
-            if title_tag.name == 'a':
-                link = title_tag['href']
-            else:
-                parent_a = title_tag.find_parent('a')
-                link = parent_a['href'] if parent_a else ""
 
-            title = title_tag.get_text(strip=True)
+def crawl_section(section_url, max_pages=CRAWL_MAX_PAGES, page_window=CRAWL_PAGE_WINDOW, run_links=None):
+    """
+    섹션 하나를 최신 페이지부터 넘기며 수집.
+    page_window개 페이지를 동시에 받아 순서대로 저장하고,
+    이미 DB에 있는 기사를 만나면 그 뒤 페이지는 이미 수집된 것으로 보고 중단 (증분 수집)
 
-            if link and link.startswith("/"):
-                link = f"https://news.naver.com{link}"
+    Args:
+        run_links: 이번 실행에서 (다른 섹션 포함) 저장한 링크(RunLinks).
+                   여러 섹션에 동시에 걸린 기사 때문에 일찍 멈추지 않도록 중단 판단에서 제외
 
-            if not link:
-                continue
+    Returns:
+        섹션별 통계 {"section", "pages", "new", "duplicate", "failed_pages", "failed_items"}
+        (failed_pages: 요청 실패한 페이지 수 / failed_items: 링크·제목을 못 찾은 아이템 수)
+    """
+    stats = {"section": section_url, "pages": 0, "new": 0, "duplicate": 0, "failed_pages": 0, "failed_items": 0}
+    seen_links = set()  # 페이지 범위를 넘으면 마지막 페이지를 반복해서 주는 사이트 대비
+    run_links = run_links if run_links is not None else RunLinks()
+    db: Session = SessionLocal()
 
-            summary_tag = item.select_one(".sa_text_lede")
-            summary = summary_tag.get_text(strip=True) if summary_tag else ""
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, page_window)) as pool:
+            page = 1
+            while page <= max_pages:
+                urls = [
+                    url for url in (
+                        build_page_url(section_url, number)
+                        for number in range(page, min(page + page_window, max_pages + 1))
+                    ) if url
+                ]
+                if not urls:
+                    break
 
-            # source_tag는 모델에 저장할 곳이 없으므로 추출만 하고 저장은 안함
-            # source_tag = item.select_one(".sa_text_press")
-            # source = source_tag.get_text(strip=True) if source_tag else "Unknown"
+                reached_known = False
+                # 페이지들은 동시에 받되, 결과는 최신 페이지부터 순서대로 처리
+                for url, future in [(url, pool.submit(fetch_list_page, url)) for url in urls]:
+                    try:
+                        parsed_items = future.result()
+                    except RequestException as exc:
+                        print(f"❌ 요청 실패: {exc}")
+                        stats["failed_pages"] += 1
+                        reached_known = True
+                        break
 
-            # 26일 수정 original_url -> link 로 변경
-            exists = db.query(CrawledArticle).filter(CrawledArticle.link == link).first()
-            if exists:
-                continue
+                    stats["pages"] += 1
+                    candidates = [item for item in parsed_items if item and item["link"] not in seen_links]
+                    stats["failed_items"] += sum(1 for item in parsed_items if item is None)
+                    if not candidates:
+                        # 빈 페이지 또는 이미 본 페이지 반복 → 마지막 페이지
+                        reached_known = True
+                        break
+                    seen_links.update(item["link"] for item in candidates)
 
-            # 26일 수정 모델에 있는 컬럼만 사용하여 ORM 처리
-            new_article = CrawledArticle(
-                link=link,          # original_url -> link
-                title=title,
-                summary=summary,
-                content="",         # 현재 리스트에서는 본문이 없으므로 빈 문자열 처리
-                status="PENDING"
-            )
+                    new_rows = save_new_articles(db, candidates)
+                    new_links = {row["link"] for row in new_rows}
+                    # commit 전에 등록: commit 직후 다른 섹션이 같은 링크를 중복으로 만나도
+                    # 이번 실행에서 넣은 기사로 알아보고 중단하지 않도록
+                    run_links.add(new_links)
+                    db.commit() # 페이지 단위 커밋
+                    for row in new_rows:
+                        print(f"  - 저장: {row['title'][:20]}...")
 
-            db.add(new_article)
-            count += 1
-            print(f"  - 저장: {title[:20]}...")
+                    duplicates = [item["link"] for item in candidates if item["link"] not in new_links]
+                    stats["new"] += len(new_rows)
+                    stats["duplicate"] += len(duplicates)
+                    if run_links.has_unknown(duplicates):
+                        # 이전 실행에서 수집한 기사에 도달 → 이후 페이지도 이미 수집됨
+                        reached_known = True
+                        break
 
-        db.commit() # 한번에 커밋
-        print(f"\n🎉 총 {count}개의 기사가 저장되었습니다.")
+                if reached_known:
+                    break
+                page += len(urls)
 
     except Exception as e:
         print(f"처리 중 에러 발생: {e} rollback 처리")
@@ -138,6 +274,41 @@ def crawl_fashion_breaking_news():
     finally:
         db.close()
 
+    return stats
+
+
+def crawl_fashion_breaking_news(sections=None, max_pages=CRAWL_MAX_PAGES):
+    """
+    Need: 설정된 섹션들을 동시에 크롤링. 섹션마다 여러 페이지를 넘기며 신규 기사만 저장.
+
+    Args:
+        sections: 섹션 URL 리스트. 없으면 CRAWL_SECTIONS 사용
+        max_pages: 섹션당 최대 페이지 수
+
+    Returns:
+        섹션별 통계 리스트
+    """
+    # DB 테이블은 실행마다 검사하지 않음 → 처음 한 번 python -m app.migrations 로 생성
+
+    sections = sections or CRAWL_SECTIONS
+    print(f"🚀 [패션/뷰티] 실시간 뉴스 크롤링 시작... (섹션 {len(sections)}개, 섹션당 최대 {max_pages}페이지)")
+
+    run_links = RunLinks()
+    with ThreadPoolExecutor(max_workers=max(1, min(len(sections), CRAWL_SECTION_CONCURRENCY))) as pool:
+        results = list(pool.map(
+            lambda section: crawl_section(section, max_pages, run_links=run_links), sections
+        ))
+
+    print("\n📊 섹션별 수집 결과")
+    for stats in results:
+        print(
+            f"  - {stats['section']} : 페이지 {stats['pages']} / 신규 {stats['new']} / "
+            f"중복 {stats['duplicate']} / 실패 페이지 {stats['failed_pages']} / 파싱 실패 {stats['failed_items']}"
+        )
+    total_new = sum(stats["new"] for stats in results)
+    print(f"\n🎉 총 {total_new}개의 기사가 저장되었습니다.")
+    return results
+
 if __name__ == "__main__":
     crawl_fashion_breaking_news() # 함수 호출
 
@@ -148,60 +319,45 @@ if __name__ == "__main__":
 #                  │
 #                  ▼
 # ┌──────────────────────────────────────────┐
-# │ 1) 테이블 생성 안전장치                   │
-# │    models.Base.metadata.create_all(...)   │
+# │ 1) (사전 1회) 테이블 생성                 │
+# │    python -m app.migrations               │
 # └──────────────────────────────────────────┘
 #                  │
 #                  ▼
 # ┌──────────────────────────────────────────┐
-# │ 2) 네이버 속보 URL / headers 준비         │
+# │ 2) 섹션별 crawl_section() 동시 실행        │
+# │    (CRAWL_SECTIONS / 스레드 풀)            │
 # └──────────────────────────────────────────┘
 #                  │
 #                  ▼
 # ┌──────────────────────────────────────────┐
-# │ 3) HTTP 요청                              │
-# │    response = requests.get(..., timeout)  │
-# │    response.raise_for_status()            │
+# │ 3) 페이지 묶음(page_window) 동시 요청      │
+# │    fetch_list_page(url)                   │
+# │      - http_client.get + raise_for_status │
+# │      - extractor.find_list_items          │
+# │        (lxml 부분 파싱 + 선택자 탐색)      │
+# │      - parse_news_item (제목/링크/요약)    │
 # └──────────────────────────────────────────┘
 #         │성공                         │실패(RequestException)
 #         ▼                             ▼
 # ┌───────────────────────────┐   ┌─────────────────────────┐
-# │ 4) BeautifulSoup 파싱       │   │ "요청 실패" 출력 후 return│
-# │    soup = BeautifulSoup(...)│   └─────────────────────────┘
+# │ 4) 최신 페이지부터 순서대로 │   │ failed_pages +1, 섹션 중단│
+# │    save_new_articles()      │   └─────────────────────────┘
+# │    - IN 조회 1회로 중복 제외 │
+# │    - 신규만 bulk INSERT     │
+# │    - 페이지 단위 commit      │
 # └───────────────────────────┘
 #         │
 #         ▼
 # ┌──────────────────────────────────────────┐
-# │ 5) 기사 리스트 선택자 탐색                │
-# │    for selector in list_selectors:        │
-# │        news_items = soup.select(selector) │
-# │        있으면 break                        │
-# └──────────────────────────────────────────┘
-#         │있음                         │없음
-#         ▼                             ▼
-# ┌───────────────────────────┐   ┌──────────────────────────┐
-# │ 6) DB 세션 생성             │   │ "기사 리스트 못 찾음" 출력│
-# │    db = SessionLocal()      │   │ 후 return                 │
-# └───────────────────────────┘   └──────────────────────────┘
-#         │
-#         ▼
-# ┌──────────────────────────────────────────┐
-# │ 7) 기사 아이템 루프                        │
-# │    for item in news_items:                │
-# │      - 제목/링크 추출                      │
-# │      - 링크 정규화                         │
-# │      - 요약 추출                           │
-# │      - 중복 체크(select)                   │
-# │      - 새 객체 생성 + db.add()             │
+# │ 5) 중단 조건 확인                          │
+# │    - 이미 DB에 있는 기사 도달 (증분 수집)  │
+# │    - 빈 페이지 / 반복 페이지               │
+# │    - max_pages 도달                        │
+# │    아니면 다음 페이지 묶음으로             │
 # └──────────────────────────────────────────┘
 #         │
 #         ▼
 # ┌──────────────────────────────────────────┐
-# │ 8) db.commit()                            │
-# │    "총 N개 저장" 출력                     │
+# │ 6) 섹션별 신규/중복/실패 건수 출력          │
 # └──────────────────────────────────────────┘
-#         │
-#         ▼
-# ┌──────────────────────────────────────────┐
-# │ 9) finally: db.close()                    │
-# └──────────────────────────────────────────┘
\ No newline at end of file
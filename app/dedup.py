@@ -0,0 +1,208 @@
+# app/dedup.py
+'''
+같은 사건을 여러 매체가 조금씩 다른 제목/리드로 낸 기사(near-duplicate) 묶기.
+
+- SimHash(64bit) : 정규화한 텍스트의 문자 3-gram을 해시해 만든 지문. 비슷한 글일수록 다른 비트 수(해밍 거리)가 작음
+- 밴드 인덱스 : 64bit를 (max_distance + 1)개 밴드로 나눠 밴드 값별 버킷에 저장
+  → 해밍 거리 max_distance 이하인 지문은 적어도 한 밴드가 완전히 같으므로(비둘기집 원리)
+    전체를 훑지 않고 같은 버킷의 후보만 비교 (sub-linear 조회)
+- 두 단계로 검사
+  1) 크롤링 때 받은 제목 + 리드(summary 컬럼) → 본문 다운로드 전에 중복이면 다운로드/요약 모두 생략
+  2) 추출한 본문 → 요약 전에 중복이면 요약 생략
+- 중복 기사는 status=DUPLICATE, canonical_id=대표 기사 id. 요약/뉴스레터에는 대표 기사만
+  이번 실행의 대표 기사가 끝내 APPROVED가 되지 못하면 그 중복 기사들은 실행 끝에 PENDING으로 되돌림
+  (app.work_queue.release_orphan_duplicates)
+'''
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+
+from app.models import CrawledArticle
+from app.summary_cache import normalize_text
+
+# DEDUP_ENABLED : 0이면 중복 검사 생략
+# DEDUP_MAX_DISTANCE : 이 해밍 거리(64bit 중 다른 비트 수) 이하면 같은 기사로 봄
+# DEDUP_MIN_CHARS : 이보다 짧은 텍스트는 지문이 불안정하므로 검사하지 않음
+# DEDUP_WINDOW_DAYS : 최근 며칠 동안의 대표 기사와 비교할지
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_MAX_DISTANCE = int(os.getenv("DEDUP_MAX_DISTANCE", 6))
+DEDUP_MIN_CHARS = int(os.getenv("DEDUP_MIN_CHARS", 20))
+DEDUP_WINDOW_DAYS = float(os.getenv("DEDUP_WINDOW_DAYS", 2))
+
+HASH_BITS = 64
+SHINGLE_SIZE = 3
+
+
+def simhash(text):
+    """
+    Returns:
+        64bit SimHash 정수. 텍스트가 DEDUP_MIN_CHARS보다 짧으면 None
+    """
+    text = normalize_text(text).lower().replace(" ", "")
+    if len(text) < DEDUP_MIN_CHARS:
+        return None
+
+    weights = [0] * HASH_BITS
+    shingles = {}
+    for start in range(len(text) - SHINGLE_SIZE + 1):
+        shingle = text[start:start + SHINGLE_SIZE]
+        shingles[shingle] = shingles.get(shingle, 0) + 1
+    for shingle, count in shingles.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(HASH_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def to_hex(fingerprint):
+    return None if fingerprint is None else f"{fingerprint:016x}"
+
+
+def from_hex(value):
+    return None if not value else int(value, 16)
+
+
+def text_fingerprint(title, lede=None):
+    """
+    제목 + 리드 지문 (DB 저장용 16자리 hex)
+    """
+    return to_hex(simhash(f"{title or ''} {lede or ''}"))
+
+
+class SimHashIndex:
+    """
+    해밍 거리 max_distance 이하 지문을 찾는 밴드 인덱스. 스레드 안전
+    """
+
+    def __init__(self, max_distance=DEDUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        self._band_bits = [HASH_BITS // bands + (1 if i < HASH_BITS % bands else 0) for i in range(bands)]
+        self._buckets = {}   # (밴드 번호, 밴드 값) -> [(id, 지문), ...]
+        self._lock = threading.Lock()
+
+    def _bands(self, fingerprint):
+        shift = 0
+        for index, bits in enumerate(self._band_bits):
+            yield index, (fingerprint >> shift) & ((1 << bits) - 1)
+            shift += bits
+
+    def _nearest(self, keys, fingerprint):
+        best_id, best_distance = None, self.max_distance + 1
+        for key in keys:
+            for item_id, other in self._buckets.get(key, ()):
+                distance = bin(fingerprint ^ other).count("1")
+                if distance < best_distance:
+                    best_id, best_distance = item_id, distance
+        return best_id
+
+    def _add(self, keys, item_id, fingerprint):
+        for key in keys:
+            self._buckets.setdefault(key, []).append((item_id, fingerprint))
+
+    def add(self, item_id, fingerprint):
+        with self._lock:
+            self._add(list(self._bands(fingerprint)), item_id, fingerprint)
+
+    def find(self, fingerprint):
+        """
+        Returns:
+            가장 가까운 항목 id (max_distance 이내가 없으면 None)
+        """
+        with self._lock:
+            return self._nearest(list(self._bands(fingerprint)), fingerprint)
+
+    def find_or_add(self, item_id, fingerprint):
+        """
+        비슷한 항목이 있으면 그 id, 없으면 이 항목을 대표로 등록하고 None (조회+등록을 한 번에)
+        """
+        keys = list(self._bands(fingerprint))
+        with self._lock:
+            best_id = self._nearest(keys, fingerprint)
+            if best_id is None:
+                self._add(keys, item_id, fingerprint)
+            return best_id
+
+
+class Deduplicator:
+    """
+    제목+리드 / 본문 두 개의 SimHashIndex. load()로 최근 대표 기사를 불러온 뒤
+    check_title() / check_body()로 새 기사가 중복인지 확인 (중복이 아니면 대표로 등록)
+    """
+
+    def __init__(self, max_distance=DEDUP_MAX_DISTANCE):
+        self.titles = SimHashIndex(max_distance)
+        self.bodies = SimHashIndex(max_distance)
+        self.duplicates = 0
+        # 제목 단계에서는 대표였지만 본문 단계에서 중복으로 판정된 기사 → 진짜 대표 기사 id
+        self._canonical_of = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, article_id, canonical_id):
+        with self._lock:
+            if canonical_id is None:
+                return None
+            canonical_id = self._canonical_of.get(canonical_id, canonical_id)
+            self._canonical_of[article_id] = canonical_id
+            self.duplicates += 1
+            return canonical_id
+
+    def load(self, db, window_days=DEDUP_WINDOW_DAYS):
+        """
+        최근 window_days일 동안 요약된 대표 기사들의 지문을 인덱스에 등록
+        """
+        since = datetime.now() - timedelta(days=window_days)
+        rows = db.query(
+            CrawledArticle.id, CrawledArticle.simhash, CrawledArticle.body_simhash
+        ).filter(
+            CrawledArticle.status == "APPROVED",
+            CrawledArticle.canonical_id.is_(None),
+            CrawledArticle.created_at >= since,
+        ).all()
+        for article_id, title_hash, body_hash in rows:
+            if title_hash:
+                self.titles.add(article_id, from_hex(title_hash))
+            if body_hash:
+                self.bodies.add(article_id, from_hex(body_hash))
+        return self
+
+    def check_title(self, article_id, title, lede=None, stored=None):
+        """
+        Args:
+            stored: 크롤링 때 저장한 제목+리드 지문(hex). 없으면 여기서 계산
+
+        Returns:
+            대표 기사 id (중복이 아니면 None)
+        """
+        fingerprint = from_hex(stored) if stored else simhash(f"{title or ''} {lede or ''}")
+        if fingerprint is None:
+            return None
+        return self._resolve(article_id, self.titles.find_or_add(article_id, fingerprint))
+
+    def check_body(self, article_id, text):
+        """
+        Returns:
+            (대표 기사 id 또는 None, 본문 지문 hex)
+        """
+        fingerprint = simhash(text)
+        if fingerprint is None:
+            return None, None
+        return self._resolve(article_id, self.bodies.find_or_add(article_id, fingerprint)), to_hex(fingerprint)
+
+
+def get_deduplicator(db):
+    """
+    이번 실행용 Deduplicator (DEDUP_ENABLED=0이면 None)
+    """
+    if not DEDUP_ENABLED:
+        return None
+    return Deduplicator().load(db)
@@ -0,0 +1,133 @@
+# app/extractor.py
+'''
+크롤러 리스트 페이지 / 기사 본문 HTML 추출 엔진.
+
+- 파서 선택 가능 (기본 lxml, 설치 안 되어 있으면 html.parser)
+- SoupStrainer 부분 파싱: 페이지 전체가 아니라 리스트 컨테이너 / 본문 컨테이너 하위 트리만 트리로 만듦
+- 리스트 셀렉터는 호스트별로 마지막에 매칭된 것을 기억 → 다음 페이지부터는 한 번에 매칭
+
+성능 비교: python -m benchmarks.bench_extract
+'''
+import os
+import threading
+from urllib.parse import urlparse
+
+from importlib.util import find_spec
+
+# bs4는 Extractor를 처음 만들 때 import (크롤링/본문 추출을 하지 않는 명령은 로딩 비용 없음)
+# lxml은 설치 여부만 확인 (bs4의 "lxml" 파서 백엔드)
+HAS_LXML = find_spec("lxml") is not None
+
+# EXTRACT_PARSER : lxml | html.parser
+# EXTRACT_PARTIAL : 1이면 SoupStrainer로 필요한 컨테이너만 파싱, 0이면 전체 파싱
+EXTRACT_PARSER = os.getenv("EXTRACT_PARSER", "lxml" if HAS_LXML else "html.parser")
+EXTRACT_PARTIAL = os.getenv("EXTRACT_PARTIAL", "1") == "1"
+
+LIST_SELECTORS = [
+    "ul.sa_list_news > li.sa_item",
+    "div.sa_list_news > ul > li.sa_item",
+    "div.sa_list > ul > li.sa_item",
+    "div.sa_list .sa_item",
+    "li.sa_item",
+    ".sa_item",
+]
+
+# 리스트 셀렉터들이 참조하는 컨테이너 클래스. 이 클래스를 가진 요소의 하위 트리만 파싱
+LIST_CONTAINER_CLASSES = ["sa_list_news", "sa_list", "sa_item"]
+
+# 본문 컨테이너 (앞쪽이 우선)
+BODY_CONTAINER_IDS = ["dic_area", "newsct_article"]
+BODY_NOISE_SELECTOR = ".img_desc, .byline, .f_share"
+
+
+class Extractor:
+    """
+    HTML → 리스트 아이템 / 본문 텍스트 추출기.
+
+    Args:
+        parser: BeautifulSoup 파서 이름 ("lxml", "html.parser")
+        partial: True면 SoupStrainer로 컨테이너 하위 트리만 파싱
+    """
+
+    def __init__(self, parser=EXTRACT_PARSER, partial=EXTRACT_PARTIAL):
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        if parser == "lxml" and not HAS_LXML:
+            parser = "html.parser"
+        self._beautiful_soup = BeautifulSoup
+        self.parser = parser
+        self.partial = partial
+        self._list_strainer = SoupStrainer(class_=LIST_CONTAINER_CLASSES) if partial else None
+        self._body_strainer = SoupStrainer(id=BODY_CONTAINER_IDS) if partial else None
+        self._selector_by_host = {}
+        self._lock = threading.Lock()
+
+    def _soup(self, html, strainer):
+        if strainer is None:
+            return self._beautiful_soup(html, self.parser)
+        return self._beautiful_soup(html, self.parser, parse_only=strainer)
+
+    def find_list_items(self, html, url=None):
+        """
+        리스트 페이지에서 기사 아이템(li.sa_item 등) 목록 탐색.
+        url의 호스트별로 마지막에 매칭된 셀렉터를 먼저 시도
+
+        Returns:
+            (매칭된 selector, 아이템 리스트)
+        """
+        soup = self._soup(html, self._list_strainer)
+        host = urlparse(url).netloc if url else None
+
+        with self._lock:
+            cached = self._selector_by_host.get(host)
+        if cached:
+            news_items = soup.select(cached)
+            if news_items:
+                return cached, news_items
+
+        for selector in LIST_SELECTORS:
+            if selector == cached:
+                continue
+            news_items = soup.select(selector)
+            if news_items:
+                if host:
+                    with self._lock:
+                        self._selector_by_host[host] = selector
+                return selector, news_items
+        return None, []
+
+    def extract_body(self, html):
+        """
+        기사 HTML에서 본문 텍스트 추출.
+
+        Returns:
+            본문 텍스트. 본문 컨테이너(#dic_area / #newsct_article)가 없으면 None
+        """
+        soup = self._soup(html, self._body_strainer)
+        content_tag = None
+        for container_id in BODY_CONTAINER_IDS:
+            content_tag = soup.select_one(f"#{container_id}")
+            if content_tag:
+                break
+        if not content_tag:
+            return None
+
+        for tag in content_tag.select(BODY_NOISE_SELECTOR):
+            tag.decompose()
+        return content_tag.get_text(strip=True)
+
+
+_extractor = None
+_extractor_lock = threading.Lock()
+
+
+def get_extractor():
+    """
+    프로세스 공용 Extractor 반환 (호스트별 셀렉터 캐시 공유)
+    """
+    global _extractor
+    if _extractor is None:
+        with _extractor_lock:
+            if _extractor is None:
+                _extractor = Extractor()
+    return _extractor
@@ -1,98 +1,238 @@
+import hashlib
+import html
 import os
+import re
 import sys
-from jinja2 import Template
-from mjml import mjml2html
+import threading
 from datetime import datetime
-from app.database import SessionLocal, engine
-from app import models
-from app.models import CrawledArticle, DailyInsight
+from app import metrics
+from app.database import SessionLocal
+from app.models import DailyInsight, Newsletter, NewsletterItem
+from app.queries import iter_today_summarized, today_start as get_today_start
 
-# DB 테이블 확인
-models.Base.metadata.create_all(bind=engine)
+# jinja2 / mjml은 실제로 호를 컴파일할 때 import (발송 등 IssueTemplate만 쓰는 쪽은 로딩 비용 없음)
+# DB 테이블은 import 시점에 만들지 않음 → 처음 한 번 python -m app.migrations
 
-def create_preview_html():
-    output_filename = "newsletter_preview.html"
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+TEMPLATE_NAME = "newsletter.mjml"
+# 기본값을 채운 미리보기 HTML (확인용. 발송은 newsletters 테이블에 저장된 HTML 골격을 사용)
+PREVIEW_FILENAME = "newsletter_preview.html"
+SUBJECT = "📢 [Weekly Fashion] 이번 주 핫 트렌드 뉴스레터"
 
-    # 1. 기존 파일 삭제 (Clean Start)
-    if os.path.exists(output_filename):
-        try:
-            os.remove(output_filename)
-            print(f"🗑️ 기존 '{output_filename}' 파일을 삭제했습니다.")
-        except Exception as e:
-            print(f" 기존 파일 삭제 실패 (파일이 열려있을 수 있음): {e}")
+# 수신자마다 달라지는 템플릿 변수. MJML 컴파일 때는 슬롯 토큰으로 남겨 두고 발송 직전에 채움
+PERSONAL_FIELDS = ("subscriber_name", "email", "unsubscribe_url")
+PREVIEW_FIELDS = {
+    "subscriber_name": "구독자",
+    "email": "subscriber@example.com",
+    "unsubscribe_url": "#",
+}
+# 웹 아카이브(API /issues/{id})로 볼 때 채우는 값 (특정 수신자 정보 없음)
+ARCHIVE_FIELDS = {
+    "subscriber_name": "독자",
+    "email": "",
+    "unsubscribe_url": "#",
+}
+
+SLOT_PATTERN = re.compile(r"%%SLOT:(\w+)%%")
+
+_jinja_env = None
+_jinja_env_lock = threading.Lock()
+
+
+def slot_token(name):
+    """
+    MJML 컴파일을 그대로 통과하는 슬롯 표시 문자열
+    """
+    return f"%%SLOT:{name}%%"
+
+
+def get_jinja_env():
+    """
+    공용 Jinja Environment (최초 호출 시 생성).
+    컴파일된 템플릿은 Environment가 캐싱 (auto_reload: 파일 mtime이 바뀌었을 때만 다시 컴파일)
+    """
+    global _jinja_env
+    if _jinja_env is None:
+        with _jinja_env_lock:
+            if _jinja_env is None:
+                from jinja2 import Environment, FileSystemLoader
+                _jinja_env = Environment(loader=FileSystemLoader(TEMPLATE_DIR), auto_reload=True)
+    return _jinja_env
+
+
+def get_template(name=TEMPLATE_NAME):
+    """
+    캐싱된 Jinja 템플릿 반환 (호출마다 파일을 다시 읽고 파싱하지 않음)
+    """
+    return get_jinja_env().get_template(name)
+
+
+class IssueTemplate:
+    """
+    한 호(issue)의 컴파일된 HTML 골격. 슬롯 위치를 생성 시 한 번만 찾아 두고,
+    render()는 조각을 이어 붙이기만 하므로 수신자당 수 마이크로초.
+
+    슬롯이 없는 HTML(예전에 저장된 뉴스레터)은 그대로 반환.
+    """
+
+    def __init__(self, skeleton_html):
+        self.skeleton = skeleton_html
+        # split 결과: [텍스트, 슬롯명, 텍스트, 슬롯명, ..., 텍스트]
+        parts = SLOT_PATTERN.split(skeleton_html)
+        self._texts = parts[0::2]
+        self._slots = parts[1::2]
+
+    @property
+    def slots(self):
+        return set(self._slots)
+
+    def render(self, **fields):
+        """
+        슬롯을 수신자 값으로 채운 HTML 반환. 값은 HTML 이스케이프, 없는 값은 빈 문자열
+        """
+        values = {name: html.escape(str(fields.get(name) or "")) for name in self.slots}
+        out = [self._texts[0]]
+        for name, text in zip(self._slots, self._texts[1:]):
+            out.append(values[name])
+            out.append(text)
+        return "".join(out)
 
-    print("뉴스레터 HTML 생성을 시작합니다...")
-    
-    db = SessionLocal()
-    
-    # [공통] 오늘 날짜 기준점 (오늘 00시 00분 00초)
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # =========================================================
-    # 2. 기사 가져오기
-    # =========================================================
-    articles = db.query(CrawledArticle).filter(
-        CrawledArticle.summary.isnot(None),       # 요약이 완료된 것
-        CrawledArticle.created_at >= today_start  # 오늘 생성된 것만
-    ).order_by(CrawledArticle.created_at.desc()).all() # .limit(5) 제거함. 다 해보기
-    
-    if not articles:
-        print("오늘 요약된 기사가 없습니다. app.processor를 먼저 실행해주세요.")
-        db.close()
-        return
-    else:
-        print(f"오늘 요약된 기사 총 {len(articles)}개를 모두 뉴스레터에 담습니다.")
-
-    # 3. 오늘의 인사이트 가져오기
-    insight_entry = db.query(DailyInsight).filter(
-        DailyInsight.created_at >= today_start
-    ).order_by(DailyInsight.created_at.desc()).first()
-    
-    if insight_entry:
-        final_insight = insight_entry.content
-        print(f"오늘의 AI 인사이트를 반영합니다.")
-    else:
-        final_insight = "아직 오늘의 AI 분석 결과가 도착하지 않았습니다."
-        print("주의: 오늘 생성된 인사이트가 없습니다.")
-
-    # 4. MJML 템플릿 로딩
-    template_path = os.path.join(os.path.dirname(__file__), "templates", "newsletter.mjml")
-    
-    if not os.path.exists(template_path):
-        print(f"❌ 템플릿 파일을 찾을 수 없습니다: {template_path}")
-        db.close()
-        return
 
-    with open(template_path, "r", encoding="utf-8") as f:
-        mjml_template = f.read()
+def compile_issue(articles, insight, today_date=None):
+    """
+    Jinja 렌더링 + MJML → HTML 변환을 호 단위로 한 번만 수행.
+    articles는 한 번만 순회하므로 제너레이터를 그대로 넘겨도 됨 (행을 리스트로 모아 두지 않음)
 
-    # 5. Jinja2 렌더링
-    template = Template(mjml_template)
-    rendered_mjml = template.render(
-        today_date=datetime.now().strftime("%Y년 %m월 %d일"),
-        insight=final_insight, 
-        articles=articles  # 제한 없이 모든 기사가 들어갑니다
+    Returns:
+        수신자별 필드가 슬롯 토큰으로 남아 있는 HTML 골격 (IssueTemplate에 넘겨 사용)
+    """
+    rendered_mjml = get_template().render(
+        today_date=today_date or datetime.now().strftime("%Y년 %m월 %d일"),
+        insight=insight,
+        articles=articles,
+        **{name: slot_token(name) for name in PERSONAL_FIELDS}
     )
 
-    # 6. MJML -> HTML 변환
-    print("MJML을 HTML로 변환 중...")
+    from mjml import mjml2html
+
     result = mjml2html(rendered_mjml)
-    
-    html_content = ""
     if hasattr(result, 'html'):
-        html_content = result.html
+        return result.html
     elif isinstance(result, dict) and 'html' in result:
-        html_content = result['html']
-    else:
-        html_content = str(result)
-
-    # 7. 파일 저장
-    with open(output_filename, "w", encoding="utf-8") as f:
-        f.write(html_content)
-        
-    print(f"성공! '{output_filename}' 파일이 새로 생성되었습니다.")
+        return result['html']
+    return str(result)
+
+def issue_fingerprint(articles, insight):
+    """
+    호 내용 지문: 기사 id/순서/요약 + 인사이트 + 템플릿 원문의 해시.
+    같은 지문의 뉴스레터가 이미 있으면 다시 렌더링하지 않음
+    """
+    digest = hashlib.sha256()
+    with open(os.path.join(TEMPLATE_DIR, TEMPLATE_NAME), "rb") as f:
+        digest.update(f.read())
+    digest.update(b"\0" + (insight or "").encode("utf-8"))
+    for article in articles:
+        digest.update(f"\0{article.id}\0{article.title}\0{article.summary}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _track_ids(rows, ids):
+    """
+    rows를 그대로 흘려보내면서 id만 ids에 모음
+    """
+    for row in rows:
+        ids.append(row.id)
+        yield row
+
+
+def write_preview(skeleton, filename=PREVIEW_FILENAME):
+    """
+    기본값을 채운 미리보기 HTML을 파일로 저장 (브라우저 확인용)
+    """
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(IssueTemplate(skeleton).render(**PREVIEW_FIELDS))
+
+
+def create_issue():
+    """
+    오늘 요약된 기사 + 인사이트로 뉴스레터 한 호를 만들어 newsletters / newsletter_items에 저장.
+    내용이 같은 호(지문 일치)가 이미 있으면 MJML 컴파일 없이 그 호를 재사용.
+
+    Returns:
+        뉴스레터 id (기사가 없으면 None)
+    """
+    print("뉴스레터 HTML 생성을 시작합니다...")
+    
+    db = SessionLocal()
     
-    db.close()
+    # [공통] 오늘 날짜 기준점 (오늘 00시 00분 00초)
+    today_start = get_today_start()
+
+    try:
+        # =========================================================
+        # 1. 오늘의 인사이트 가져오기 (호 지문에 포함되므로 기사보다 먼저)
+        # =========================================================
+        insight_entry = db.query(DailyInsight).filter(
+            DailyInsight.created_at >= today_start
+        ).order_by(DailyInsight.created_at.desc()).first()
+
+        if insight_entry:
+            final_insight = insight_entry.content
+            print(f"오늘의 AI 인사이트를 반영합니다.")
+        else:
+            final_insight = "아직 오늘의 AI 분석 결과가 도착하지 않았습니다."
+            print("주의: 오늘 생성된 인사이트가 없습니다.")
+
+        # 2. 기사 지문 계산 (오늘 요약 완료분, 최신순)
+        # 본문(content) 없이 id/title/link/summary만 keyset 페이지 단위로 흘려 읽음
+        # → 메모리에는 한 페이지(READ_PAGE_SIZE건)의 행과 기사 id 목록만 남음
+        article_ids = []
+        fingerprint = issue_fingerprint(_track_ids(iter_today_summarized(db), article_ids), final_insight)
+
+        if not article_ids:
+            print("오늘 요약된 기사가 없습니다. app.processor를 먼저 실행해주세요.")
+            return None
+        print(f"오늘 요약된 기사 총 {len(article_ids)}개를 모두 뉴스레터에 담습니다.")
+
+        # 3. 같은 내용의 호가 이미 있으면 재사용 (재실행 시 재컴파일 생략)
+        existing = db.query(Newsletter).filter(
+            Newsletter.fingerprint == fingerprint
+        ).order_by(Newsletter.id.desc()).first()
+        if existing is not None:
+            print(f"♻️ 내용이 같은 뉴스레터 #{existing.id}({existing.status})가 있어 렌더링을 생략합니다.")
+            return existing.id
+
+        # 4. Jinja2 렌더링 + MJML -> HTML 변환 (호당 1회, 수신자별 값은 슬롯으로 남김)
+        # 기사는 다시 페이지 단위로 읽어 템플릿에 바로 흘려보냄 (제한 없이 모든 기사가 들어갑니다)
+        # 지문 계산 뒤에 새로 요약된 기사는 빼서 지문/구성 기사와 같은 내용으로 렌더링
+        included = set(article_ids)
+        articles = (row for row in iter_today_summarized(db) if row.id in included)
+        print("MJML을 HTML로 변환 중...")
+        with metrics.timer("render_issue"):
+            skeleton = compile_issue(articles, final_insight)
+
+        # 5. 뉴스레터 + 구성 기사(순서 포함) 저장
+        newsletter = Newsletter(subject=SUBJECT, html_content=skeleton, fingerprint=fingerprint)
+        newsletter.items = [
+            NewsletterItem(article_id=article_id, sort_order=order)
+            for order, article_id in enumerate(article_ids)
+        ]
+        db.add(newsletter)
+        db.commit()
+        print(f"성공! 뉴스레터 #{newsletter.id}를 저장했습니다. (기사 {len(article_ids)}개)")
+
+        # 6. 미리보기 파일 (확인용)
+        try:
+            write_preview(skeleton)
+            print(f"미리보기: '{PREVIEW_FILENAME}'")
+        except OSError as e:
+            print(f" 미리보기 파일 저장 실패: {e}")
+        return newsletter.id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
 
 if __name__ == "__main__":
-    create_preview_html()
\ No newline at end of file
+    create_issue()
\ No newline at end of file
@@ -0,0 +1,158 @@
+# app/http_cache.py
+'''
+리스트/기사 페이지용 HTTP 응답 캐시 (디스크, SQLite 파일).
+
+- 응답의 ETag / Last-Modified 를 본문과 함께 저장
+- 다음 요청 때 If-None-Match / If-Modified-Since 를 붙여 조건부 요청 → 304면 저장된 본문을 그대로 사용
+- 전체 크기가 HTTP_CACHE_MAX_MB 를 넘으면 오래 안 쓰인 것부터 삭제 (LRU)
+'''
+import json
+import os
+import sqlite3
+import threading
+import time
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "./http_cache.db")
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", 200))
+
+# 본문 복원에 필요한 헤더만 저장
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class HttpCache:
+    """
+    URL → (본문, 검증자 헤더) 저장소. 스레드 안전
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_mb=HTTP_CACHE_MAX_MB):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0       # 304 Not Modified → 캐시 본문 사용
+        self.misses = 0     # 200 전체 다운로드
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_http_cache_last_used ON http_cache (last_used_at)"
+        )
+        self._conn.commit()
+
+    def lookup(self, url):
+        """
+        Returns:
+            (headers 딕셔너리, body bytes) 또는 None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def conditional_headers(self, entry):
+        """
+        저장된 검증자로 조건부 요청 헤더 생성
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        cached_headers = entry[0]
+        if cached_headers.get("ETag"):
+            headers["If-None-Match"] = cached_headers["ETag"]
+        if cached_headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+        return headers
+
+    def store(self, url, response_headers, body):
+        """
+        ETag나 Last-Modified가 있는 응답만 저장 (검증자가 없으면 다음에 조건부 요청을 할 수 없음)
+        """
+        headers = {name: response_headers[name] for name in _KEPT_HEADERS if response_headers.get(name)}
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return False
+        if len(body) > self.max_bytes:
+            return False
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (url, headers, body, size, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), time.time()),
+            )
+            self._conn.commit()
+        self.evict()
+        return True
+
+    def touch(self, url):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET last_used_at = ? WHERE url = ?", (time.time(), url)
+            )
+            self._conn.commit()
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def evict(self):
+        """
+        전체 크기가 max_bytes 이하가 될 때까지 last_used_at이 오래된 항목부터 삭제
+        """
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            rows = self._conn.execute(
+                "SELECT url, size FROM http_cache ORDER BY last_used_at ASC"
+            ).fetchall()
+            victims = []
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                victims.append((url,))
+                total -= size
+            self._conn.executemany("DELETE FROM http_cache WHERE url = ?", victims)
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """
+    프로세스 공용 HttpCache 반환. HTTP_CACHE_ENABLED=0 이면 None
+    """
+    global _cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpCache()
+    return _cache
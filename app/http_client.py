@@ -0,0 +1,161 @@
+# app/http_client.py
+'''
+크롤러(crawler.py)와 프로세서(processor.py)가 함께 쓰는 HTTP 클라이언트.
+
+- requests.Session 하나를 프로세스 전체에서 공유 → news.naver.com 으로의 TCP/TLS 연결을 재사용(keep-alive)
+- 커넥션 풀 크기, 타임아웃, 5xx 재시도(backoff) 설정을 한 곳에서 관리
+- http_cache 와 연동해 ETag/Last-Modified 조건부 요청 → 304면 디스크에 저장된 본문 재사용
+'''
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from app import metrics
+from app.http_cache import get_http_cache
+
+# -----------------------------------------------------------
+# 1. 설정값 (.env 로 조정 가능)
+# -----------------------------------------------------------
+# HTTP_POOL_CONNECTIONS : 호스트별 풀을 몇 개까지 캐싱할지 (접속하는 호스트 종류 수)
+# HTTP_POOL_MAXSIZE     : 호스트 하나당 유지할 최대 커넥션 수. FETCH_CONCURRENCY 이상으로 잡아야 대기 없이 재사용됨
+# HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT : 연결/응답 타임아웃(초)
+# HTTP_RETRIES / HTTP_BACKOFF : 5xx·연결 오류 시 재시도 횟수와 지수 backoff 계수 (0.5 → 0.5s, 1s, 2s ...)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", 4))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", 16))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.5))
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+    "Referer": "https://news.naver.com/",
+}
+# User-Agent : **“이 요청을 보낸 클라이언트가 누구인지(브라우저/앱/봇 등)”**를 서버에 알려주는 문자열.
+# Accept : 클라이언트가 어떤 MIME 타입을 받을 수 있는지 서버에 전달
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                  retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+    """
+    커넥션 풀과 재시도 정책이 적용된 Session 생성.
+
+    Returns:
+        requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # 재시도 소진 시 마지막 응답을 그대로 돌려줌 (raise_for_status는 호출 측 판단)
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    프로세스 공용 Session 반환 (최초 호출 시 생성).
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def _response_from_cache(entry, not_modified):
+    """
+    304 응답을 캐시에 저장된 본문으로 채운 200 응답으로 변환
+    """
+    cached_headers, body = entry
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK (cached)"
+    response._content = body
+    response.headers = CaseInsensitiveDict(cached_headers)
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.elapsed = not_modified.elapsed
+    response.from_cache = True
+    return response
+
+
+def _timed_get(url, **kwargs):
+    """
+    공용 Session GET + 소요 시간(stage=fetch) / 응답 코드 기록
+    """
+    with metrics.timer("fetch"):
+        try:
+            response = get_session().get(url, **kwargs)
+        except requests.RequestException:
+            metrics.inc("http_requests_total", status="error")
+            raise
+    metrics.inc("http_requests_total", status=response.status_code)
+    return response
+
+
+def get(url, use_cache=True, **kwargs):
+    """
+    공용 Session으로 GET 요청. timeout을 따로 주지 않으면 DEFAULT_TIMEOUT 적용.
+    use_cache=True(기본)면 디스크 캐시의 ETag/Last-Modified로 조건부 요청을 보내고,
+    304 Not Modified면 캐시 본문으로 만든 응답을 돌려줌 (response.from_cache == True)
+    """
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    cache = get_http_cache() if use_cache else None
+    if cache is None:
+        return _timed_get(url, **kwargs)
+
+    entry = cache.lookup(url)
+    headers = dict(kwargs.pop("headers", None) or {})
+    headers.update(cache.conditional_headers(entry))
+
+    response = _timed_get(url, headers=headers, **kwargs)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(url)
+        cache.record(hit=True)
+        metrics.inc("http_cache_hits_total")
+        return _response_from_cache(entry, response)
+
+    cache.record(hit=False)
+    if response.status_code == 200:
+        cache.store(url, response.headers, response.content)
+    response.from_cache = False
+    return response
+
+
+def close_session():
+    """
+    공용 Session의 커넥션 풀을 정리. (파이프라인 종료 시 호출)
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,245 @@
+# app/jobs.py
+'''
+API 서버에서 파이프라인/단계 실행을 백그라운드 작업(job)으로 돌리고 진행 상황을 조회.
+
+- POST /jobs 로 시작 → 백그라운드 스레드 풀(JOB_WORKERS개)에서 실행, API 요청 스레드는 바로 반환
+- 작업마다 이벤트 목록(queued / started / stage_start / stage_end / succeeded / failed)과
+  단계별 최신 통계(처리 건수, 에러, 소요 시간)를 메모리에 보관 → GET /jobs/{id}, SSE 스트림에서 사용
+- 단계 진행(progress)은 건마다 이벤트를 만들지 않고 단계별 최신 값만 덮어씀 (SSE 쪽에서 주기적으로 전송)
+- 최근 JOB_HISTORY개 작업만 보관 (서버를 재시작하면 사라짐. 실제 처리 결과는 DB에 있음)
+
+작업 종류 (kind)
+- pipeline : 크롤링 → 요약 → 생성 → (send=True면) 발송 전체 (app.pipeline.run_pipeline)
+- crawl / process / generate / send : 단계 하나만 (python -m app.crawler 등과 같은 함수)
+'''
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# JOB_WORKERS : 동시에 실행할 작업 수. 기본 1 → 나중에 들어온 작업은 QUEUED로 대기 (SQLite 쓰기 경합 방지)
+# JOB_HISTORY : 메모리에 보관할 최근 작업 수
+# JOB_MAX_EVENTS : 작업 하나에 보관할 최대 이벤트 수 (넘으면 오래된 것부터 버림)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", 50))
+JOB_MAX_EVENTS = int(os.getenv("JOB_MAX_EVENTS", 1000))
+
+JOB_KINDS = ("pipeline", "crawl", "process", "generate", "send")
+
+
+class Job:
+    """
+    작업 하나의 상태/이벤트. 백그라운드 스레드가 쓰고 API 요청이 읽음 (스레드 안전)
+
+    version은 내용이 바뀔 때마다 1씩 증가 → SSE 스트림이 바뀐 것이 있는지 가볍게 확인
+    """
+
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.params = params
+        self.status = "QUEUED"   # QUEUED, RUNNING, SUCCEEDED, FAILED
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.stages = OrderedDict()   # 단계 이름 -> 최신 통계 dict
+        self.events = []              # [{"seq", "type", "at", ...}]
+        self.version = 0
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self.add_event("queued")
+
+    @property
+    def finished(self):
+        return self.status in ("SUCCEEDED", "FAILED")
+
+    def _append_event(self, event_type, data):
+        # self._lock을 잡은 상태에서 호출
+        self.events.append({
+            "seq": next(self._seq),
+            "type": event_type,
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            **data,
+        })
+        if len(self.events) > JOB_MAX_EVENTS:
+            del self.events[: len(self.events) - JOB_MAX_EVENTS]
+        self.version += 1
+
+    def add_event(self, event_type, **data):
+        with self._lock:
+            self._append_event(event_type, data)
+
+    def finish(self, status, result=None, error=None, seconds=None):
+        """
+        종료 상태와 종료 이벤트(succeeded / failed)를 한 번에 기록.
+        SSE 스트림은 finished를 본 뒤 남은 이벤트를 보내고 끝나므로, 상태만 먼저 바뀌어 보이면 안 됨
+        """
+        with self._lock:
+            self.result = result
+            self.error = error
+            self.finished_at = datetime.now()
+            self.status = status
+            self._append_event(status.lower(), {"seconds": seconds, "error": error})
+
+    def update_stage(self, stats):
+        with self._lock:
+            self.stages[stats["stage"]] = stats
+            self.version += 1
+
+    def stage_listener(self, event, stats):
+        """
+        app.pipeline StageStats listener. progress는 최신 값만 덮어쓰고, 시작/종료만 이벤트로 남김
+        """
+        snapshot = stats.as_dict()
+        self.update_stage(snapshot)
+        if event != "progress":
+            self.add_event(event, **snapshot)
+
+    def events_after(self, seq):
+        with self._lock:
+            return [event for event in self.events if event["seq"] > seq]
+
+    def stage_snapshot(self):
+        with self._lock:
+            return list(self.stages.values())
+
+    def as_dict(self, with_events=False):
+        with self._lock:
+            data = {
+                "id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "created_at": self.created_at.isoformat(timespec="seconds"),
+                "started_at": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+                "finished_at": self.finished_at.isoformat(timespec="seconds") if self.finished_at else None,
+                "result": self.result,
+                "error": self.error,
+                "stages": list(self.stages.values()),
+            }
+            if with_events:
+                data["events"] = list(self.events)
+            return data
+
+
+def _run_single_stage(job, name, func, *args):
+    """
+    단계 하나짜리 작업도 pipeline과 같은 모양의 단계 이벤트/통계를 남기도록 StageStats로 감쌈
+    """
+    from app.pipeline import StageStats, run_timed
+
+    stats = StageStats(name, 1, job.stage_listener)
+    result = run_timed(stats, func, *args)
+    if stats.errors:
+        raise RuntimeError(f"{name} 단계 실패 (서버 로그 참고)")
+    return result
+
+
+def _run_job(job):
+    """
+    kind별 실행 함수. 무거운 모듈(크롤러/AI/MJML)은 작업이 실제로 실행될 때 import
+    """
+    if job.kind == "pipeline":
+        from app.pipeline import run_pipeline
+
+        all_stats = run_pipeline(send=job.params.get("send", True), listener=job.stage_listener)
+        failed = [stats.name for stats in all_stats if stats.errors]
+        return {"failed_stages": failed}
+    if job.kind == "crawl":
+        from app.crawler import crawl_fashion_breaking_news
+
+        results = _run_single_stage(job, "crawl", crawl_fashion_breaking_news)
+        return {"new_articles": sum(stats["new"] for stats in results or [])}
+    if job.kind == "process":
+        from app.processor import process_articles
+
+        _run_single_stage(job, "process", process_articles)
+        return None
+    if job.kind == "generate":
+        from app.generator import create_issue
+
+        return {"newsletter_id": _run_single_stage(job, "generate", create_issue)}
+    if job.kind == "send":
+        from app.sender import send_newsletter
+
+        return _run_single_stage(job, "send", send_newsletter, job.params.get("newsletter_id"))
+    raise ValueError(f"알 수 없는 작업 종류: {job.kind}")
+
+
+class JobManager:
+    """
+    작업 등록/실행/조회. 실행은 ThreadPoolExecutor(JOB_WORKERS)
+    """
+
+    def __init__(self, workers=JOB_WORKERS, history=JOB_HISTORY):
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.on_finish = []   # 작업이 끝날 때 호출할 함수들 (예: 건수 캐시 비우기)
+
+    def submit(self, kind, **params):
+        if kind not in JOB_KINDS:
+            raise ValueError(f"알 수 없는 작업 종류: {kind} (가능: {', '.join(JOB_KINDS)})")
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            # 오래된 작업부터 정리 (실행 중인 작업은 남김)
+            for job_id in list(self._jobs):
+                if len(self._jobs) <= self.history:
+                    break
+                if self._jobs[job_id].finished:
+                    del self._jobs[job_id]
+        self._executor.submit(self._execute, job)
+        return job
+
+    def _execute(self, job):
+        job.status = "RUNNING"
+        job.started_at = datetime.now()
+        job.add_event("started", kind=job.kind)
+        started = time.monotonic()
+        try:
+            result = _run_job(job)
+        except Exception as e:
+            print(f"❌ 작업 {job.id}({job.kind}) 실패: {e}")
+            job.finish("FAILED", error=str(e), seconds=round(time.monotonic() - started, 3))
+        else:
+            job.finish("SUCCEEDED", result=result, seconds=round(time.monotonic() - started, 3))
+        for callback in self.on_finish:
+            callback(job)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self, wait=False):
+        """
+        wait=True면 실행 중/대기 중인 작업이 끝날 때까지 기다림 (False면 대기 중인 작업은 취소)
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """
+    프로세스 공용 JobManager (최초 호출 시 생성)
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager()
+    return _manager
@@ -1,17 +1,40 @@
 # app/main.py
 
-from fastapi import FastAPI, Depends
-from sqlalchemy.orm import Session
-from .database import engine, get_db
-from . import models
+import asyncio
+import base64
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import func
+from .api_cache import CachedBody, TTLCache, response_cache
+from .database import SessionLocal
+from .generator import ARCHIVE_FIELDS, IssueTemplate
+from .jobs import get_job_manager
+from .queries import SUMMARIZED_KEYS, fetch_keyset_page, summarized_filters
+from . import metrics, models
+
+# JOB_SSE_INTERVAL : SSE 스트림이 작업 상태를 확인하는 주기(초)
+# JOB_SSE_KEEPALIVE : 보낼 이벤트가 없을 때 연결 유지용 주석을 보내는 주기(초, 프록시 idle timeout 대비)
+JOB_SSE_INTERVAL = float(os.getenv("JOB_SSE_INTERVAL", 0.5))
+JOB_SSE_KEEPALIVE = float(os.getenv("JOB_SSE_KEEPALIVE", 15))
+# API_LIST_CACHE_TTL : 기사/뉴스레터 목록 응답을 재사용할 시간(초). CLI 실행으로도 바뀌므로 짧게
+# API_ISSUE_MAX_AGE : 뉴스레터 본문 응답의 브라우저/프록시 캐시 시간(초). 저장된 호는 바뀌지 않음
+API_LIST_CACHE_TTL = float(os.getenv("API_LIST_CACHE_TTL", 30))
+API_ISSUE_MAX_AGE = int(os.getenv("API_ISSUE_MAX_AGE", 3600))
+API_PAGE_SIZE_MAX = 100
 
 # -----------------------------------------------------------
-# 1. DB 테이블 자동 생성
+# 1. DB 테이블
 # -----------------------------------------------------------
-# models.py에 정의된 Base 클래스를 상속받은 모든 클래스를 찾아서
-# 실제 DB에 테이블이 없으면 생성(CREATE TABLE)합니다.
-# 이미 테이블이 있다면 아무 일도 하지 않습니다.
-models.Base.metadata.create_all(bind=engine)
+# 서버가 뜰 때마다 테이블/컬럼/인덱스를 검사하지 않도록, 스키마는 배포(처음 실행) 시 한 번만 만듭니다.
+#   python -m app.migrations
+# (models.py 기준으로 없는 테이블 생성 + 나중에 추가된 컬럼/인덱스 보강, 여러 번 실행해도 안전)
 
 # -----------------------------------------------------------
 # 2. FastAPI 앱 인스턴스 생성
@@ -22,21 +45,366 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# 건수 API 결과 캐시 (API_COUNT_CACHE_TTL초). 작업이 끝나면 비움
+count_cache = TTLCache()
+# 응답 본문 캐시 (압축본 + ETag 포함). 호 본문은 저장 후 바뀌지 않으므로 만료 없이 LRU로만 정리
+issue_cache = response_cache()
+page_cache = response_cache(ttl=API_LIST_CACHE_TTL)
+
+
+def _invalidate_api_caches(job):
+    count_cache.invalidate()
+    page_cache.invalidate()
+
+
+get_job_manager().on_finish.append(_invalidate_api_caches)
+
 # -----------------------------------------------------------
 # 3. 기본 라우터 (API 엔드포인트)
 # -----------------------------------------------------------
+# DB를 읽는 핸들러는 async로 두고 조회만 스레드 풀(run_in_threadpool)에서 실행
+# → 느린 조회나 백그라운드 작업이 있어도 이벤트 루프(다른 요청, SSE 스트림)는 막히지 않음
 @app.get("/")
-def read_root():
+async def read_root():
     """
     서버 상태 확인용 루트 API
     """
     return {"status": "ok", "message": "뉴스레터 시스템이 정상 작동 중입니다."}
 
+
+def _count_subscribers():
+    db = SessionLocal()
+    try:
+        return db.query(models.Subscriber).count()
+    finally:
+        db.close()
+
+
+def _count_articles_by_status():
+    db = SessionLocal()
+    try:
+        rows = db.query(models.CrawledArticle.status, func.count()).group_by(models.CrawledArticle.status).all()
+        return {status: count for status, count in rows}
+    finally:
+        db.close()
+
+
 # 테스트용: 현재 DB에 저장된 구독자가 몇 명인지 확인하는 API
 @app.get("/subscribers/count")
-def read_subscribers_count(db: Session = Depends(get_db)):
+async def read_subscribers_count():
+    """
+    구독자 수. API_COUNT_CACHE_TTL초 동안은 캐시된 값을 반환
+    """
+    count = await run_in_threadpool(count_cache.get_or_load, "subscribers", _count_subscribers)
+    return {"count": count}
+
+
+@app.get("/articles/counts")
+async def read_article_counts():
+    """
+    상태별 기사 수 (PENDING / PROCESSING / APPROVED / REJECTED / DUPLICATE). 구독자 수와 같은 캐시 사용
+    """
+    counts = await run_in_threadpool(count_cache.get_or_load, "articles", _count_articles_by_status)
+    return {"counts": counts, "total": sum(counts.values())}
+
+# -----------------------------------------------------------
+# 4. 백그라운드 작업 (app/jobs.py)
+# -----------------------------------------------------------
+class JobRequest(BaseModel):
+    kind: str = "pipeline"              # pipeline / crawl / process / generate / send
+    send: bool = True                   # pipeline: False면 발송 생략
+    newsletter_id: Optional[int] = None # send: 없으면 아직 안 보낸 최신 호
+
+
+def _get_job_or_404(job_id):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업 {job_id}을(를) 찾을 수 없습니다.")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    """
+    작업을 백그라운드에서 시작하고 바로 반환 (202). 진행 상황은 GET /jobs/{id} 또는 /jobs/{id}/events
+    """
+    params = {}
+    if request.kind == "pipeline":
+        params["send"] = request.send
+    elif request.kind == "send" and request.newsletter_id is not None:
+        params["newsletter_id"] = request.newsletter_id
+    try:
+        job = get_job_manager().submit(request.kind, **params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return job.as_dict()
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """
+    최근 작업 목록 (최신순, 이벤트 제외)
+    """
+    return [job.as_dict() for job in get_job_manager().list()]
+
+
+@app.get("/jobs/{job_id}")
+async def read_job(job_id: str):
+    """
+    작업 상태 + 단계별 통계 + 이벤트 목록
+    """
+    return _get_job_or_404(job_id).as_dict(with_events=True)
+
+
+def _sse(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _job_event_stream(job, request, last_seq):
+    """
+    작업 이벤트를 SSE로 전송. JOB_SSE_INTERVAL마다 새 이벤트와 단계 진행(progress)을 확인하고
+    작업이 끝나면 마지막 이벤트까지 보낸 뒤 종료
+    """
+    seen_version = -1
+    idle = 0.0
+    while True:
+        if await request.is_disconnected():
+            return
+        # 이벤트보다 먼저 읽음. 종료 상태와 종료 이벤트는 함께 기록되므로(Job.finish) finished면 아래에서 종료 이벤트까지 전송
+        finished = job.finished
+        if job.version != seen_version:
+            seen_version = job.version
+            for event in job.events_after(last_seq):
+                last_seq = event["seq"]
+                yield _sse(event["type"], event, event["seq"])
+            yield _sse("progress", {"status": job.status, "stages": job.stage_snapshot()})
+            idle = 0.0
+        elif idle >= JOB_SSE_KEEPALIVE:
+            yield ": keepalive\n\n"
+            idle = 0.0
+        if finished:
+            return
+        await asyncio.sleep(JOB_SSE_INTERVAL)
+        idle += JOB_SSE_INTERVAL
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    작업 진행 상황 SSE (text/event-stream)
+    - 이벤트: queued / started / stage_start / stage_end / succeeded / failed (id = 이벤트 순번)
+    - progress: 바뀐 것이 있을 때 현재 상태 + 단계별 통계
+    재연결 시 Last-Event-ID 헤더를 주면 그 이후 이벤트만 전송
+    """
+    job = _get_job_or_404(job_id)
+    try:
+        last_seq = int(request.headers.get("last-event-id", 0))
+    except ValueError:
+        last_seq = 0
+    return StreamingResponse(
+        _job_event_stream(job, request, last_seq),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# -----------------------------------------------------------
+# 5. 뉴스레터 아카이브 / 기사 목록 (읽기 전용)
+# -----------------------------------------------------------
+# 본문은 처음 요청 때 한 번 만들어 gzip(+brotli)까지 압축해 캐시 → 이후 요청은 고르기만 함
+# 클라이언트가 If-None-Match로 같은 ETag를 보내면 본문 없이 304
+async def _cached_response(request, cache, key, loader, cache_control):
+    body = cache.get(key)
+    if body is None:
+        body = await run_in_threadpool(cache.get_or_load, key, loader)
+    encoding, data = body.choose(request.headers.get("accept-encoding"))
+    headers = {"ETag": body.etag(encoding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if body.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(data, media_type=body.media_type, headers=headers)
+
+
+def _json_body(data):
+    return CachedBody(json.dumps(data, ensure_ascii=False, separators=(",", ":")), "application/json")
+
+
+def _encode_cursor(values):
+    """
+    keyset 마지막 키 값 → URL에 넣을 불투명 문자열 (없으면 None)
+    """
+    if values is None:
+        return None
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, parsers):
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        return [parse(value) for parse, value in zip(parsers, values, strict=True)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+
+
+def _load_issue_list(limit, after):
+    db = SessionLocal()
+    try:
+        rows, last = fetch_keyset_page(
+            db,
+            (models.Newsletter.id, models.Newsletter.subject, models.Newsletter.status, models.Newsletter.created_at),
+            filters=(models.Newsletter.html_content.isnot(None),),
+            keys=(models.Newsletter.id,),
+            descending=True,
+            after=after,
+            page_size=limit,
+        )
+    finally:
+        db.close()
+    items = [
+        {
+            "id": row.id,
+            "subject": row.subject,
+            "status": row.status,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "url": f"/issues/{row.id}",
+        }
+        for row in rows
+    ]
+    return _json_body({"items": items, "next_cursor": _encode_cursor(last)})
+
+
+def _load_issue_html(newsletter_id):
+    db = SessionLocal()
+    try:
+        skeleton = db.query(models.Newsletter.html_content).filter(models.Newsletter.id == newsletter_id).scalar()
+    finally:
+        db.close()
+    if skeleton is None:
+        raise HTTPException(status_code=404, detail=f"뉴스레터 #{newsletter_id}을(를) 찾을 수 없습니다.")
+    return CachedBody(IssueTemplate(skeleton).render(**ARCHIVE_FIELDS), "text/html")
+
+
+def _load_issue_articles(newsletter_id):
+    db = SessionLocal()
+    try:
+        if db.get(models.Newsletter, newsletter_id) is None:
+            raise HTTPException(status_code=404, detail=f"뉴스레터 #{newsletter_id}을(를) 찾을 수 없습니다.")
+        rows = db.query(
+            models.CrawledArticle.id, models.CrawledArticle.title,
+            models.CrawledArticle.link, models.CrawledArticle.summary,
+        ).join(
+            models.NewsletterItem, models.NewsletterItem.article_id == models.CrawledArticle.id
+        ).filter(
+            models.NewsletterItem.newsletter_id == newsletter_id
+        ).order_by(models.NewsletterItem.sort_order).all()
+    finally:
+        db.close()
+    items = [{"id": row.id, "title": row.title, "link": row.link, "summary": row.summary} for row in rows]
+    return _json_body({"newsletter_id": newsletter_id, "items": items})
+
+
+def _load_article_page(day, limit, after):
+    start = datetime.combine(day, datetime.min.time())
+    db = SessionLocal()
+    try:
+        rows, last = fetch_keyset_page(
+            db,
+            (models.CrawledArticle.id, models.CrawledArticle.title, models.CrawledArticle.link,
+             models.CrawledArticle.summary, models.CrawledArticle.created_at),
+            filters=summarized_filters(start, start + timedelta(days=1)),
+            keys=SUMMARIZED_KEYS,
+            descending=True,
+            after=after,
+            page_size=limit,
+        )
+    finally:
+        db.close()
+    items = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "link": row.link,
+            "summary": row.summary,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+        }
+        for row in rows
+    ]
+    return _json_body({"date": day.isoformat(), "items": items, "next_cursor": _encode_cursor(last)})
+
+
+@app.get("/issues")
+async def list_issues(request: Request, limit: int = Query(20, ge=1, le=API_PAGE_SIZE_MAX),
+                      cursor: Optional[str] = None):
+    """
+    저장된 뉴스레터 목록 (최신순). 다음 페이지는 응답의 next_cursor를 cursor로 전달
+    """
+    after = _decode_cursor(cursor, (int,))
+    return await _cached_response(
+        request, page_cache, ("issues", limit, cursor), lambda: _load_issue_list(limit, after),
+        f"public, max-age={int(API_LIST_CACHE_TTL)}",
+    )
+
+
+@app.get("/issues/{newsletter_id}")
+async def read_issue(request: Request, newsletter_id: int):
+    """
+    뉴스레터 본문 HTML (newsletters.html_content 골격에 아카이브용 값을 채움)
+    """
+    return await _cached_response(
+        request, issue_cache, ("issue", newsletter_id), lambda: _load_issue_html(newsletter_id),
+        f"public, max-age={API_ISSUE_MAX_AGE}",
+    )
+
+
+@app.get("/issues/{newsletter_id}/articles")
+async def read_issue_articles(request: Request, newsletter_id: int):
+    """
+    뉴스레터에 실린 기사 목록 (실린 순서)
+    """
+    return await _cached_response(
+        request, issue_cache, ("issue_articles", newsletter_id), lambda: _load_issue_articles(newsletter_id),
+        f"public, max-age={API_ISSUE_MAX_AGE}",
+    )
+
+
+@app.get("/articles")
+async def list_articles(request: Request, day: Optional[date] = Query(None, alias="date"),
+                        limit: int = Query(20, ge=1, le=API_PAGE_SIZE_MAX), cursor: Optional[str] = None):
+    """
+    요약이 끝난 기사 목록 (date 하루치, 기본 오늘, 최신순). 중복 기사는 대표 기사만
+    """
+    day = day or date.today()
+    after = _decode_cursor(cursor, (datetime.fromisoformat, int))
+    return await _cached_response(
+        request, page_cache, ("articles", day, limit, cursor), lambda: _load_article_page(day, limit, after),
+        f"public, max-age={int(API_LIST_CACHE_TTL)}",
+    )
+
+# -----------------------------------------------------------
+# 6. 계측값 (app/metrics.py)
+# -----------------------------------------------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    """
+    Prometheus 수집용 텍스트 형식. 이 서버 프로세스 안에서 실행된 크롤링/요약/발송의 누적값
+    """
+    return PlainTextResponse(
+        metrics.get_registry().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+@app.get("/metrics/json")
+def read_metrics_json():
     """
-    Dependency Injection(get_db)을 통해 db 세션을 주입받습니다.
+    같은 값을 JSON으로 (히스토그램은 count/avg/p50/p90/p99/min/max 요약)
     """
-    count = db.query(models.Subscriber).count()
-    return {"count": count}
\ No newline at end of file
+    return metrics.get_registry().snapshot()
@@ -0,0 +1,284 @@
+# app/metrics.py
+'''
+단계별 계측: 지연 히스토그램 / 카운터 / 게이지 (외부 라이브러리 없음)
+
+- 히스토그램 newsletter_stage_seconds{stage=...} : 아래 단계의 건당 소요 시간
+    fetch(HTTP GET) / parse_list / parse_body / llm_wait(rate limiter 대기) / llm_request(API 호출 1회)
+    summarize(배치 요약 1회) / db_write(일괄 저장 1회) / render_issue(MJML 컴파일) / render_personal(수신자별 채우기)
+    smtp_send(메일 1건)
+- 카운터 : HTTP 응답 코드, LLM 호출/재시도/429/토큰, 저장 행 수, 발송 성공/실패, SMTP 연결 수 등
+- 게이지 : 파이프라인 단계 큐 길이, 미처리 기사 수 등 "지금 값"
+
+노출
+- FastAPI /metrics (Prometheus 텍스트 형식), /metrics/json (snapshot)
+- write_run_report() : 실행 1회의 snapshot을 JSON 파일로 저장 (app.pipeline 종료 시)
+
+값은 프로세스 안에서만 누적 (재시작하면 0부터). METRICS_ENABLED=0이면 기록하지 않음
+'''
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# METRICS_ENABLED : 0이면 계측 생략 (함수 호출만 남고 아무것도 기록하지 않음)
+# METRICS_REPORT_PATH : 실행 리포트(JSON) 저장 경로
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_REPORT_PATH = os.getenv("METRICS_REPORT_PATH", "./run_report.json")
+
+METRIC_PREFIX = "newsletter_"
+# 지연 히스토그램 버킷 상한(초). 로컬 파싱(ms 이하) ~ LLM 재시도(수십 초)까지
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 항목별 도움말 (Prometheus # HELP)
+HELP = {
+    "stage_seconds": "단계별 건당 소요 시간(초)",
+    "http_requests_total": "HTTP GET 응답 수 (status별, 연결 실패는 error)",
+    "http_cache_hits_total": "304 응답을 캐시 본문으로 대체한 수",
+    "llm_requests_total": "Gemini API 호출 시도 수",
+    "llm_retries_total": "일시적 오류 후 재시도 수",
+    "llm_errors_total": "Gemini 호출 에러 수 (transient/permanent)",
+    "llm_rate_limited_total": "429(할당량 초과) 응답 수",
+    "llm_tokens_total": "응답 usage_metadata 기준 사용 토큰 수",
+    "summary_cache_hits_total": "요약 캐시 적중 기사 수",
+    "articles_summarized_total": "AI 요약 요청에 포함된 기사 수",
+    "db_rows_written_total": "일괄 저장으로 반영한 행 수 (테이블별)",
+    "db_write_errors_total": "일괄 저장 실패 수 (테이블별)",
+    "mails_total": "메일 발송 결과 수 (sent/failed)",
+    "smtp_connections_total": "SMTP 연결(로그인) 수",
+    "smtp_reconnects_total": "끊긴 연결 재연결 후 재시도 수",
+    "queue_depth": "파이프라인 단계 입력 큐에 쌓인 아이템 수",
+    "write_buffer_rows": "일괄 저장 대기 중인 행 수",
+    "articles_pending": "실행 시작 시점 미처리(PENDING) 기사 수",
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"')) for name, value in pairs)
+    return "{" + body + "}"
+
+
+class Histogram:
+    """
+    고정 버킷 히스토그램. 분위수(p50/p90/p99)는 버킷 안 선형 보간으로 추정 (Prometheus histogram_quantile과 같은 방식)
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        self.counts[index] += 1
+        self.min = value if not self.count else min(self.min, value)
+        self.max = max(self.max, value)
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, ratio):
+        if not self.count:
+            return 0.0
+        rank = ratio * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                # 버킷 경계를 실제 관측 최솟값/최댓값으로 좁혀서 보간
+                lower = max(self.buckets[position - 1] if position else 0.0, self.min)
+                upper = min(self.buckets[position] if position < len(self.buckets) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.50), 6),
+            "p90": round(self.quantile(0.90), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "min": round(self.min, 6),
+            "max": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """
+    이름 + 라벨별 카운터/게이지/히스토그램 저장소. 스레드 안전
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self.started_at = datetime.now()
+        self._counters = {}     # name -> {label_key: value}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled or not amount:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name, value, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        with 블록 소요 시간을 stage_seconds{stage=...}에 기록 (예외가 나도 기록)
+        """
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started, stage=stage)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+            self.started_at = datetime.now()
+
+    def snapshot(self):
+        """
+        Returns:
+            {"started_at", "counters": {이름: {라벨: 값}}, "gauges": {...}, "histograms": {이름: {라벨: 통계}}}
+            라벨은 "stage=fetch" 형태 문자열 (라벨이 없으면 "")
+        """
+        def label_text(key):
+            return ",".join(f"{name}={value}" for name, value in key)
+
+        with self._lock:
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "counters": {
+                    name: {label_text(key): value for key, value in sorted(series.items())}
+                    for name, series in sorted(self._counters.items())
+                },
+                "gauges": {
+                    name: {label_text(key): value for key, value in sorted(series.items())}
+                    for name, series in sorted(self._gauges.items())
+                },
+                "histograms": {
+                    name: {label_text(key): histogram.snapshot() for key, histogram in sorted(series.items())}
+                    for name, series in sorted(self._histograms.items())
+                },
+            }
+
+    def render_prometheus(self):
+        """
+        Prometheus 텍스트 노출 형식 (text/plain; version=0.0.4)
+        """
+        lines = []
+
+        def header(name, kind):
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {HELP.get(name, name)}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {kind}")
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                header(name, "counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{METRIC_PREFIX}{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._gauges.items()):
+                header(name, "gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{METRIC_PREFIX}{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self._histograms.items()):
+                header(name, "histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(key, [('le', str(bound))])} {cumulative}")
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                    lines.append(f"{METRIC_PREFIX}{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                    lines.append(f"{METRIC_PREFIX}{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    프로세스 공용 MetricsRegistry 반환
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+# 계측 지점에서 쓰는 짧은 이름들
+def inc(name, amount=1, **labels):
+    get_registry().inc(name, amount, **labels)
+
+
+def set_gauge(name, value, **labels):
+    get_registry().set_gauge(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    get_registry().observe(name, seconds, **labels)
+
+
+def timer(stage):
+    return get_registry().timer(stage)
+
+
+def write_run_report(path=METRICS_REPORT_PATH, extra=None):
+    """
+    현재까지의 계측값 + extra(단계별 처리 건수 등)를 JSON 파일로 저장
+
+    Returns:
+        저장한 리포트 dict
+    """
+    report = get_registry().snapshot()
+    report["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    if extra:
+        report.update(extra)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
@@ -0,0 +1,85 @@
+# app/migrations.py
+'''
+기존 DB를 현재 models.py 스키마에 맞추는 간단한 마이그레이션 (여러 번 실행해도 안전).
+
+- 없는 테이블 생성 (create_all)
+- 나중에 추가된 컬럼이 기존 테이블에 없으면 ALTER TABLE ... ADD COLUMN
+- models.py에 정의된 인덱스가 없으면 생성 (CREATE INDEX, 이미 있으면 건너뜀)
+
+사용법: python -m app.migrations  (DB를 새로 만들거나 모델이 바뀌었을 때 한 번. 앱 import/실행 중에는 호출하지 않음)
+'''
+from sqlalchemy import inspect, text
+
+from app import models
+from app.database import engine
+
+# 테이블 생성 이후에 모델에 추가된 컬럼 (기존 DB에는 없을 수 있음). nullable 컬럼만 추가 가능
+ADDED_COLUMNS = [
+    models.Newsletter.__table__.c.fingerprint,
+    models.CrawledArticle.__table__.c.claimed_at,
+    models.CrawledArticle.__table__.c.simhash,
+    models.CrawledArticle.__table__.c.body_simhash,
+    models.CrawledArticle.__table__.c.canonical_id,
+]
+
+
+def add_missing_columns(bind):
+    """
+    Returns:
+        추가한 "테이블.컬럼" 이름 리스트
+    """
+    inspector = inspect(bind)
+    added = []
+    for column in ADDED_COLUMNS:
+        table_name = column.table.name
+        existing = {info["name"] for info in inspector.get_columns(table_name)}
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=bind.dialect)
+        bind.execute(text(f'ALTER TABLE {table_name} ADD COLUMN {column.name} {column_type}'))
+        added.append(f"{table_name}.{column.name}")
+    return added
+
+
+def create_missing_indexes(bind):
+    """
+    Returns:
+        생성한 인덱스 이름 리스트
+    """
+    inspector = inspect(bind)
+    created = []
+    for table in models.Base.metadata.sorted_tables:
+        existing = {info["name"] for info in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            index.create(bind, checkfirst=True)
+            created.append(index.name)
+    return created
+
+
+def run_migrations(bind_engine=engine):
+    """
+    테이블 생성 + 컬럼/인덱스 보강. 변경이 있었을 때만 출력
+
+    Returns:
+        (생성한 테이블, 추가한 컬럼, 생성한 인덱스) 이름 리스트
+    """
+    inspector = inspect(bind_engine)
+    tables = [table.name for table in models.Base.metadata.sorted_tables if not inspector.has_table(table.name)]
+    models.Base.metadata.create_all(bind=bind_engine)
+    with bind_engine.begin() as conn:
+        added = add_missing_columns(conn)
+        created = create_missing_indexes(conn)
+    for name in tables:
+        print(f"🛠️ 테이블 생성: {name}")
+    for name in added:
+        print(f"🛠️ 컬럼 추가: {name}")
+    for name in created:
+        print(f"🛠️ 인덱스 생성: {name}")
+    return tables, added, created
+
+
+if __name__ == "__main__":
+    if not any(run_migrations()):
+        print("✅ 스키마가 최신 상태입니다.")
@@ -1,6 +1,6 @@
 # app/models.py
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -32,14 +32,23 @@ class Subscriber(Base):
 # ========================================================
 class CrawledArticle(Base):
     __tablename__ = "crawled_articles"
+    # "PENDING 기사를 오래된 순으로" 조회(작업 큐 claim)와 "오늘 생성된 기사" 조회용 인덱스
+    __table_args__ = (
+        Index("ix_crawled_articles_status_created_at", "status", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     link = Column(String, unique=True, index=True)  # 'original_url' 대신 'link'로 통일
     content = Column(Text)
     summary = Column(Text, nullable=True) # 제미나이 요약한 내용
-    status = Column(String, default="PENDING") # PENDING, DONE, ERROR
-    created_at = Column(DateTime, default=datetime.now)
+    status = Column(String, default="PENDING") # PENDING, PROCESSING(처리 중), APPROVED, REJECTED, DUPLICATE(중복 기사)
+    created_at = Column(DateTime, default=datetime.now, index=True)
+    claimed_at = Column(DateTime, nullable=True) # 워커가 PROCESSING으로 가져간 시각 (오래되면 PENDING으로 되돌림)
+    # 중복 기사 묶기 (app/dedup.py): 제목+리드 / 본문 SimHash(16자리 hex), 중복이면 대표 기사 id
+    simhash = Column(String, nullable=True)
+    body_simhash = Column(String, nullable=True)
+    canonical_id = Column(Integer, ForeignKey("crawled_articles.id"), nullable=True, index=True)
 
 
 # ========================================================
@@ -50,7 +59,8 @@ class Newsletter(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     subject = Column(String, nullable=False)  # 이메일 제목
-    html_content = Column(Text, nullable=True) # 발송된 최종 HTML 원본 저장
+    html_content = Column(Text, nullable=True) # 발송용 HTML 골격 (수신자별 값은 %%SLOT:이름%% 으로 비어 있음)
+    fingerprint = Column(String, index=True, nullable=True) # 기사/요약/인사이트/템플릿 해시. 같으면 재렌더링 생략
     scheduled_at = Column(DateTime(timezone=True), nullable=True) # 예약 발송 시간
     
     # 상태값: DRAFT(작성중), SENDING(발송중), SENT(완료), FAILED(실패)
@@ -61,7 +71,7 @@ class Newsletter(Base):
     # [관계 설정]
     # NewsletterItem 테이블과 1:N 관계입니다.
     # back_populates는 반대쪽 모델에 있는 변수명과 일치해야 합니다.
-    items = relationship("NewsletterItem", back_populates="newsletter")
+    items = relationship("NewsletterItem", back_populates="newsletter", order_by="NewsletterItem.sort_order")
 
 
 # ========================================================
@@ -90,12 +100,16 @@ class NewsletterItem(Base):
 # ========================================================
 class SendLog(Base):
     __tablename__ = "send_logs"
+    # 재발송(이어서 보내기) 시 "이 뉴스레터를 이 구독자에게 이미 보냈는지" 조회용 복합 인덱스
+    __table_args__ = (
+        Index("ix_send_logs_newsletter_subscriber", "newsletter_id", "subscriber_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     newsletter_id = Column(Integer, ForeignKey("newsletters.id"))
     subscriber_id = Column(Integer, ForeignKey("subscribers.id"))
     
-    status = Column(String) # SENT, BOUNCED(반송), OPENED(수신확인)
+    status = Column(String) # SENT, FAILED(발송 실패), BOUNCED(반송), OPENED(수신확인)
     message_id = Column(String, nullable=True) # 이메일 서비스(AWS SES 등)에서 주는 고유 ID
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,433 @@
+# app/pipeline.py
+'''
+크롤링 → 본문 다운로드 → 본문 추출 → AI 요약 → DB 저장 → HTML 생성 → 메일 발송을
+하나의 프로세스 안에서 실행하는 파이프라인 러너.
+
+- 각 단계는 크기가 제한된 큐(Queue)로 연결 → 뒤 단계가 밀리면 앞 단계가 자동으로 대기 (backpressure)
+- 단계별 워커 수를 따로 설정 (다운로드는 많이, DB 저장은 1개)
+- 실행이 끝나면 단계별 처리 건수/소요 시간 요약 출력 + 계측값 JSON 리포트 저장 (app/metrics.py, METRICS_REPORT_PATH)
+
+사용법: python -m app.pipeline  (메일 발송 생략: python -m app.pipeline --no-send)
+       DB를 새로 만들었다면 먼저 한 번 python -m app.migrations
+'''
+import os
+import queue
+import sys
+import threading
+import time
+
+from app import metrics
+from app.ai_utils import SUMMARY_BATCH_SIZE, generate_batch_summaries, is_failed_result
+from app.crawler import crawl_fashion_breaking_news
+from app.database import SessionLocal
+from app.generator import create_issue
+from app.dedup import get_deduplicator
+from app.http_cache import get_http_cache
+from app.models import CrawledArticle
+from app.processor import (
+    FETCH_CONCURRENCY,
+    ArticleWriter,
+    HostThrottle,
+    create_daily_insight,
+    download_article,
+    extract_article_body,
+    report_cache_stats,
+)
+from app.sender import send_newsletter
+from app.work_queue import (
+    claim_articles,
+    count_pending,
+    release_articles,
+    release_orphan_duplicates,
+    requeue_stale_claims,
+)
+
+# 단계별 동시성 / 큐 크기 설정
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 32))
+PIPELINE_EXTRACT_WORKERS = int(os.getenv("PIPELINE_EXTRACT_WORKERS", 2))
+PIPELINE_SUMMARIZE_WORKERS = int(os.getenv("PIPELINE_SUMMARIZE_WORKERS", 2))
+# PIPELINE_PERSIST_BATCH : persist 단계가 한 번에 넘겨받는 결과 수 (DB commit 단위는 ArticleWriter의 WRITE_BATCH_SIZE)
+PIPELINE_PERSIST_BATCH = int(os.getenv("PIPELINE_PERSIST_BATCH", 20))
+# 배치 단계에서 다음 아이템을 기다리는 최대 시간(초). 넘으면 모인 만큼만 처리
+PIPELINE_BATCH_WAIT = float(os.getenv("PIPELINE_BATCH_WAIT", 0.5))
+
+_STOP = object()  # 워커 종료 신호
+
+
+class StageStats:
+    """
+    단계별 처리 통계 (스레드 안전)
+
+    listener(event, stats)를 주면 "stage_start" / "progress"(처리 기록마다) / "stage_end" 때 호출
+    (app/jobs.py가 진행 상황 조회/SSE 이벤트에 사용)
+    """
+
+    def __init__(self, name, workers, listener=None):
+        self.name = name
+        self.workers = workers
+        self.listener = listener
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, items_in, items_out, elapsed, error=False):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += elapsed
+            if error:
+                self.errors += 1
+        self.notify("progress")
+
+    def notify(self, event):
+        if self.listener is not None:
+            self.listener(event, self)
+
+    def mark_start(self):
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+
+    def mark_finish(self):
+        with self._lock:
+            self.finished_at = time.monotonic()
+
+    @property
+    def wall_seconds(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+        }
+
+
+class Stage:
+    """
+    큐 하나를 입력으로 받아 workers개의 스레드로 handler를 실행하는 파이프라인 단계.
+
+    handler(item, emit) 형태. batch_size > 1이면 handler(items, emit)로 리스트를 받음.
+    emit(result)는 다음 단계 큐에 결과를 넣음 (큐가 가득 차면 대기).
+    """
+
+    def __init__(self, name, handler, workers=1, batch_size=1, queue_size=PIPELINE_QUEUE_SIZE, listener=None):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.next_stage = None
+        self.stats = StageStats(name, self.workers, listener)
+        self._threads = []
+
+    def emit(self, item):
+        if self.next_stage is not None:
+            self.next_stage.put(item)
+
+    def put(self, item):
+        """
+        이 단계 입력 큐에 아이템 추가 (가득 차면 대기) + 큐 길이 기록
+        """
+        self.inbox.put(item)
+        metrics.set_gauge("queue_depth", self.inbox.qsize(), queue=self.name)
+
+    def _collect(self):
+        """
+        batch_size만큼(또는 대기 시간 초과까지) 아이템을 모음. 종료 신호를 만나면 (items, True)
+        """
+        first = self.inbox.get()
+        metrics.set_gauge("queue_depth", self.inbox.qsize(), queue=self.name)
+        if first is _STOP:
+            return [], True
+
+        items = [first]
+        while len(items) < self.batch_size:
+            try:
+                item = self.inbox.get(timeout=PIPELINE_BATCH_WAIT)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _worker(self):
+        self.stats.mark_start()
+        stopped = False
+        while not stopped:
+            items, stopped = self._collect()
+            if not items:
+                continue
+
+            emitted = []
+
+            def emit(result):
+                emitted.append(1)
+                self.emit(result)
+
+            started = time.monotonic()
+            failed = False
+            try:
+                if self.batch_size > 1:
+                    self.handler(items, emit)
+                else:
+                    self.handler(items[0], emit)
+            except Exception as e:
+                failed = True
+                print(f"  -> [{self.name}] 에러: {e}")
+            self.stats.record(len(items), len(emitted), time.monotonic() - started, error=failed)
+        self.stats.mark_finish()
+
+    def start(self):
+        self.stats.notify("stage_start")
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self):
+        """
+        모든 워커에 종료 신호를 보내고 끝날 때까지 대기
+        """
+        for _ in self._threads:
+            self.inbox.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self.stats.notify("stage_end")
+
+
+def run_timed(stats, func, *args, **kwargs):
+    """
+    단건 단계(크롤링/인사이트/렌더/발송)를 실행하고 시간 기록
+    """
+    stats.mark_start()
+    stats.notify("stage_start")
+    started = time.monotonic()
+    try:
+        result = func(*args, **kwargs)
+        stats.record(1, 1, time.monotonic() - started)
+        return result
+    except Exception as e:
+        print(f"  -> [{stats.name}] 에러: {e}")
+        stats.record(1, 0, time.monotonic() - started, error=True)
+        return None
+    finally:
+        stats.mark_finish()
+        stats.notify("stage_end")
+
+
+def build_article_stages(writer, dedup=None, listener=None):
+    """
+    fetch → extract → summarize → persist 단계 생성 및 연결.
+    저장은 writer(ArticleWriter)가 모아서 일괄 반영 → 끝나면 writer.close() 필요
+    dedup(Deduplicator)을 주면 extract 단계에서 본문 중복 기사는 요약 없이 DUPLICATE로 저장
+    listener는 각 단계의 StageStats에 전달
+    """
+    throttle = HostThrottle()
+
+    def fetch(article, emit):
+        article_id, link, saved_text = article
+        if saved_text:
+            # 이전 실행에서 저장해 둔 본문이 있으면 다운로드 생략
+            emit((article_id, None, saved_text))
+            return
+        emit((article_id, download_article(link, throttle), None))
+
+    def extract(page, emit):
+        article_id, html, text = page
+        if text is None:
+            text = extract_article_body(html)
+        body_hash = None
+        if text is not None and dedup is not None:
+            canonical_id, body_hash = dedup.check_body(article_id, text)
+            if canonical_id is not None:
+                print(f"  -> #{article_id} 본문 중복 → #{canonical_id} (요약 생략)")
+                writer.add(article_id, "DUPLICATE", canonical_id=canonical_id, content=text)
+                return
+        emit((article_id, text, body_hash))
+
+    def summarize(bodies, emit):
+        found = [body for body in bodies if body[1] is not None]
+        for article_id, text, _ in bodies:
+            if text is None:
+                print(f"  -> #{article_id} 본문 태그를 찾을 수 없음 (Skip)")
+                emit((article_id, None, "REJECTED", None, None))
+
+        try:
+            with metrics.timer("summarize"):
+                summaries = generate_batch_summaries([text for _, text, _ in found])
+        except Exception as e:
+            # 배치 전체 실패도 기사별 요약 실패와 같이 처리 (본문은 저장해 두고 다음 실행에서 재요약)
+            print(f"  -> 배치 요약 에러: {e}")
+            summaries = [None] * len(found)
+        for (article_id, text, body_hash), summary in zip(found, summaries):
+            if is_failed_result(summary):
+                # 본문만 저장하고 PROCESSING 유지 → 실행 종료 시 PENDING 복귀, 다음 실행에서 다운로드 없이 재요약
+                emit((article_id, None, None, text, None))
+            else:
+                emit((article_id, summary, "APPROVED", text, body_hash))
+
+    def persist(results, emit):
+        for article_id, summary, status, text, body_hash in results:
+            writer.add(article_id, status, summary=summary, content=text, body_simhash=body_hash)
+            print(f"  -> #{article_id} {status or '요약 실패 (재시도 대기)'}")
+        for result in results:
+            emit(result)
+
+    stages = [
+        Stage("fetch", fetch, workers=FETCH_CONCURRENCY, listener=listener),
+        Stage("extract", extract, workers=PIPELINE_EXTRACT_WORKERS, listener=listener),
+        Stage("summarize", summarize, workers=PIPELINE_SUMMARIZE_WORKERS, batch_size=SUMMARY_BATCH_SIZE,
+              listener=listener),
+        # SQLite 쓰기는 직렬화되므로 저장 단계는 워커 1개
+        Stage("persist", persist, workers=1, batch_size=PIPELINE_PERSIST_BATCH, listener=listener),
+    ]
+    for stage, next_stage in zip(stages, stages[1:]):
+        stage.next_stage = next_stage
+    return stages
+
+
+def print_summary(all_stats, total_seconds):
+    print("\n" + "=" * 72)
+    print("[파이프라인 단계별 요약]")
+    print(f"{'stage':<10} {'workers':>7} {'in':>6} {'out':>6} {'err':>4} {'busy(s)':>9} {'wall(s)':>9}")
+    for stats in all_stats:
+        print(
+            f"{stats.name:<10} {stats.workers:>7} {stats.items_in:>6} {stats.items_out:>6} "
+            f"{stats.errors:>4} {stats.busy_seconds:>9.2f} {stats.wall_seconds:>9.2f}"
+        )
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        stats = http_cache.stats()
+        print(f"HTTP 캐시: 304 재사용 {stats['hits']}건 / 전체 다운로드 {stats['misses']}건")
+    print(f"총 소요 시간: {total_seconds:.2f}s")
+    print("=" * 72)
+
+
+def process_pending_articles(listener=None):
+    """
+    PENDING 기사를 CLAIM_BATCH_SIZE건씩 PROCESSING으로 가져와(다른 워커와 중복 처리 방지)
+    fetch → extract → summarize → persist 단계에 투입하고, 끝나면 일괄 반영 + 못 끝낸 기사는 PENDING으로 되돌림.
+    run_pipeline과 python -m app.processor가 함께 사용
+
+    Returns:
+        기사 단계(fetch/extract/summarize/persist) StageStats 리스트
+    """
+    db = SessionLocal()
+    requeue_stale_claims(db)
+    pending = count_pending(db)
+    metrics.set_gauge("articles_pending", pending)
+    print(f" 미처리 기사 {pending}건의 처리를 시작합니다.")
+
+    writer = ArticleWriter()   # WRITE_BATCH_SIZE건 / WRITE_FLUSH_SECONDS마다 commit
+    dedup = get_deduplicator(db)
+    stages = build_article_stages(writer, dedup, listener)
+    for stage in stages:
+        stage.start()
+    claimed_ids = []
+    try:
+        while True:
+            claimed = claim_articles(db)
+            if not claimed:
+                break
+            ids = [article_id for article_id, _ in claimed]
+            claimed_ids.extend(ids)
+            # ORM 객체 대신 필요한 컬럼만 Row로 읽음 (세션에 쌓이지 않음)
+            rows = db.query(
+                CrawledArticle.id, CrawledArticle.link, CrawledArticle.title, CrawledArticle.summary,
+                CrawledArticle.simhash, CrawledArticle.content,
+            ).filter(CrawledArticle.id.in_(ids)).order_by(CrawledArticle.id).all()
+            for row in rows:
+                # 제목 + 리드가 이미 처리한 기사와 거의 같으면 다운로드/요약 없이 DUPLICATE
+                canonical_id = dedup.check_title(row.id, row.title, row.summary, row.simhash) if dedup else None
+                if canonical_id is not None:
+                    print(f"  -> #{row.id} 중복 기사 → #{canonical_id} (생략)")
+                    writer.add(row.id, "DUPLICATE", canonical_id=canonical_id)
+                    continue
+                # 이전 실행에서 저장해 둔 본문이 있으면 fetch 단계에서 다운로드 생략
+                stages[0].put((row.id, row.link, row.content or None))  # 큐가 가득 차면 여기서 대기
+    finally:
+        # 앞 단계부터 순서대로 닫아야 남은 아이템이 모두 다음 단계로 흘러감
+        for stage in stages:
+            stage.close()
+        writer.close()
+        # 대표 기사가 APPROVED가 되지 못한 중복 기사는 묶음을 풀고 PENDING으로 (저장이 모두 끝난 뒤에 확인)
+        orphaned = release_orphan_duplicates(db, claimed_ids)
+        # 다운로드/요약/저장 실패로 끝까지 못 간 기사는 PENDING으로 되돌림
+        released = release_articles(db, claimed_ids)
+        db.close()
+        print(f" 결과 저장 {writer.written}건 (일괄 반영)")
+        if dedup is not None and dedup.duplicates:
+            print(f" 중복 기사 {dedup.duplicates - orphaned}건은 대표 기사에 묶고 요약을 생략했습니다.")
+        if orphaned:
+            print(f" 대표 기사가 요약되지 못한 중복 기사 {orphaned}건은 PENDING으로 되돌렸습니다.")
+        if released:
+            print(f" 처리하지 못한 기사 {released}건은 PENDING으로 되돌렸습니다. (다음 실행에서 재시도)")
+    return [stage.stats for stage in stages]
+
+
+def run_pipeline(send=True, listener=None):
+    """
+    전체 파이프라인 실행.
+
+    Args:
+        send: False면 메일 발송 단계 생략
+        listener: listener(event, stats). 단계 시작/진행/종료 알림 (StageStats 참고)
+
+    Returns:
+        단계별 StageStats 리스트
+    """
+    pipeline_started = time.monotonic()
+
+    # 1) 크롤링 (목록 → PENDING 저장)
+    crawl_stats = StageStats("crawl", 1, listener)
+    run_timed(crawl_stats, crawl_fashion_breaking_news)
+
+    # 2) 기사 단위 단계들 (PENDING claim → 다운로드 → 추출 → 요약 → 저장)
+    article_stats = process_pending_articles(listener)
+
+    # 3) 인사이트 / HTML 생성 / 발송
+    insight_stats = StageStats("insight", 1, listener)
+    db = SessionLocal()
+    try:
+        run_timed(insight_stats, create_daily_insight, db)
+    finally:
+        db.close()
+    report_cache_stats()
+
+    render_stats = StageStats("render", 1, listener)
+    newsletter_id = run_timed(render_stats, create_issue)
+
+    all_stats = [crawl_stats] + article_stats + [insight_stats, render_stats]
+    if send and newsletter_id is not None:
+        send_stats = StageStats("send", 1, listener)
+        run_timed(send_stats, send_newsletter, newsletter_id)
+        all_stats.append(send_stats)
+
+    total_seconds = time.monotonic() - pipeline_started
+    print_summary(all_stats, total_seconds)
+    try:
+        metrics.write_run_report(extra={
+            "total_seconds": round(total_seconds, 3),
+            "stages": [stats.as_dict() for stats in all_stats],
+        })
+        print(f"실행 리포트: {metrics.METRICS_REPORT_PATH}")
+    except OSError as e:
+        print(f" 실행 리포트 저장 실패: {e}")
+    return all_stats
+
+
+if __name__ == "__main__":
+    run_pipeline(send="--no-send" not in sys.argv[1:])
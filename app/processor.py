@@ -1,88 +1,250 @@
-import requests
-from bs4 import BeautifulSoup
-from sqlalchemy.orm import Session
-from datetime import datetime
+import os
+import threading
 import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app import http_client, metrics
 from app.database import SessionLocal
+from app.extractor import get_extractor
 from app.models import CrawledArticle, DailyInsight
-from app.ai_utils import generate_3_line_summary, generate_daily_insight
+from app.summary_cache import get_cache
+from app.ai_utils import (
+    INSIGHT_MAP_REDUCE_THRESHOLD,
+    generate_daily_insight,
+    generate_map_reduce_insight,
+)
+from app.topics import group_articles
+from app.queries import iter_today_summarized
+
+# 본문 수집 동시성 설정
+# FETCH_CONCURRENCY : 전체 동시 다운로드 수 (스레드 풀 크기)
+# FETCH_PER_HOST : 같은 호스트에 동시에 붙는 최대 연결 수 (네이버 서버 예의상 작게 유지)
+# FETCH_HOST_INTERVAL : 같은 호스트로 보내는 요청 사이의 최소 간격(초). 기존 time.sleep(1) 대체
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 8))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", 2))
+FETCH_HOST_INTERVAL = float(os.getenv("FETCH_HOST_INTERVAL", 0.3))
+
+# 처리 결과 DB 반영 설정 (기사마다 commit 하지 않음)
+# WRITE_BATCH_SIZE : 몇 건씩 모아서 한 번에 UPDATE + commit 할지
+# WRITE_FLUSH_SECONDS : 건수가 덜 찼어도 마지막 반영 후 이 시간(초)이 지나면 반영 (새 결과가 없어도 타이머로 반영)
+WRITE_BATCH_SIZE = int(os.getenv("WRITE_BATCH_SIZE", 50))
+WRITE_FLUSH_SECONDS = float(os.getenv("WRITE_FLUSH_SECONDS", 5))
+
+class HostThrottle:
+    """
+    호스트별 동시 연결 수와 요청 간격을 제한하는 유틸리티.
+    스레드 여러 개가 같은 호스트로 몰려도 per_host개 이상은 동시에 나가지 않음.
+    """
+
+    def __init__(self, per_host=FETCH_PER_HOST, interval=FETCH_HOST_INTERVAL):
+        self.per_host = max(1, per_host)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._slots = {}      # host -> Semaphore
+        self._next_at = {}    # host -> 다음 요청 가능 시각(monotonic)
+
+    def _semaphore(self, host):
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
+
+    def _wait_turn(self, host):
+        # 예약 방식: 락 안에서 내 순번 시각만 잡고, 실제 대기는 락 밖에서 수행
+        with self._lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_at.get(host, now))
+            self._next_at[host] = start_at + self.interval
+        delay = start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).netloc
+        semaphore = self._semaphore(host)
+        with semaphore:
+            self._wait_turn(host)
+            yield
+
+
+def download_article(link, throttle=None):
+    """
+    기사 상세 페이지 HTML 다운로드.
+    공용 Session 사용: 같은 호스트의 커넥션을 재사용하고, 타임아웃/5xx 재시도가 적용됨
+
+    재시도 후에도 4xx/5xx면 HTTPError → 에러 페이지를 본문 추출에 넘겨 REJECTED로 만들지 않고
+    다운로드 실패로 처리 (PROCESSING으로 남았다가 release_articles가 PENDING으로 되돌림)
+    """
+    if throttle is None:
+        resp = http_client.get(link)
+    else:
+        with throttle.slot(link):
+            resp = http_client.get(link)
+    resp.raise_for_status()
+    return resp.text
+
+
+def extract_article_body(html):
+    """
+    기사 HTML에서 본문 텍스트 추출.
+
+    Returns:
+        본문 텍스트. 본문 컨테이너(#dic_area / #newsct_article)가 없으면 None
+    """
+    # 기본은 lxml + 본문 컨테이너만 부분 파싱 (app/extractor.py)
+    with metrics.timer("parse_body"):
+        return get_extractor().extract_body(html)
+
+
+class ArticleWriter:
+    """
+    기사 처리 결과(상태/요약/본문)를 모아 batch_size건 또는 flush_seconds마다
+    id 기준 bulk UPDATE + commit 1회로 반영. 여러 워커 스레드에서 호출 가능.
+    flush_seconds > 0이면 백그라운드 타이머가 add()가 없는 동안에도 남은 결과를 반영 → 다 쓰면 close() 필요
+
+    반영에 실패한 배치의 기사는 PROCESSING으로 남음 → release_articles()가 그 기사들만 PENDING으로 되돌림
+    """
+
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, flush_seconds=WRITE_FLUSH_SECONDS):
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.written = 0
+        self.failed = 0
+        self._rows = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+        if flush_seconds > 0:
+            self._timer = threading.Thread(target=self._flush_periodically, name="article-writer", daemon=True)
+            self._timer.start()
+
+    def _flush_periodically(self):
+        # 앞 단계가 느려 add()가 한동안 없어도 모인 결과가 flush_seconds 넘게 묵지 않도록
+        while not self._closed.wait(self.flush_seconds):
+            with self._lock:
+                if self._rows and time.monotonic() - self._last_flush >= self.flush_seconds:
+                    self._flush_locked()
+                    metrics.set_gauge("write_buffer_rows", 0, table="crawled_articles")
+
+    def add(self, article_id, status=None, **values):
+        """
+        status를 주지 않으면 상태는 그대로(PROCESSING) 두고 나머지 컬럼(summary, content 등)만 저장.
+        값이 None인 컬럼은 건드리지 않음
+        """
+        row = {"id": article_id}
+        if status is not None:
+            row["status"] = status
+        row.update((name, value) for name, value in values.items() if value is not None)
+        with self._lock:
+            self._rows.append(row)
+            if len(self._rows) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._flush_locked()
+            metrics.set_gauge("write_buffer_rows", len(self._rows), table="crawled_articles")
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """
+        타이머를 멈추고 남은 결과를 반영
+        """
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self.flush()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        db = SessionLocal()
+        try:
+            with metrics.timer("db_write"):
+                db.execute(update(CrawledArticle), rows)
+                db.commit()
+            self.written += len(rows)
+            metrics.inc("db_rows_written_total", len(rows), table="crawled_articles")
+        except Exception as e:
+            print(f"  -> 결과 저장 실패 ({len(rows)}건, 다음 실행에서 재처리): {e}")
+            db.rollback()
+            self.failed += len(rows)
+            metrics.inc("db_write_errors_total", table="crawled_articles")
+        finally:
+            db.close()
+
+
+def report_cache_stats():
+    # 기사 요약과 인사이트(그룹 요약/종합)는 같은 캐시 파일을 쓰지만 적중률은 따로 출력
+    cache = get_cache()
+    for kind, label in (("summary", "요약 캐시"), ("insight", "인사이트 캐시")):
+        stats = cache.stats(kind)
+        total = stats["hits"] + stats["misses"]
+        if kind != "summary" and not total:
+            continue
+        hit_rate = (stats["hits"] / total * 100) if total else 0.0
+        print(f" {label}: hit {stats['hits']}건 / miss {stats['misses']}건 (적중률 {hit_rate:.1f}%)")
+
 
 def process_articles():
-    db: Session = SessionLocal()
-    
     # ====================================================
     # 1. 기사 상세 처리 (요약 안 된 것들 요약하기)
     # ====================================================
-    articles = db.query(CrawledArticle).filter(
-        CrawledArticle.status == "PENDING"
-    ).all()
-
-    print(f" 미처리 기사 {len(articles)}건의 요약 작업을 시작")
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
-
-    if articles:
-        total_count = len(articles)
-        for index, article in enumerate(articles, 1):
-            try:
-                print(f"[{index}/{total_count}] Processing: {article.title[:15]}...")
-                
-                resp = requests.get(article.link, headers=headers)
-                soup = BeautifulSoup(resp.text, "html.parser")
-                
-                content_tag = soup.select_one("#dic_area") or soup.select_one("#newsct_article")
-                
-                if content_tag:
-                    for tag in content_tag.select(".img_desc, .byline, .f_share"):
-                        tag.decompose()
-                    
-                    full_text = content_tag.get_text(strip=True)
-                    
-                    summary = generate_3_line_summary(full_text)
-                    
-                    article.summary = summary
-                    article.status = "APPROVED" 
-                    
-                    print(f"  -> 요약 완료: {summary[:20]}...")
-                else:
-                    print("  -> 본문 태그를 찾을 수 없음 (Skip)")
-                    article.status = "REJECTED" 
-                
-                db.commit()
-                # 속도를 위해 대기시간 1초로 단축
-                time.sleep(1)
+    # 파이프라인(app.pipeline)과 같은 단계로 처리: PENDING claim → 다운로드 → 본문 추출 → 배치 요약 → 일괄 저장
+    # (app.pipeline이 이 모듈을 import하므로 실행 시점에 import)
+    from app.pipeline import process_pending_articles
 
-            except Exception as e:
-                print(f"  -> 에러: {e}")
-                db.rollback()
-    else:
-        print(" 모든 기사가 이미 요약되어 있습니다.")
+    process_pending_articles()
 
     # ====================================================
     # 2.오늘의 인사이트 생성 및 'DB 저장'
     # ====================================================
+    db: Session = SessionLocal()
+    try:
+        create_daily_insight(db)
+    finally:
+        db.close()
+
+    report_cache_stats()
+
+
+def create_daily_insight(db):
+    """
+    오늘 요약된 기사 제목들로 인사이트를 생성해 daily_insights 테이블에 저장.
+
+    Returns:
+        생성된 DailyInsight. 분석할 기사가 없으면 None
+    """
     print("\n [2단계] 오늘의 산업 인사이트를 생성합니다...")
 
-    # 이미 처리된(APPROVED) 기사라도 '오늘' 생성된 거라면 모두 가져옵니다.
-    today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    today_articles = db.query(CrawledArticle).filter(
-        CrawledArticle.created_at >= today_start,
-        CrawledArticle.summary.isnot(None)
-    ).all()
-    
-    if not today_articles:
-        print(" 분석할 오늘의 기사가 없습니다.")
-        db.close()
-        return
+    # 이미 처리된(APPROVED) 기사라도 '오늘' 생성된 거라면 모두 가져옵니다. (본문 제외, id/제목/요약만)
+    # 여기서는 전체 목록이 필요함: 기사 수로 방식을 고르고, 주제 그룹핑은 모든 기사를 본 뒤에야 그룹이 정해지며
+    # 그룹 요약 프롬프트에 구성 기사 전부가 들어감 → 오늘 기사 수만큼 메모리 사용
+    articles = list(iter_today_summarized(
+        db, columns=(CrawledArticle.id, CrawledArticle.title, CrawledArticle.summary)
+    ))
 
-    titles = [article.title for article in today_articles]
-    print(f" 총 {len(titles)}개의 기사 제목을 기반으로 분석 중...")
+    if not articles:
+        print(" 분석할 오늘의 기사가 없습니다.")
+        return None
 
     # AI 분석 요청
-    insight_text = generate_daily_insight(titles)
+    if len(articles) <= INSIGHT_MAP_REDUCE_THRESHOLD:
+        print(f" 총 {len(articles)}개의 기사 제목을 기반으로 분석 중...")
+        insight_text = generate_daily_insight([article.title for article in articles])
+    else:
+        # 기사가 많으면 주제 그룹별로 요약(map)한 뒤 종합(reduce). 그룹 요약은 캐시됨
+        groups = group_articles(articles)
+        print(f" 총 {len(articles)}개의 기사를 {len(groups)}개 주제 그룹으로 나눠 분석 중...")
+        insight_text = generate_map_reduce_insight(
+            [[(article.title, article.summary) for article in group] for group in groups]
+        )
     
     print("="*50)
     print("[생성된 인사이트]")
@@ -96,8 +258,7 @@ def process_articles():
     db.add(new_insight)
     db.commit()
     print(" DB 저장 완료 (테이블: daily_insights)")
-
-    db.close()
+    return new_insight
 
 if __name__ == "__main__":
-    process_articles()
\ No newline at end of file
+    process_articles()
@@ -0,0 +1,128 @@
+# app/queries.py
+'''
+큰 테이블을 메모리에 한꺼번에 올리지 않고 읽는 조회 헬퍼.
+
+- keyset 페이지네이션 : OFFSET 대신 "마지막으로 읽은 (정렬 키) 다음부터" page_size건씩 조회
+  → 페이지가 뒤로 가도 느려지지 않고, 한 번에 메모리에 있는 행은 page_size건뿐
+- 컬럼 projection : 본문(content)처럼 큰 컬럼은 필요할 때만. 기본은 id/title/link/summary
+- ORM 객체가 아닌 Row를 돌려주므로 세션(identity map)에 쌓이지 않음
+'''
+import os
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+from app.models import CrawledArticle
+
+READ_PAGE_SIZE = int(os.getenv("READ_PAGE_SIZE", 500))
+
+# 본문 없이 목록/뉴스레터에 필요한 컬럼만
+ARTICLE_SUMMARY_COLUMNS = (
+    CrawledArticle.id,
+    CrawledArticle.title,
+    CrawledArticle.link,
+    CrawledArticle.summary,
+)
+
+
+def today_start():
+    """
+    오늘 00시 00분 00초
+    """
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _after(keys, values, descending):
+    """
+    (k1, k2, ...) > (v1, v2, ...) 조건 (내림차순이면 <). 행 값 비교를 지원하지 않는 DB도 있어 풀어서 작성
+    """
+    conditions = []
+    for position, key in enumerate(keys):
+        equal_prefix = [keys[i] == values[i] for i in range(position)]
+        step = key < values[position] if descending else key > values[position]
+        conditions.append(and_(*equal_prefix, step))
+    return or_(*conditions)
+
+
+def iter_keyset(db, columns, filters=(), keys=(CrawledArticle.id,), descending=False, page_size=READ_PAGE_SIZE):
+    """
+    keys 순서로 page_size건씩 읽어 한 행씩 넘겨주는 제너레이터.
+
+    Args:
+        columns: 가져올 컬럼들 (keys에 있는 컬럼이 빠져 있으면 자동으로 추가)
+        filters: WHERE 조건들
+        keys: 정렬/페이지 기준 컬럼. 마지막 키는 유일해야 함 (보통 id)
+        descending: True면 최신순
+
+    Yields:
+        Row (row.id, row.title 처럼 접근)
+    """
+    last_values = None
+    while True:
+        rows, last_values = fetch_keyset_page(db, columns, filters, keys, descending, last_values, page_size)
+        yield from rows
+        if last_values is None:
+            return
+
+
+def fetch_keyset_page(db, columns, filters=(), keys=(CrawledArticle.id,), descending=False, after=None,
+                      page_size=READ_PAGE_SIZE):
+    """
+    keyset 한 페이지만 조회 (API 페이지네이션용). 인자는 iter_keyset과 같음
+
+    Args:
+        after: 이전 페이지가 돌려준 마지막 키 값 리스트 (None이면 첫 페이지)
+
+    Returns:
+        (rows, 다음 페이지용 마지막 키 값 리스트). 마지막 페이지면 두 번째 값은 None
+    """
+    columns = list(columns)
+    extra_keys = [key for key in keys if not any(key is column for column in columns)]
+    order = [key.desc() if descending else key.asc() for key in keys]
+
+    stmt = select(*columns, *extra_keys).where(*filters)
+    if after is not None:
+        stmt = stmt.where(_after(keys, after, descending))
+    # 한 건 더 읽어서 다음 페이지가 있는지 확인 (빈 페이지 추가 조회 방지)
+    rows = db.execute(stmt.order_by(*order).limit(page_size + 1)).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, [getattr(rows[-1], key.key) for key in keys]
+
+
+# 요약 기사 목록의 정렬/페이지 기준 (최신순)
+SUMMARIZED_KEYS = (CrawledArticle.created_at, CrawledArticle.id)
+
+
+def summarized_filters(start, end=None):
+    """
+    start 이후(end가 있으면 end 전) 생성되고 요약이 끝난 대표 기사 조건
+    (summary 컬럼에는 크롤링 때 리드 문장도 들어가므로 상태로 판단. (status, created_at) 인덱스 사용)
+    """
+    filters = [
+        CrawledArticle.status == "APPROVED",        # 요약이 완료된 것
+        CrawledArticle.summary.isnot(None),
+        CrawledArticle.canonical_id.is_(None),      # 중복 기사는 대표 기사만
+        CrawledArticle.created_at >= start,
+    ]
+    if end is not None:
+        filters.append(CrawledArticle.created_at < end)
+    return tuple(filters)
+
+
+def iter_today_summarized(db, columns=ARTICLE_SUMMARY_COLUMNS, page_size=READ_PAGE_SIZE):
+    """
+    오늘 생성되고 요약이 끝난 기사를 최신순으로 (created_at, id 기준 keyset)
+
+    Yields:
+        Row (기본 id/title/link/summary)
+    """
+    return iter_keyset(
+        db,
+        columns,
+        filters=summarized_filters(today_start()),
+        keys=SUMMARIZED_KEYS,
+        descending=True,
+        page_size=page_size,
+    )
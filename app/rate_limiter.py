@@ -0,0 +1,253 @@
+# app/rate_limiter.py
+'''
+Gemini 호출용 속도 제한기 + 재시도 정책.
+
+- RPM(분당 요청 수)은 토큰 버킷(기본 burst 1 → 60/RPM초 간격), TPM(분당 토큰 수)은 최근 60초 합계로 제한
+  → 처음 1분이나 한동안 쉰 뒤에도 어느 60초 구간이든 한도를 넘지 않음 (버킷이 1분치씩 차 있으면 첫 1분에 2배까지 나감)
+- 스레드/asyncio 어디서 불러도 안전: 락 안에서는 "언제 보내도 되는지" 예약만 하고, 대기는 락 밖에서 수행
+- 에러를 일시적(transient)/영구적(permanent)으로 분류하고, 서버가 알려준 retry-after를 우선 적용
+- 그 외에는 지수 backoff + jitter
+'''
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", 15))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", 1000000))
+# GEMINI_BURST : 쉬고 있다가 한 번에 몰아서 보낼 수 있는 요청 수. 1이면 항상 60/RPM초 간격
+GEMINI_BURST = int(os.getenv("GEMINI_BURST", 1))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", 5))
+GEMINI_BACKOFF_BASE = float(os.getenv("GEMINI_BACKOFF_BASE", 2))
+GEMINI_BACKOFF_MAX = float(os.getenv("GEMINI_BACKOFF_MAX", 60))
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# 재시도하면 성공할 수 있는 HTTP 상태 코드
+TRANSIENT_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# "Please retry in 37.5s" / "retryDelay": "37s" / Retry-After 형태의 힌트
+_RETRY_HINT = re.compile(r"retry(?:[ _-]?delay|[ _-]?after| in)?['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.IGNORECASE)
+
+
+class TokenBucket:
+    """
+    초당 rate만큼 채워지고 최대 capacity까지 쌓이는 토큰 버킷.
+    reserve()는 토큰을 미리 빼 두고(음수 허용) 기다려야 할 시간을 돌려줌 → 호출 순서대로 공정하게 대기
+    """
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity   # capacity(= burst)가 작으므로 가득 찬 채로 시작해도 한도를 크게 넘지 않음
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount, now):
+        self._refill(now)
+        # 버킷 크기보다 큰 요청은 버킷 크기만큼만 차감 (영원히 못 보내는 상황 방지)
+        amount = min(amount, self.capacity)
+        self.tokens -= amount
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class SlidingWindow:
+    """
+    최근 window초 동안 쓴 양의 합이 limit을 넘지 않도록 보낼 시각을 예약 (TPM용).
+    예약 시각은 항상 앞선 예약 이후 → 호출 순서대로 대기
+    """
+
+    def __init__(self, limit, window=60.0):
+        self.limit = limit
+        self.window = window
+        self._entries = deque()   # (보낸/보낼 시각, 양), 시각 오름차순
+        self._total = 0
+
+    def _expire(self, now):
+        while self._entries and self._entries[0][0] <= now - self.window:
+            self._total -= self._entries.popleft()[1]
+
+    def reserve(self, amount, now):
+        """
+        now 이후 amount를 보낼 수 있는 가장 이른 시각을 예약하고, 그때까지 기다릴 시간(초)을 반환
+        """
+        self._expire(now)
+        # 한도보다 큰 요청은 한도만큼만 계산 (영원히 못 보내는 상황 방지)
+        amount = min(amount, self.limit)
+        start = max(now, self._entries[-1][0]) if self._entries else now
+        used = self._total
+        for at, size in self._entries:
+            if at > start - self.window and used + amount <= self.limit:
+                break
+            # 가장 오래된 사용분이 구간을 벗어날 때까지 미룸
+            used -= size
+            start = max(start, at + self.window)
+        self.record(amount, start)
+        return start - now
+
+    def record(self, amount, at):
+        """
+        이미 쓴 양을 기록 (대기 계산 없이)
+        """
+        if self._entries:
+            at = max(at, self._entries[-1][0])
+        self._entries.append((at, amount))
+        self._total += amount
+
+
+class RateLimiter:
+    """
+    RPM + TPM 동시 제한. 429 응답 시 pause()로 모든 호출자를 함께 멈춤.
+
+    Args:
+        rpm: 분당 요청 수
+        tpm: 분당 토큰 수. None이면 토큰 제한 없음 (메일 발송 속도 제한 등)
+        burst: 쉬고 있다가 한 번에 몰아서 보낼 수 있는 최대 요청 수 (기본 GEMINI_BURST).
+               어느 60초 구간이든 최대 rpm + burst - 1건
+    """
+
+    def __init__(self, rpm=GEMINI_RPM, tpm=GEMINI_TPM, burst=None):
+        self._lock = threading.Lock()
+        # 분 단위 한도를 초 단위 rate로 변환
+        self._requests = TokenBucket(rpm / 60.0, max(1, burst or GEMINI_BURST))
+        self._tokens = SlidingWindow(tpm) if tpm else None
+        self._paused_until = 0.0
+
+    def _reserve(self, tokens):
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._requests.reserve(1, now), self._paused_until - now, 0.0)
+            if self._tokens:
+                # 요청 수 / pause로 미뤄진 시각 기준으로 토큰 구간을 예약
+                wait += self._tokens.reserve(tokens, now + wait)
+            return wait
+
+    def acquire(self, tokens=1):
+        """
+        (스레드용) 호출 가능할 때까지 블로킹 대기. 실제로 기다린 시간(초)을 반환
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=1):
+        """
+        (asyncio용) 이벤트 루프를 막지 않고 대기
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """
+        응답의 실제 토큰 사용량이 추정치보다 많으면 차이만큼 TPM 구간에 추가 기록
+        """
+        extra = (actual_tokens or 0) - estimated_tokens
+        if extra > 0 and self._tokens:
+            with self._lock:
+                self._tokens.record(extra, time.monotonic())
+
+    def pause(self, seconds):
+        """
+        할당량 초과(429) 시 모든 호출자를 seconds 동안 멈춤
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def estimate_tokens(text):
+    """
+    토큰 수 대략 추정. 한국어는 글자당 토큰이 많은 편이라 보수적으로 2글자당 1토큰
+    """
+    return max(1, len(text or "") // 2)
+
+
+def backoff_delay(attempt, base=GEMINI_BACKOFF_BASE, cap=GEMINI_BACKOFF_MAX):
+    """
+    지수 backoff + full jitter: 0 ~ min(cap, base * 2^attempt) 사이 임의 값
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _status_code(exc):
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+
+    match = _RETRY_HINT.search(str(exc))
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def classify_error(exc):
+    """
+    예외를 재시도 대상인지 판별.
+
+    Returns:
+        (TRANSIENT | PERMANENT, status_code, retry_after 초 또는 None)
+    """
+    status = _status_code(exc)
+    message = str(exc)
+
+    if status is None:
+        # 상태 코드가 없는 경우: 메시지로 추정, 네트워크 계열 예외는 일시적 오류로 간주
+        match = re.search(r"\b(4\d\d|5\d\d)\b", message)
+        if match:
+            status = int(match.group(1))
+
+    if status is not None:
+        kind = TRANSIENT if status in TRANSIENT_STATUS else PERMANENT
+    elif (
+        isinstance(exc, (ConnectionError, TimeoutError, OSError))
+        or any(name in type(exc).__name__ for name in ("Timeout", "Connect", "Transport"))
+        or "RESOURCE_EXHAUSTED" in message
+    ):
+        kind = TRANSIENT
+    else:
+        kind = PERMANENT
+
+    return kind, status, _retry_after(exc) if kind == TRANSIENT else None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    프로세스 공용 RateLimiter 반환. 동시에 도는 요약 작업들이 같은 할당량을 나눠 씀
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
@@ -1,8 +1,20 @@
 import os
+import queue
 import smtplib
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import make_msgid
+from urllib.parse import quote
 from dotenv import load_dotenv
+from sqlalchemy import insert
+from app import metrics
+from app.database import SessionLocal
+from app.generator import SUBJECT, IssueTemplate
+from app.models import Newsletter, SendLog, Subscriber
+from app.rate_limiter import RateLimiter
 
 # 환경변수 로드
 load_dotenv()
@@ -12,50 +24,368 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
 TEST_RECEIVER = os.getenv("TEST_RECEIVER")
+# SMTP_STARTTLS : 0이면 TLS 없이 평문 SMTP (사내 릴레이 / 로컬 테스트 서버용)
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
 
-def send_newsletter():
-    print("📮 이메일 발송을 준비합니다...")
+# 대량 발송 설정
+# SEND_WORKERS : 동시에 발송하는 워커 수 = 유지할 SMTP 연결 수 (TLS 핸드셰이크는 연결당 1회)
+# SEND_RATE_PER_SEC : 초당 최대 발송 건수 (메일 서버 발송 한도에 맞춰 조정)
+# SEND_PAGE_SIZE : 구독자 테이블을 한 번에 읽어올 건수 (메모리 사용량 제한)
+# SMTP_MAX_MESSAGES_PER_CONNECTION : 연결 하나로 보낼 최대 건수. 넘으면 재연결 (서버의 세션당 제한 대비)
+SEND_WORKERS = int(os.getenv("SEND_WORKERS", 4))
+SEND_RATE_PER_SEC = float(os.getenv("SEND_RATE_PER_SEC", 10))
+SEND_PAGE_SIZE = int(os.getenv("SEND_PAGE_SIZE", 500))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", 100))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 30))
+# 발송 로그(send_logs)를 몇 건씩 모아서 INSERT 할지 (메일마다 commit 하지 않음)
+SEND_LOG_BATCH = int(os.getenv("SEND_LOG_BATCH", 200))
+
+# 수신자별 개인화 값
+# UNSUBSCRIBE_URL_TEMPLATE : 구독 취소 링크. {email} 자리에 수신자 이메일(URL 인코딩)이 들어감
+# DEFAULT_SUBSCRIBER_NAME : 이름이 없는 구독자에게 쓰는 호칭
+UNSUBSCRIBE_URL_TEMPLATE = os.getenv("UNSUBSCRIBE_URL_TEMPLATE", f"mailto:{SMTP_USER or ''}?subject=unsubscribe%20{{email}}")
+DEFAULT_SUBSCRIBER_NAME = os.getenv("DEFAULT_SUBSCRIBER_NAME", "구독자")
+
+# 연결이 끊긴 경우로 보고 재연결 후 한 번 더 시도할 예외들
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class SmtpConnection:
+    """
+    로그인까지 끝난 SMTP 연결 하나. 끊기거나 발송 건수 한도에 도달하면 다시 연결.
+    """
+
+    def __init__(self, server=None, port=None, user=None, password=None, starttls=SMTP_STARTTLS):
+        self.server = server or SMTP_SERVER
+        self.port = port or SMTP_PORT
+        self.user = user or SMTP_USER
+        self.password = password or SMTP_PASSWORD
+        self.starttls = starttls
+        self.smtp = None
+        self.sent_count = 0
+
+    def connect(self):
+        self.close()
+        # 보안 연결 (TLS) + 로그인: 연결당 한 번만 수행
+        smtp = smtplib.SMTP(self.server, self.port, timeout=SMTP_TIMEOUT)
+        if self.starttls:
+            smtp.starttls()
+        if self.user and self.password:
+            smtp.login(self.user, self.password)
+        self.smtp = smtp
+        self.sent_count = 0
+        metrics.inc("smtp_connections_total")
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except Exception:
+                pass
+            self.smtp = None
+
+    def send(self, from_addr, to_addr, message):
+        if self.smtp is None or self.sent_count >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+            self.connect()
+        with metrics.timer("smtp_send"):
+            try:
+                self.smtp.sendmail(from_addr, to_addr, message)
+            except RECONNECT_ERRORS:
+                # 서버가 연결을 끊은 경우: 재연결 후 한 번만 재시도
+                metrics.inc("smtp_reconnects_total")
+                self.connect()
+                self.smtp.sendmail(from_addr, to_addr, message)
+        self.sent_count += 1
+
+
+class SmtpPool:
+    """
+    SMTP 연결 풀. 워커가 연결을 빌려 쓰고 반납 → 수만 건을 보내도 연결(TLS 핸드셰이크)은 size개
+    """
+
+    def __init__(self, size=SEND_WORKERS, factory=SmtpConnection):
+        self._idle = queue.Queue()
+        self._all = []
+        for _ in range(max(1, size)):
+            connection = factory()
+            self._idle.put(connection)
+            self._all.append(connection)
+
+    def send(self, from_addr, to_addr, message):
+        connection = self._idle.get()
+        try:
+            connection.send(from_addr, to_addr, message)
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        for connection in self._all:
+            connection.close()
+
+
+def iter_active_subscriber_pages(db, page_size=SEND_PAGE_SIZE):
+    """
+    활성 구독자를 id 순으로 page_size씩 읽어오는 제너레이터 (keyset 페이지네이션).
+    전체 구독자를 메모리에 올리지 않음.
+
+    Yields:
+        [(id, email, name), ...] 페이지
+    """
+    last_id = 0
+    while True:
+        rows = db.query(Subscriber.id, Subscriber.email, Subscriber.name).filter(
+            Subscriber.is_active.is_(True),
+            Subscriber.id > last_id
+        ).order_by(Subscriber.id).limit(page_size).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def iter_active_subscribers(db, page_size=SEND_PAGE_SIZE):
+    """
+    Yields:
+        (id, email, name)
+    """
+    for rows in iter_active_subscriber_pages(db, page_size):
+        yield from rows
+
+
+def iter_unsent_subscribers(db, newsletter_id, page_size=SEND_PAGE_SIZE):
+    """
+    활성 구독자 중 이 뉴스레터의 SENT 로그가 없는 구독자만 반환 (중단된 발송 이어하기).
+    페이지마다 (newsletter_id, subscriber_id) 인덱스로 IN 조회 1회.
+
+    Yields:
+        (id, email, name)
+    """
+    for rows in iter_active_subscriber_pages(db, page_size):
+        ids = [row.id for row in rows]
+        already_sent = {
+            subscriber_id for (subscriber_id,) in db.query(SendLog.subscriber_id).filter(
+                SendLog.newsletter_id == newsletter_id,
+                SendLog.subscriber_id.in_(ids),
+                SendLog.status == "SENT"
+            ).all()
+        }
+        for row in rows:
+            if row.id not in already_sent:
+                yield row
+
+
+class SendLogWriter:
+    """
+    수신자별 발송 결과를 모아 batch_size건마다 send_logs에 대량 INSERT. 여러 워커 스레드에서 호출 가능
+    """
 
-    # 1. HTML 파일 읽기
-    file_path = "newsletter_preview.html"
-    if not os.path.exists(file_path):
-        print(f"❌ '{file_path}' 파일이 없습니다. app.generator를 먼저 실행하세요.")
-        return
+    def __init__(self, newsletter_id, batch_size=SEND_LOG_BATCH):
+        self.newsletter_id = newsletter_id
+        self.batch_size = batch_size
+        self._rows = []
+        self._lock = threading.Lock()
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
+    def add(self, subscriber_id, status, message_id=None):
+        if subscriber_id is None:
+            return  # 테스트 수신자(TEST_RECEIVER)는 구독자가 아니므로 기록하지 않음
+        with self._lock:
+            self._rows.append({
+                "newsletter_id": self.newsletter_id,
+                "subscriber_id": subscriber_id,
+                "status": status,
+                "message_id": message_id,
+            })
+            if len(self._rows) >= self.batch_size:
+                self._flush_locked()
 
-    # 2. 이메일 객체 생성
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._rows:
+            return
+        db = SessionLocal()
+        try:
+            with metrics.timer("db_write"):
+                db.execute(insert(SendLog), self._rows)
+                db.commit()
+            metrics.inc("db_rows_written_total", len(self._rows), table="send_logs")
+            self._rows = []
+        except Exception as e:
+            # 로그 저장 실패는 발송 자체를 멈추지 않음. 다음 flush 때 다시 시도
+            print(f"  ⚠️ 발송 로그 저장 실패: {e}")
+            db.rollback()
+            metrics.inc("db_write_errors_total", table="send_logs")
+        finally:
+            db.close()
+
+
+def personal_fields(email, name=None):
+    """
+    IssueTemplate.render()에 넘길 수신자별 값
+    """
+    return {
+        "subscriber_name": name or DEFAULT_SUBSCRIBER_NAME,
+        "email": email,
+        "unsubscribe_url": UNSUBSCRIBE_URL_TEMPLATE.format(email=quote(email or "", safe="")),
+    }
+
+
+def build_message(html_content, to_addr, subject=SUBJECT):
+    """
+    Returns:
+        (Message-ID, 메시지 문자열)
+    """
+    # 이메일 객체 생성
     msg = MIMEMultipart("alternative")
-    msg["Subject"] = "📢 [Weekly Fashion] 이번 주 핫 트렌드 뉴스레터"
+    msg["Subject"] = subject
     msg["From"] = SMTP_USER
-    msg["To"] = TEST_RECEIVER
+    msg["To"] = to_addr
+    message_id = make_msgid(domain=(SMTP_USER or "localhost").split("@")[-1])
+    msg["Message-ID"] = message_id
 
-    # 3. 본문 탑재 (HTML)
+    # 본문 탑재 (HTML)
     # plain text 버전도 넣으면 좋지만, 지금은 HTML만 넣습니다.
-    part = MIMEText(html_content, "html")
-    msg.attach(part)
+    msg.attach(MIMEText(html_content, "html"))
+    return message_id, msg.as_string()
+
+
+def send_bulk(html_content, recipients, pool=None, workers=SEND_WORKERS, rate_per_sec=SEND_RATE_PER_SEC,
+              log_writer=None, subject=SUBJECT):
+    """
+    recipients(이터러블)를 흘려보내며 SMTP 연결 풀로 병렬 발송.
+    html_content의 슬롯(이름, 구독 취소 링크 등)은 수신자마다 채워서 보냄 (MJML 재컴파일 없음).
+
+    Args:
+        html_content: 발송용 HTML 골격 (str 또는 IssueTemplate)
+        recipients: (id, email, name) 이터러블. 제너레이터를 넘기면 끝까지 스트리밍
+        pool: SmtpPool (없으면 workers개 연결로 생성)
+        log_writer: SendLogWriter. 주면 수신자별 결과를 send_logs에 기록
+
+    Returns:
+        {"sent": 성공 건수, "failed": 실패 건수}
+    """
+    issue = html_content if isinstance(html_content, IssueTemplate) else IssueTemplate(html_content)
+    owns_pool = pool is None
+    pool = pool or SmtpPool(workers)
+    # 초당 rate_per_sec건, 최대 1초치까지만 몰아서 발송
+    limiter = RateLimiter(rpm=rate_per_sec * 60, tpm=None, burst=max(1, rate_per_sec))
+    result = {"sent": 0, "failed": 0}
+    result_lock = threading.Lock()
+    # 미처리 작업 수 제한: 구독자가 많아도 큐에 쌓이는 메시지는 workers * 4개까지만
+    in_flight = threading.BoundedSemaphore(max(1, workers) * 4)
+
+    def deliver(recipient):
+        subscriber_id, email, name = recipient
+        try:
+            limiter.acquire()
+            with metrics.timer("render_personal"):
+                message_id, message = build_message(issue.render(**personal_fields(email, name)), email, subject)
+            pool.send(SMTP_USER, email, message)
+            metrics.inc("mails_total", status="sent")
+            with result_lock:
+                result["sent"] += 1
+            if log_writer:
+                log_writer.add(subscriber_id, "SENT", message_id)
+        except Exception as e:
+            print(f"  ❌ {email} 발송 실패: {e}")
+            metrics.inc("mails_total", status="failed")
+            with result_lock:
+                result["failed"] += 1
+            if log_writer:
+                log_writer.add(subscriber_id, "FAILED")
+        finally:
+            in_flight.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for recipient in recipients:
+                in_flight.acquire()
+                executor.submit(deliver, recipient)
+    finally:
+        if log_writer:
+            log_writer.flush()
+        if owns_pool:
+            pool.close()
 
+    return result
+
+
+def find_unsent_newsletter(db):
+    """
+    발송이 끝나지 않은(SENT가 아닌) 가장 최근 뉴스레터
+    """
+    return db.query(Newsletter).filter(
+        Newsletter.html_content.isnot(None),
+        Newsletter.status != "SENT"
+    ).order_by(Newsletter.id.desc()).first()
+
+
+def send_newsletter(newsletter_id=None):
+    """
+    뉴스레터 발송. newsletters 테이블에 저장된 호(app.generator.create_issue)를 id로 불러와 발송.
+    이미 SENT 로그가 있는 구독자는 건너뜀 → 중단된 발송은 같은 id로 다시 실행하면 이어서 진행.
+
+    Args:
+        newsletter_id: 발송할 뉴스레터 id. 없으면 아직 발송 완료되지 않은 가장 최근 뉴스레터
+    """
+    print("📮 이메일 발송을 준비합니다...")
+
+    db = SessionLocal()
     try:
-        # 4. SMTP 서버 연결 및 발송
-        print(f"🔗 SMTP 서버({SMTP_SERVER})에 연결 중...")
-        
-        # 보안 연결 (TLS)
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls() 
-        
-        # 로그인
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        
-        # 전송
-        server.sendmail(SMTP_USER, TEST_RECEIVER, msg.as_string())
-        server.quit()
-        
-        print(f"✅ 발송 성공! '{TEST_RECEIVER}' 메일함을 확인해보세요.")
-
-    except Exception as e:
-        print(f"❌ 발송 실패: {e}")
+        # 1. 발송할 호 불러오기
+        if newsletter_id is not None:
+            newsletter = db.get(Newsletter, newsletter_id)
+        else:
+            newsletter = find_unsent_newsletter(db)
+        if newsletter is None or not newsletter.html_content:
+            target = f"#{newsletter_id}" if newsletter_id is not None else "발송할 뉴스레터"
+            print(f"❌ {target}를 찾을 수 없습니다. app.generator를 먼저 실행하세요.")
+            return
+        newsletter_id = newsletter.id
+        if newsletter.status in ("SENDING", "FAILED", "SENT"):
+            print(f"🔁 뉴스레터 #{newsletter_id} 발송을 이어서 진행합니다. (이미 발송된 구독자 제외)")
+
+        html_content = newsletter.html_content
+        newsletter.status = "SENDING"
+        db.commit()
+
+        # 2. 수신자: 활성 구독자 전체 (없으면 테스트 수신자에게만)
+        has_subscribers = db.query(Subscriber.id).filter(Subscriber.is_active.is_(True)).first() is not None
+        if has_subscribers:
+            recipients = iter_unsent_subscribers(db, newsletter_id)
+            print(f"🔗 SMTP 서버({SMTP_SERVER})에 연결 {SEND_WORKERS}개로 구독자 대상 발송 중...")
+        elif TEST_RECEIVER:
+            recipients = [(None, TEST_RECEIVER, None)]
+            print(f"🔗 SMTP 서버({SMTP_SERVER})에 연결 중... (구독자가 없어 테스트 수신자에게 발송)")
+        else:
+            print("❌ 발송 대상이 없습니다. 구독자를 추가하거나 TEST_RECEIVER를 설정하세요.")
+            return
+
+        # 3. 연결 풀로 병렬 발송 + 결과는 send_logs에 배치 기록
+        result = send_bulk(html_content, recipients, log_writer=SendLogWriter(newsletter_id),
+                           subject=newsletter.subject)
+
+        # 실패가 있으면 FAILED로 남겨 두고 같은 id로 다시 실행하면 남은 구독자만 발송
+        newsletter.status = "FAILED" if result["failed"] else "SENT"
+        db.commit()
+    finally:
+        db.close()
+
+    if result["sent"] or not result["failed"]:
+        print(f"✅ 뉴스레터 #{newsletter_id} 발송 성공 {result['sent']}건 / 실패 {result['failed']}건")
+    else:
+        print(f"❌ 발송 실패: {result['failed']}건 모두 실패")
         print("💡 팁: Gmail을 쓴다면 '앱 비밀번호'를 사용했는지 확인하세요.")
+    if result["failed"]:
+        print(f"💡 남은 구독자 재발송: python -m app.sender --resume {newsletter_id}")
+    result["newsletter_id"] = newsletter_id
+    return result
 
 if __name__ == "__main__":
-    send_newsletter()
\ No newline at end of file
+    args = sys.argv[1:]
+    if len(args) == 2 and args[0] in ("--resume", "--id"):
+        send_newsletter(int(args[1]))
+    else:
+        send_newsletter()
@@ -0,0 +1,176 @@
+# app/summary_cache.py
+'''
+AI 요약 결과 캐시.
+
+- 키 : 정규화한 본문 텍스트의 해시 + 프롬프트 버전 + 모델명
+  → 같은 통신사 기사가 다른 네이버 링크로 재게재되어도 한 번만 요약
+- 저장소 : newsletter.db 와 분리된 별도 SQLite 파일 (run.sh의 DB 초기화 후에도 유지)
+- 정리 : TTL 만료 항목 삭제 + 최대 건수 초과 시 오래 안 쓰인 것부터 삭제(LRU)
+- 적중률 : 키의 프롬프트 종류(namespace의 ":" 앞, 예: summary / insight)별로 따로 집계
+'''
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "./summary_cache.db")
+SUMMARY_CACHE_TTL_DAYS = float(os.getenv("SUMMARY_CACHE_TTL_DAYS", 30))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 50000))
+
+# set()이 이 횟수만큼 호출될 때마다 한 번씩 정리 작업 수행
+EVICT_EVERY = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    해시용 본문 정규화: 유니코드 NFC + 공백 압축 + 앞뒤 공백 제거
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class SummaryCache:
+    """
+    스레드 안전한 SQLite 기반 key-value 캐시.
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH, ttl_days=SUMMARY_CACHE_TTL_DAYS,
+                 max_entries=SUMMARY_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_days * 24 * 60 * 60
+        self.max_entries = max_entries
+        self._counts = {}   # 프롬프트 종류 -> {"hits", "misses"}
+        self._sets = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_summary_cache_last_used ON summary_cache (last_used_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(text, namespace, model_name):
+        """
+        namespace: 프롬프트 종류+버전 (예: "summary:v1"). 프롬프트를 바꾸면 버전을 올려 기존 캐시를 무효화
+        """
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{namespace}|{model_name}|{digest}"
+
+    @staticmethod
+    def kind_of(key):
+        """
+        "summary:v1|모델|해시" → "summary"
+        """
+        return key.split("|", 1)[0].split(":", 1)[0]
+
+    def _count(self, key, hit):
+        counts = self._counts.setdefault(self.kind_of(key), {"hits": 0, "misses": 0})
+        counts["hits" if hit else "misses"] += 1
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM summary_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                self._count(key, hit=False)
+                return None
+
+            self._conn.execute(
+                "UPDATE summary_cache SET last_used_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._count(key, hit=True)
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, value, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.commit()
+            self._sets += 1
+            need_evict = self._sets % EVICT_EVERY == 0
+
+        if need_evict:
+            self.evict()
+
+    def evict(self):
+        """
+        TTL 만료 항목 삭제 후, 최대 건수를 넘으면 last_used_at이 오래된 순으로 삭제.
+        """
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM summary_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM summary_cache WHERE key IN (
+                    SELECT key FROM summary_cache
+                    ORDER BY last_used_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def stats(self, kind=None):
+        """
+        Args:
+            kind: 프롬프트 종류 (예: "summary", "insight"). 없으면 전체 합계
+        """
+        with self._lock:
+            if kind is not None:
+                return dict(self._counts.get(kind, {"hits": 0, "misses": 0}))
+            return {
+                "hits": sum(counts["hits"] for counts in self._counts.values()),
+                "misses": sum(counts["misses"] for counts in self._counts.values()),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    프로세스 공용 캐시 인스턴스 반환 (최초 호출 시 파일 오픈).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SummaryCache()
+    return _cache
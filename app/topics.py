@@ -0,0 +1,80 @@
+# app/topics.py
+'''
+오늘의 기사들을 주제(키워드)가 비슷한 것끼리 묶는 가벼운 그룹핑. (외부 라이브러리 없음)
+
+- 제목 + 요약 첫 줄에서 2글자 이상 단어를 뽑고 흔한 조사를 떼어 키워드 집합으로 사용
+- id 순으로 한 건씩, 키워드가 가장 많이 겹치는 기존 그룹에 넣고 없으면 새 그룹 생성
+  → 앞선 기사의 그룹 배정은 뒤에 추가된 기사의 영향을 받지 않음
+    (하루 중 재실행해도 새 기사가 들어간 그룹만 내용이 바뀜 → 그룹 요약 캐시 재사용)
+- 어느 그룹에도 묶이지 않은 기사는 id 구간(max_size개 단위)별 "기타" 그룹에 모음
+  → 기사 하나가 다른 그룹에 합류하거나 새로 들어와도 그 기사가 속한 구간의 기타 그룹만 바뀜
+    (앞에서부터 max_size개씩 자르면 한 건만 빠져도 뒤쪽 그룹 경계가 모두 밀려 캐시를 못 씀)
+'''
+import os
+import re
+
+# INSIGHT_GROUP_SIMILARITY : 그룹 대표 키워드와 겹치는 비율(작은 쪽 기준)이 이 값 이상이면 같은 그룹
+# INSIGHT_GROUP_MAX : 그룹 하나에 넣을 최대 기사 수 (프롬프트 길이 제한)
+INSIGHT_GROUP_SIMILARITY = float(os.getenv("INSIGHT_GROUP_SIMILARITY", 0.34))
+INSIGHT_GROUP_MAX = int(os.getenv("INSIGHT_GROUP_MAX", 25))
+
+_WORD = re.compile(r"[0-9A-Za-z가-힣]{2,}")
+# 단어 끝에 붙는 흔한 조사 (긴 것부터 검사)
+_JOSA = ("에서", "으로", "에게", "까지", "부터", "은", "는", "이", "가", "을", "를", "의", "에", "와", "과", "로", "도", "만")
+_STOPWORDS = {"기자", "뉴스", "속보", "단독", "종합", "오늘", "올해", "지난", "통해", "위해", "대한", "관련"}
+
+
+def keywords(text):
+    """
+    텍스트 → 키워드 집합 (소문자, 조사 제거, 불용어 제외)
+    """
+    result = set()
+    for word in _WORD.findall((text or "").lower()):
+        for josa in _JOSA:
+            if word.endswith(josa) and len(word) - len(josa) >= 2:
+                word = word[: -len(josa)]
+                break
+        if word not in _STOPWORDS:
+            result.add(word)
+    return result
+
+
+def _overlap(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def group_articles(articles, similarity=INSIGHT_GROUP_SIMILARITY, max_size=INSIGHT_GROUP_MAX):
+    """
+    Args:
+        articles: id / title / summary 속성을 가진 객체(Row) 리스트
+
+    Returns:
+        [[article, ...], ...] 그룹 리스트. 각 그룹 안은 id 순, 그룹은 첫 기사 id 순
+    """
+    groups = []  # [(대표 키워드, [article, ...])]
+    for article in sorted(articles, key=lambda a: a.id):
+        first_line = (article.summary or "").split("\n", 1)[0]
+        words = keywords(f"{article.title} {first_line}")
+
+        best, best_score = None, 0.0
+        for seed, members in groups:
+            if len(members) >= max_size:
+                continue
+            score = _overlap(words, seed)
+            if score > best_score:
+                best, best_score = members, score
+        if best is not None and best_score >= similarity:
+            best.append(article)
+        else:
+            groups.append((words, [article]))
+
+    clustered = [members for _, members in groups if len(members) > 1]
+    misc = {}  # id 구간 -> [article, ...]
+    for _, members in groups:
+        if len(members) == 1:
+            misc.setdefault(members[0].id // max_size, []).append(members[0])
+    clustered.extend(misc.values())
+    clustered.sort(key=lambda members: members[0].id)
+    return clustered
@@ -0,0 +1,129 @@
+# app/work_queue.py
+'''
+crawled_articles 의 PENDING 기사를 작업 큐처럼 나눠 가져가는(claim) API.
+
+- claim_articles : PENDING 기사 N건을 한 번의 쿼리로 PROCESSING으로 바꾸고 가져감
+    - SQLite / PostgreSQL : UPDATE ... RETURNING (PostgreSQL은 FOR UPDATE SKIP LOCKED로 다른 워커가 잡은 행은 건너뜀)
+    - RETURNING 미지원 DB : 후보를 읽고 "status가 아직 PENDING인 경우에만" 건별 UPDATE
+  → 여러 프로세서 워커/호스트가 동시에 돌아도 같은 기사를 두 번 요약하지 않음
+- release_articles : 처리하지 못한 기사를 PENDING으로 되돌림 (다음 실행에서 재시도)
+- release_orphan_duplicates : 대표 기사가 APPROVED가 되지 못한 중복 기사를 PENDING으로 되돌림
+- requeue_stale_claims : 워커가 죽어서 PROCESSING에 오래 남은 기사를 PENDING으로 되돌림
+'''
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
+from app.models import CrawledArticle
+
+# CLAIM_BATCH_SIZE : 한 번에 가져갈 기사 수
+# CLAIM_TIMEOUT_MINUTES : 이 시간(분)이 지나도 PROCESSING이면 워커가 죽은 것으로 보고 PENDING으로 되돌림
+CLAIM_BATCH_SIZE = int(os.getenv("CLAIM_BATCH_SIZE", 50))
+CLAIM_TIMEOUT_MINUTES = float(os.getenv("CLAIM_TIMEOUT_MINUTES", 30))
+
+
+def count_pending(db):
+    return db.query(func.count(CrawledArticle.id)).filter(CrawledArticle.status == "PENDING").scalar()
+
+
+def claim_articles(db, limit=CLAIM_BATCH_SIZE):
+    """
+    PENDING 기사를 오래된 순으로 최대 limit건 PROCESSING으로 바꾸고 반환 (commit 포함).
+
+    Returns:
+        [(id, link), ...] 이번 호출에서 이 워커가 가져간 기사
+    """
+    bind = db.get_bind()
+    now = datetime.now()
+    candidates = select(CrawledArticle.id).where(
+        CrawledArticle.status == "PENDING"
+    ).order_by(CrawledArticle.created_at, CrawledArticle.id).limit(limit)
+    if bind.dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    if bind.dialect.update_returning:
+        stmt = update(CrawledArticle).where(
+            CrawledArticle.id.in_(candidates),
+            CrawledArticle.status == "PENDING",
+        ).values(status="PROCESSING", claimed_at=now).returning(CrawledArticle.id, CrawledArticle.link)
+        claimed = [tuple(row) for row in db.execute(stmt, execution_options={"synchronize_session": False})]
+    else:
+        claimed = []
+        for article_id in db.execute(candidates).scalars().all():
+            result = db.execute(
+                update(CrawledArticle).where(
+                    CrawledArticle.id == article_id,
+                    CrawledArticle.status == "PENDING",
+                ).values(status="PROCESSING", claimed_at=now),
+                execution_options={"synchronize_session": False},
+            )
+            if result.rowcount == 1:
+                claimed.append(article_id)
+        if claimed:
+            claimed = [tuple(row) for row in db.query(CrawledArticle.id, CrawledArticle.link).filter(
+                CrawledArticle.id.in_(claimed)
+            ).all()]
+    db.commit()
+    claimed.sort()
+    return claimed
+
+
+def release_articles(db, article_ids):
+    """
+    아직 PROCESSING인 기사를 PENDING으로 되돌림 (처리 완료된 기사는 그대로)
+
+    Returns:
+        되돌린 건수
+    """
+    if not article_ids:
+        return 0
+    count = db.query(CrawledArticle).filter(
+        CrawledArticle.id.in_(list(article_ids)),
+        CrawledArticle.status == "PROCESSING",
+    ).update({"status": "PENDING", "claimed_at": None}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def release_orphan_duplicates(db, article_ids):
+    """
+    이번에 DUPLICATE로 저장한 기사 중 대표 기사가 APPROVED가 아닌 것(다운로드 실패/REJECTED/요약 실패 등)을
+    canonical_id 없이 PENDING으로 되돌림 → 다음 실행에서 다시 중복 검사 (없으면 스스로 대표가 됨)
+
+    중복 판정은 대표 기사를 처리하기 전에 하므로, 대표가 끝내 요약되지 못하면
+    그 기사들은 요약 없는 대표를 가리킨 채 뉴스레터에서 빠지게 됨 → 이를 막기 위함
+
+    Returns:
+        되돌린 건수
+    """
+    if not article_ids:
+        return 0
+    canonical = aliased(CrawledArticle)
+    approved = select(canonical.id).where(canonical.status == "APPROVED")
+    count = db.query(CrawledArticle).filter(
+        CrawledArticle.id.in_(list(article_ids)),
+        CrawledArticle.status == "DUPLICATE",
+        CrawledArticle.canonical_id.notin_(approved),
+    ).update({"status": "PENDING", "canonical_id": None, "claimed_at": None}, synchronize_session=False)
+    db.commit()
+    return count
+
+
+def requeue_stale_claims(db, timeout_minutes=CLAIM_TIMEOUT_MINUTES):
+    """
+    claimed_at이 timeout_minutes보다 오래된 PROCESSING 기사를 PENDING으로 되돌림
+
+    Returns:
+        되돌린 건수
+    """
+    deadline = datetime.now() - timedelta(minutes=timeout_minutes)
+    count = db.query(CrawledArticle).filter(
+        CrawledArticle.status == "PROCESSING",
+        CrawledArticle.claimed_at < deadline,
+    ).update({"status": "PENDING", "claimed_at": None}, synchronize_session=False)
+    db.commit()
+    if count:
+        print(f" 오래 멈춰 있던 PROCESSING 기사 {count}건을 PENDING으로 되돌렸습니다.")
+    return count
@@ -0,0 +1,139 @@
+# benchmarks/bench_db.py
+'''
+DB 동시 쓰기 부하 벤치마크: crawled_articles 상태 업데이트
+
+- 기본 SQLite  : rollback journal + synchronous=FULL (PRAGMA 미적용)
+- 튜닝 SQLite  : WAL + synchronous=NORMAL + busy_timeout + mmap (app/database.py 의 SQLITE_TUNED)
+- (선택) BENCH_DATABASE_URL 로 PostgreSQL 등 다른 DB도 같은 부하로 측정
+
+writer 스레드는 기사 처리 결과를 저장하고, reader 스레드는 발송/생성 단계처럼 요약 완료 기사 수를 계속 조회한다.
+저장 방식은 두 가지를 같은 부하로 비교
+- batch=N : 파이프라인 persist 단계(ArticleWriter)처럼 N건을 id 기준 bulk UPDATE + commit 1회
+            (N 기본값은 WRITE_BATCH_SIZE 기본값과 같은 50)
+- row     : 건별 UPDATE + commit (ArticleWriter 도입 전 방식, 비교 기준)
+
+실행: python -m benchmarks.bench_db [기사 수] [writer 수] [reader 수] [배치 크기]
+'''
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import build_engine
+from app.models import CrawledArticle
+
+
+def seed(engine, count):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    rows = [
+        {"title": f"기사 {i}", "link": f"https://bench.local/article/{i}", "content": "", "status": "PENDING"}
+        for i in range(count)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(CrawledArticle), rows)
+
+
+def run_load(engine, count, writers, readers, batch_size=1):
+    """
+    Args:
+        batch_size: writer가 한 번에 반영할 건수 (1이면 건별 UPDATE + commit)
+
+    Returns:
+        {"updates": 성공 건수, "locked": lock 에러(실패한 commit) 수, "reads": 조회 건수, "seconds": 소요 시간}
+    """
+    Session = sessionmaker(bind=engine, autoflush=False)
+    ids = list(range(1, count + 1))
+    random.Random(0).shuffle(ids)
+    chunks = [ids[i::writers] for i in range(writers)]
+    result = {"updates": 0, "locked": 0, "reads": 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer(chunk):
+        db = Session()
+        try:
+            for start in range(0, len(chunk), batch_size):
+                rows = [
+                    {"id": article_id, "status": "APPROVED", "summary": "요약 " * 20}
+                    for article_id in chunk[start:start + batch_size]
+                ]
+                try:
+                    # app.processor.ArticleWriter와 같은 id 기준 bulk UPDATE (batch_size=1이면 건별)
+                    db.execute(update(CrawledArticle), rows)
+                    db.commit()
+                    with lock:
+                        result["updates"] += len(rows)
+                except OperationalError:
+                    db.rollback()
+                    with lock:
+                        result["locked"] += 1
+        finally:
+            db.close()
+
+    def reader():
+        db = Session()
+        try:
+            while not done.is_set():
+                try:
+                    db.query(func.count(CrawledArticle.id)).filter(CrawledArticle.summary.isnot(None)).scalar()
+                    db.commit()
+                    with lock:
+                        result["reads"] += 1
+                except OperationalError:
+                    db.rollback()
+        finally:
+            db.close()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(chunk,)) for chunk in chunks]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    result["seconds"] = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    batch_size = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+
+    print(f"기사 {count}건, writer {writers}개, reader {readers}개")
+    print(f"{'config':<16} {'write':>8} {'updates':>8} {'locked':>7} {'reads':>8} {'sec':>7} {'upd/s':>8}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configs = [
+            ("sqlite-default", f"sqlite:///{os.path.join(tmp, 'default.db')}", False),
+            ("sqlite-tuned", f"sqlite:///{os.path.join(tmp, 'tuned.db')}", True),
+        ]
+        if os.getenv("BENCH_DATABASE_URL"):
+            configs.append(("server", os.getenv("BENCH_DATABASE_URL"), False))
+
+        for name, url, tuned in configs:
+            for mode, size in ((f"batch={batch_size}", batch_size), ("row", 1)):
+                engine = build_engine(url, sqlite_tuned=tuned)
+                seed(engine, count)
+                result = run_load(engine, count, writers, readers, size)
+                engine.dispose()
+                print(
+                    f"{name:<16} {mode:>8} {result['updates']:>8} {result['locked']:>7} {result['reads']:>8} "
+                    f"{result['seconds']:>7.2f} {result['updates'] / result['seconds']:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
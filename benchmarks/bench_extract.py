@@ -0,0 +1,89 @@
+# benchmarks/bench_extract.py
+'''
+HTML 추출 마이크로 벤치마크: 기존 방식 vs app/extractor.py
+
+- 기존 : BeautifulSoup(html, "html.parser") 전체 파싱 + 셀렉터 순차 시도
+- 신규 : lxml + SoupStrainer 부분 파싱 + 호스트별 셀렉터 캐시
+
+fixtures/ 에 저장된 네이버 리스트/기사 페이지로 측정. 두 방식의 추출 결과가 같은지도 확인.
+
+실행: python -m benchmarks.bench_extract [반복 횟수]
+'''
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+from app.extractor import HAS_LXML, LIST_SELECTORS, Extractor
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+LIST_URL = "https://news.naver.com/breakingnews/section/103/376"
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# -----------------------------------------------------------
+# 기존 구현 (crawler.py / processor.py 변경 전 코드와 동일한 동작)
+# -----------------------------------------------------------
+def legacy_list_items(html):
+    soup = BeautifulSoup(html, "html.parser")
+    for selector in LIST_SELECTORS:
+        news_items = soup.select(selector)
+        if news_items:
+            return selector, news_items
+    return None, []
+
+
+def legacy_body(html):
+    soup = BeautifulSoup(html, "html.parser")
+    content_tag = soup.select_one("#dic_area") or soup.select_one("#newsct_article")
+    if not content_tag:
+        return None
+    for tag in content_tag.select(".img_desc, .byline, .f_share"):
+        tag.decompose()
+    return content_tag.get_text(strip=True)
+
+
+def measure(label, func, number, base=None):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    speedup = f"x{base / seconds:.1f}" if base else ""
+    print(f"  {label:<26} {seconds * 1000:8.2f} ms/op  {speedup}")
+    return seconds
+
+
+def main(number=20):
+    list_html = load_fixture("naver_list.html")
+    article_html = load_fixture("naver_article.html")
+
+    engines = [("html.parser 부분 파싱", Extractor(parser="html.parser", partial=True))]
+    if HAS_LXML:
+        engines.insert(0, ("lxml 부분 파싱 (기본)", Extractor(parser="lxml", partial=True)))
+        engines.append(("lxml 전체 파싱", Extractor(parser="lxml", partial=False)))
+    else:
+        print("⚠️ lxml 미설치: pip install lxml 후 다시 실행하면 lxml 결과도 측정됩니다.")
+
+    # 결과 동일성 확인
+    expected_body = legacy_body(article_html)
+    _, expected_items = legacy_list_items(list_html)
+    for label, engine in engines:
+        _, items = engine.find_list_items(list_html, LIST_URL)
+        assert [str(item) for item in items] == [str(item) for item in expected_items], label
+        assert engine.extract_body(article_html) == expected_body, label
+
+    print(f"[리스트 페이지] {len(list_html) // 1024}KB / 아이템 {len(expected_items)}개")
+    base = measure("기존 (html.parser 전체)", lambda: legacy_list_items(list_html), number)
+    for label, engine in engines:
+        measure(label, lambda: engine.find_list_items(list_html, LIST_URL), number, base)
+
+    print(f"[기사 페이지] {len(article_html) // 1024}KB / 본문 {len(expected_body)}자")
+    base = measure("기존 (html.parser 전체)", lambda: legacy_body(article_html), number)
+    for label, engine in engines:
+        measure(label, lambda: engine.extract_body(article_html), number, base)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,112 @@
+# benchmarks/bench_import.py
+'''
+import 시간 벤치마크 (python -X importtime)
+
+CLI 명령(python -m app.*)과 API 서버 콜드 스타트가 import 단계에서 얼마나 걸리는지 측정.
+모듈마다 새 인터프리터로 여러 번 import해서 중앙값을 보고,
+무거운 선택 의존성(google.genai / bs4 / jinja2 / mjml)이 import 시점에 딸려 오는지도 표시.
+
+- import(ms) : -X importtime 기준 해당 모듈의 누적 import 시간
+- wall(ms)   : 인터프리터 시작부터 종료까지 (python -c "import ...")
+- heavy      : import만 했는데 로딩된 무거운 의존성
+
+실행: python -m benchmarks.bench_import [반복 횟수] [--budget 밀리초]
+    --budget 을 주면 import 시간이 이를 넘는 모듈이 있을 때 종료 코드 1 (CI 회귀 확인용)
+'''
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULES = (
+    "app.main",
+    "app.migrations",
+    "app.crawler",
+    "app.processor",
+    "app.generator",
+    "app.sender",
+    "app.pipeline",
+)
+HEAVY_MODULES = ("google.genai", "bs4", "jinja2", "mjml")
+TOP_IMPORTS = 5
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력("import time: self | cumulative | 모듈명") → [(누적 us, 모듈명), ...]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def measure(module, workdir):
+    """
+    새 인터프리터로 module을 import 1회
+
+    Returns:
+        (import 누적 us, wall 초, importtime 행 리스트)
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{module} import 실패\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    total = next(cumulative for cumulative, name in reversed(rows) if name == module)
+    return total, wall, rows
+
+
+def main(argv):
+    budget_ms = None
+    if "--budget" in argv:
+        position = argv.index("--budget")
+        budget_ms = float(argv[position + 1])
+        argv = argv[:position] + argv[position + 2:]
+    repeat = int(argv[0]) if argv else 5
+
+    print(f"모듈별 {repeat}회 import 중앙값 (새 인터프리터)")
+    print(f"{'module':<16} {'import(ms)':>10} {'wall(ms)':>9}  heavy")
+    over_budget = []
+    heaviest = {}
+    # DB 파일/캐시 파일이 생기지 않도록 빈 임시 디렉터리에서 실행
+    with tempfile.TemporaryDirectory() as workdir:
+        for module in MODULES:
+            imports, walls = [], []
+            for _ in range(repeat):
+                total, wall, rows = measure(module, workdir)
+                imports.append(total)
+                walls.append(wall)
+            loaded = {name for _, name in rows}
+            heavy = [name for name in HEAVY_MODULES if name in loaded]
+            import_ms = statistics.median(imports) / 1000
+            print(f"{module:<16} {import_ms:>10.1f} {statistics.median(walls) * 1000:>9.1f}  {', '.join(heavy) or '-'}")
+            if budget_ms is not None and import_ms > budget_ms:
+                over_budget.append(module)
+            # 외부 최상위 패키지(이름에 .이 없는 것) 중 오래 걸린 것 (마지막 측정 기준)
+            for cumulative, name in rows:
+                if "." not in name and name != "app":
+                    heaviest[name] = max(heaviest.get(name, 0), cumulative)
+
+    print(f"\n가장 오래 걸린 외부 패키지 import (상위 {TOP_IMPORTS})")
+    for name, cumulative in sorted(heaviest.items(), key=lambda item: -item[1])[:TOP_IMPORTS]:
+        print(f"  {name:<24} {cumulative / 1000:>8.1f} ms")
+
+    if over_budget:
+        print(f"\n❌ import 시간 예산 {budget_ms:.0f}ms 초과: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
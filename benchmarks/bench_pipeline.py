@@ -0,0 +1,299 @@
+# benchmarks/bench_pipeline.py
+'''
+파이프라인 단계별 벤치마크: 크롤링 → 요약 → 뉴스레터 생성 → 발송
+
+외부 서비스는 모두 benchmarks/fakes.py 의 로컬 대역으로 바꿔서 측정 (인터넷/API 키 불필요)
+- 뉴스 사이트 : FixtureSite (fixtures/ 의 네이버 페이지를 틀로 기사 N개 생성)
+- Gemini      : FakeGeminiClient (호출당 지연 + 429 주입)
+- SMTP        : SmtpSink (받은 메일은 버림)
+
+규모(N)마다 임시 디렉터리의 새 SQLite DB로 자식 프로세스를 따로 띄워 측정
+(설정값은 import 시점에 읽히고, 최대 RSS도 규모별로 따로 봐야 하므로)
+
+단계별 출력
+- items/s    : 처리 건수 / 소요 시간
+- p50/p99    : 단계 안의 단위 작업 지연 (리스트 페이지, 기사 다운로드, LLM 호출, 메일 1건)
+- llm / 429  : Gemini 호출 수 / 그중 429로 실패한 수
+- rss        : 그 단계까지의 최대 RSS(MB, 프로세스 누적 최댓값)
+
+발송 단계는 구독자 N명에게 BENCH_ISSUE_ARTICLES개 기사짜리 호를 보냄
+(생성 단계의 N개 기사 호를 N명에게 보내면 메일 크기까지 N에 비례해 규모 비교가 안 되므로)
+
+조정: BENCH_LLM_LATENCY(초, 기본 0.05) / BENCH_LLM_429_RATE(기본 0.02) / BENCH_HTTP_LATENCY(초, 기본 0)
+
+실행: python -m benchmarks.bench_pipeline [규모 ...] [--json 결과파일]
+    예) python -m benchmarks.bench_pipeline 100 1000 10000 --json bench.json
+'''
+import contextlib
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fakes import FakeGeminiClient, FixtureSite, SmtpSink
+
+DEFAULT_SCALES = (100, 1000)
+RESULT_MARKER = "BENCH_RESULT "
+BENCH_LLM_LATENCY = float(os.getenv("BENCH_LLM_LATENCY", 0.05))
+BENCH_LLM_429_RATE = float(os.getenv("BENCH_LLM_429_RATE", 0.02))
+BENCH_HTTP_LATENCY = float(os.getenv("BENCH_HTTP_LATENCY", 0))
+BENCH_ISSUE_ARTICLES = int(os.getenv("BENCH_ISSUE_ARTICLES", 20))
+PER_PAGE = 20
+
+
+def child_env(workdir, smtp_port):
+    """
+    자식 프로세스 환경변수: 임시 DB/캐시 + 로컬 대역 + 대기 시간(rate limit, throttle) 최소화
+    """
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "SUMMARY_CACHE_PATH": os.path.join(workdir, "summary_cache.db"),
+        "HTTP_CACHE_ENABLED": "0",
+        "GEMINI_API_KEY": "",
+        "GEMINI_RPM": "1000000",
+        "GEMINI_TPM": "1000000000",
+        "GEMINI_BACKOFF_BASE": "0.05",
+        "GEMINI_BACKOFF_MAX": "0.5",
+        "FETCH_PER_HOST": "16",
+        "FETCH_HOST_INTERVAL": "0",
+        "CRAWL_PAGE_WINDOW": "4",
+        "SMTP_SERVER": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USER": "bench@example.com",
+        "SMTP_PASSWORD": "",
+        "SMTP_STARTTLS": "0",
+        "SEND_WORKERS": "8",
+        "SEND_RATE_PER_SEC": "1000000",
+        "TEST_RECEIVER": "",
+    })
+    return env
+
+
+# -----------------------------------------------------------
+# 부모 프로세스: 대역 서버 기동 + 규모별 자식 실행 + 표 출력
+# -----------------------------------------------------------
+def run_scale(count, smtp):
+    site = FixtureSite(count, per_page=PER_PAGE, latency=BENCH_HTTP_LATENCY).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pipeline", "--child", str(count), site.base_url],
+                cwd=workdir, env={**child_env(workdir, smtp.port), "PYTHONPATH": project_path()},
+                capture_output=True, text=True,
+            )
+    finally:
+        site.stop()
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+            result["http_requests"] = site.requests
+            return result
+    raise RuntimeError(f"규모 {count} 측정 실패 (exit {proc.returncode})\n{proc.stderr[-2000:]}")
+
+
+def project_path():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")]))
+
+
+def print_table(results):
+    print(f"{'N':>6} {'stage':<10} {'items':>6} {'sec':>7} {'items/s':>8} {'p50ms':>7} {'p99ms':>8} "
+          f"{'llm':>5} {'429':>4} {'rssMB':>6}")
+    for result in results:
+        for stage in result["stages"]:
+            print(
+                f"{result['scale']:>6} {stage['stage']:<10} {stage['items']:>6} {stage['seconds']:>7.2f} "
+                f"{stage['items_per_sec']:>8.1f} {stage['p50_ms']:>7.1f} {stage['p99_ms']:>8.1f} "
+                f"{stage['llm_calls']:>5} {stage['llm_429']:>4} {stage['peak_rss_mb']:>6.1f}"
+            )
+
+
+def main(argv):
+    json_path = None
+    if "--json" in argv:
+        position = argv.index("--json")
+        json_path = argv[position + 1]
+        argv = argv[:position] + argv[position + 2:]
+    scales = [int(value) for value in argv] or list(DEFAULT_SCALES)
+
+    print(f"LLM 지연 {BENCH_LLM_LATENCY * 1000:.0f}ms, 429 비율 {BENCH_LLM_429_RATE:.0%}, "
+          f"HTTP 지연 {BENCH_HTTP_LATENCY * 1000:.0f}ms, 발송 호 기사 {BENCH_ISSUE_ARTICLES}개")
+    smtp = SmtpSink().start()
+    results = []
+    try:
+        for count in scales:
+            results.append(run_scale(count, smtp))
+    finally:
+        smtp.stop()
+
+    print_table(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {json_path}")
+
+
+# -----------------------------------------------------------
+# 자식 프로세스: 실제 app 코드로 단계 실행
+# -----------------------------------------------------------
+class Recorder:
+    """
+    함수를 감싸 호출별 소요 시간을 모음 (여러 스레드에서 호출돼도 안전)
+    """
+
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def wrap(self, func):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.samples.append(time.perf_counter() - started)
+        return timed
+
+    def take(self):
+        with self._lock:
+            samples, self.samples = self.samples, []
+        return samples
+
+
+def percentile(samples, ratio):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, math.ceil(ratio * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    # 리눅스 ru_maxrss 단위는 KB (macOS는 byte)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_stage(name, func, items, recorder, fake):
+    """
+    stage 하나를 실행하고 통계 dict 반환. items는 실행 후 처리 건수를 돌려주는 함수
+    """
+    recorder.take()
+    before = fake.stats()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        func()
+    seconds = time.perf_counter() - started
+    after = fake.stats()
+    samples = recorder.take()
+    count = items()
+    return {
+        "stage": name,
+        "items": count,
+        "seconds": round(seconds, 3),
+        "items_per_sec": round(count / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+        "llm_calls": after["calls"] - before["calls"],
+        "llm_429": after["rate_limited"] - before["rate_limited"],
+        "llm_tokens": after["tokens"] - before["tokens"],
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def child(count, base_url):
+    from sqlalchemy import func, insert
+
+    from app import ai_utils, crawler, pipeline, processor
+    from app.database import SessionLocal
+    from app.generator import compile_issue, create_issue
+    from app.migrations import run_migrations
+    from app.models import CrawledArticle, Newsletter, SendLog, Subscriber
+    from app.queries import iter_today_summarized, summarized_filters, today_start
+    from app.sender import SmtpConnection, send_newsletter
+
+    run_migrations()
+    fake = FakeGeminiClient(latency=BENCH_LLM_LATENCY, rate_limit_rate=BENCH_LLM_429_RATE)
+    ai_utils.client = fake
+
+    # 단계별 단위 작업 지연 측정: 모듈 전역 함수를 감싸면 호출하는 쪽 코드는 그대로
+    list_pages, downloads, llm_calls, mails = Recorder(), Recorder(), Recorder(), Recorder()
+    crawler.fetch_list_page = list_pages.wrap(crawler.fetch_list_page)
+    pipeline.download_article = downloads.wrap(pipeline.download_article)
+    fake.models.generate_content = llm_calls.wrap(fake.models.generate_content)
+    SmtpConnection.send = mails.wrap(SmtpConnection.send)
+
+    def count_rows(*filters, model=CrawledArticle):
+        db = SessionLocal()
+        try:
+            return db.query(func.count(model.id)).filter(*filters).scalar()
+        finally:
+            db.close()
+
+    def crawl():
+        crawler.crawl_fashion_breaking_news(
+            sections=[base_url + "/list?page={page}"], max_pages=count // PER_PAGE + 2,
+        )
+
+    def prepare_send():
+        # 구독자 N명 + 기사 BENCH_ISSUE_ARTICLES개짜리 발송용 호
+        db = SessionLocal()
+        try:
+            db.execute(insert(Subscriber), [
+                {"email": f"reader{index}@bench.local", "name": f"독자{index}", "is_active": True}
+                for index in range(count)
+            ])
+            articles = []
+            for row in iter_today_summarized(db):
+                articles.append(row)
+                if len(articles) >= BENCH_ISSUE_ARTICLES:
+                    break
+            newsletter = Newsletter(subject="bench", html_content=compile_issue(articles, "벤치마크 인사이트"))
+            db.add(newsletter)
+            db.commit()
+            return newsletter.id
+        finally:
+            db.close()
+
+    stages = [run_stage(
+        "crawl", crawl, lambda: count_rows(), list_pages, fake,
+    )]
+    stages.append(run_stage(
+        "process", processor.process_articles,
+        lambda: count_rows(CrawledArticle.status.in_(("APPROVED", "DUPLICATE"))), downloads, fake,
+    ))
+    # 생성 단계의 단위 작업은 호 1개뿐이라 지연 분포 대신 전체 시간만 의미 있음
+    stages.append(run_stage(
+        "generate", create_issue, lambda: count_rows(*summarized_filters(today_start())),
+        Recorder(), fake,
+    ))
+    stages[-1]["note"] = "items = 호에 담긴 기사 수"
+    llm_samples = llm_calls.take()
+
+    newsletter_id = prepare_send()
+    stages.append(run_stage(
+        "send", lambda: send_newsletter(newsletter_id),
+        lambda: count_rows(SendLog.status == "SENT", model=SendLog), mails, fake,
+    ))
+
+    print(RESULT_MARKER + json.dumps({
+        "scale": count,
+        "llm_latency": BENCH_LLM_LATENCY,
+        "llm_429_rate": BENCH_LLM_429_RATE,
+        "llm_p50_ms": round(percentile(llm_samples, 0.50) * 1000, 2),
+        "llm_p99_ms": round(percentile(llm_samples, 0.99) * 1000, 2),
+        "stages": stages,
+    }, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(int(sys.argv[2]), sys.argv[3])
+    else:
+        main(sys.argv[1:])
@@ -0,0 +1,307 @@
+# benchmarks/fakes.py
+'''
+벤치마크용 외부 서비스 대역 (네트워크 밖으로 나가지 않음)
+
+- FixtureSite    : fixtures/ 의 네이버 리스트/기사 페이지를 틀로 삼아 기사 N개짜리 가짜 뉴스 사이트를 로컬 HTTP로 제공
+- FakeGeminiClient : ai_utils.client 자리에 끼우는 가짜 Gemini. 응답 지연 / 429 주입 / 호출·토큰 수 집계
+- SmtpSink       : 받은 메일을 버리기만 하는 로컬 SMTP 서버 (STARTTLS 없음 → SMTP_STARTTLS=0 으로 사용)
+'''
+import json
+import os
+import random
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+# -----------------------------------------------------------
+# 1. 가짜 뉴스 사이트
+# -----------------------------------------------------------
+class FixtureSite:
+    """
+    /list?page=N   : 기사 per_page개짜리 리스트 페이지 (기사 수를 넘으면 빈 리스트)
+    /article/ID    : 기사 페이지 (기사마다 본문/제목이 달라 중복 기사로 묶이지 않음)
+
+    Args:
+        article_count: 사이트 전체 기사 수
+        latency: 응답마다 추가할 지연(초)
+    """
+
+    def __init__(self, article_count, per_page=20, latency=0.0, seed=0):
+        self.article_count = article_count
+        self.per_page = per_page
+        self.latency = latency
+        self.seed = seed
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self.base_url = None
+
+        list_html = load_fixture("naver_list.html")
+        start = list_html.index("<ul class=\"sa_list\">") + len("<ul class=\"sa_list\">")
+        end = list_html.index("</ul>", start)
+        first_item = re.search(r"<li class=\"sa_item.*?</li>", list_html[start:end], re.S).group(0)
+        self._list_head, self._list_tail = list_html[:start], list_html[end:]
+        article_id = re.search(r"/article/\d+/(\d+)", first_item).group(1)
+        item = first_item.replace("https://n.news.naver.com", "{base}").replace(article_id, "{id}")
+        item = re.sub(r"(<strong class=\"sa_text_strong\">).*?(</strong>)", r"\1{title}\2", item, flags=re.S)
+        item = re.sub(r"(<div class=\"sa_text_lede\">).*?(</div>)", r"\1{lede}\2", item, flags=re.S)
+        self._item_template = item.replace("{", "{{").replace("}", "}}") \
+            .replace("{{base}}", "{base}").replace("{{id}}", "{id}") \
+            .replace("{{title}}", "{title}").replace("{{lede}}", "{lede}")
+
+        article_html = load_fixture("naver_article.html")
+        body_start = article_html.index(">", article_html.index("<article id=\"dic_area\"")) + 1
+        body_end = article_html.index("<div class=\"byline\">", body_start)
+        self._article_head, self._article_tail = article_html[:body_start], article_html[body_end:]
+        # fixture 단어만으로는 어휘가 작아 무작위 기사끼리도 중복으로 묶이므로 임의 음절 단어를 섞음
+        words = set(re.findall(r"[가-힣A-Za-z]{2,}", re.sub(r"<[^>]+>", " ", article_html[body_start:body_end])))
+        rng = random.Random(seed)
+        words.update("".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3))) for _ in range(2000))
+        self._words = sorted(words)
+
+    def _text(self, article_id, salt, words):
+        rng = random.Random(f"{self.seed}:{article_id}:{salt}")
+        return " ".join(rng.choice(self._words) for _ in range(words))
+
+    def list_page(self, page):
+        first = (page - 1) * self.per_page
+        ids = range(first, min(first + self.per_page, self.article_count))
+        items = [
+            self._item_template.format(
+                base=self.base_url, id=1000000000 + article_id,
+                title=f"{self._text(article_id, 'title', 6)} {article_id}",
+                lede=self._text(article_id, "lede", 20),
+            )
+            for article_id in ids
+        ]
+        return self._list_head + "\n".join(items) + self._list_tail
+
+    def article_page(self, article_id):
+        lines = [f"{self._text(article_id, line, 25)}.<br><br>" for line in range(12)]
+        return self._article_head + "\n".join(lines) + self._article_tail
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                url = urlparse(self.path)
+                if url.path == "/list":
+                    body = site.list_page(int(parse_qs(url.query).get("page", ["1"])[0]))
+                elif "/article/" in url.path:
+                    body = site.article_page(int(url.path.rsplit("/", 1)[-1]) - 1000000000)
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def list_url(self):
+        return self.base_url + "/list?page={page}"
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+# -----------------------------------------------------------
+# 2. 가짜 Gemini 클라이언트
+# -----------------------------------------------------------
+class FakeRateLimitError(Exception):
+    """
+    Gemini 429 응답 흉내. rate_limiter.classify_error가 status 429 + retry 힌트로 인식
+    """
+
+    def __init__(self, retry_after):
+        super().__init__(f"429 RESOURCE_EXHAUSTED. Please retry in {retry_after}s.")
+        self.code = 429
+
+
+class _Part:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Content:
+    def __init__(self, text):
+        self.parts = [_Part(text)]
+
+
+class _Candidate:
+    def __init__(self, text):
+        self.content = _Content(text)
+
+
+class _Usage:
+    def __init__(self, total):
+        self.total_token_count = total
+
+
+class _Response:
+    def __init__(self, text, tokens):
+        self.text = text
+        self.candidates = [_Candidate(text)]
+        self.usage_metadata = _Usage(tokens)
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        return self._owner._generate(contents)
+
+
+class FakeGeminiClient:
+    """
+    Args:
+        latency: 호출당 평균 지연(초). ±jitter 비율만큼 흔들림
+        rate_limit_rate: 호출이 429로 실패할 확률 (0~1)
+        retry_after: 429 응답에 실어 보낼 재시도 대기 시간(초)
+    """
+
+    def __init__(self, latency=0.05, jitter=0.3, rate_limit_rate=0.0, retry_after=0.05, seed=0):
+        self.models = _FakeModels(self)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.calls = 0
+        self.rate_limited = 0
+        self.tokens = 0
+        self.latencies = []
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _generate(self, contents):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter))
+            limited = self._rng.random() < self.rate_limit_rate
+            if limited:
+                self.rate_limited += 1
+        started = time.perf_counter()
+        time.sleep(delay)
+        if limited:
+            raise FakeRateLimitError(self.retry_after)
+
+        ids = [int(value) for value in re.findall(r"\[기사 (\d+)\]", contents)]
+        if ids:
+            text = json.dumps(
+                [{"id": value, "summary": f"📌 요약 {value}-1\n📈 요약 {value}-2\n💡 요약 {value}-3"} for value in ids],
+                ensure_ascii=False,
+            )
+        else:
+            text = "📌 가짜 응답 1\n📈 가짜 응답 2\n💡 가짜 응답 3"
+
+        tokens = len(contents) // 2 + len(text) // 2
+        with self._lock:
+            self.tokens += tokens
+            self.latencies.append(time.perf_counter() - started)
+        return _Response(text, tokens)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "rate_limited": self.rate_limited, "tokens": self.tokens}
+
+
+# -----------------------------------------------------------
+# 3. SMTP 싱크
+# -----------------------------------------------------------
+class SmtpSink:
+    """
+    EHLO/MAIL/RCPT/DATA/QUIT만 처리하고 본문은 버리는 로컬 SMTP 서버. 연결/메시지/바이트 수 집계
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self.port = None
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode("ascii") + b"\r\n")
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                self.reply("220 bench-sink ESMTP")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode("ascii", "replace").strip().upper()
+                    if command.startswith(("EHLO", "HELO")):
+                        self.reply("250-bench-sink")
+                        self.reply("250 8BITMIME")
+                    elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                        self.reply("250 OK")
+                    elif command == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        size = 0
+                        for data_line in self.rfile:
+                            if data_line in (b".\r\n", b".\n"):
+                                break
+                            size += len(data_line)
+                        with sink._lock:
+                            sink.messages += 1
+                            sink.bytes += size
+                        self.reply("250 OK queued")
+                    elif command == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Command not implemented")
+
+        return Handler
+
+    def start(self):
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
@@ -1,17 +1,13 @@
 #!/bin/bash
 echo "🗑️  DB 초기화..."
-rm -f newsletter.db
+rm -f newsletter.db newsletter.db-wal newsletter.db-shm
 
-echo "🕷️  뉴스 크롤링 중..."
-python -m app.crawler
+# 테이블/인덱스 생성 (스키마 준비는 실행마다가 아니라 DB를 새로 만들 때 한 번)
+python -m app.migrations
 
-echo "🧠  AI 요약 및 분석 중..."
-python -m app.processor
+# 크롤링 → 본문 수집 → AI 요약 → HTML 생성 → 이메일 발송을 한 프로세스에서 실행
+# (단계별로 따로 돌리려면 python -m app.crawler / app.processor / app.generator / app.sender)
+echo "🚀  뉴스레터 파이프라인 실행 중..."
+python -m app.pipeline
 
-echo "🎨  HTML 생성 중..."
-python -m app.generator
-
-echo "📮  이메일 발송 중..."
-python -m app.sender
-
-echo "✨  모든 작업 완료!"
\ No newline at end of file
+echo "✨  모든 작업 완료!"
@@ -0,0 +1,92 @@
+# tests/conftest.py
+'''
+테스트 공용 설정
+
+- 설정값은 app 모듈 import 시점에 읽히므로, 임시 디렉터리의 DB/캐시 경로를 먼저 환경변수로 지정
+- 외부 서비스 대신 로컬 HTTP 서버(article_site)를 사용. Gemini 키는 비워 둠 (AI 호출이 필요한 테스트는 대역 사용)
+
+실행: python -m pytest
+'''
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+WORKDIR = tempfile.mkdtemp(prefix="newsletter-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORKDIR, 'test.db')}",
+    "SUMMARY_CACHE_PATH": os.path.join(WORKDIR, "summary_cache.db"),
+    "METRICS_REPORT_PATH": os.path.join(WORKDIR, "run_report.json"),
+    "HTTP_CACHE_ENABLED": "0",
+    "HTTP_RETRIES": "0",
+    "FETCH_HOST_INTERVAL": "0",
+    "GEMINI_API_KEY": "",
+    "API_COUNT_CACHE_TTL": "0",
+    "API_LIST_CACHE_TTL": "0",
+})
+
+from app.database import SessionLocal  # noqa: E402  (환경변수 지정 후 import)
+from app.migrations import run_migrations  # noqa: E402
+from app.database import Base  # noqa: E402
+import app.models  # noqa: E402,F401  (테이블 등록)
+
+run_migrations()
+
+
+@pytest.fixture
+def db():
+    """
+    빈 테이블로 시작하는 세션 (테스트가 끝나면 모든 행 삭제)
+    """
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+        session.commit()
+        session.close()
+
+
+class ArticleSite:
+    """
+    경로별 (상태 코드, HTML)을 돌려주는 로컬 HTTP 서버. pages에 넣은 값이 바로 반영됨
+    """
+
+    def __init__(self):
+        self.pages = {}
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = site.pages.get(self.path, (404, "<html>not found</html>"))
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return self.base_url + path
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def article_site():
+    site = ArticleSite()
+    yield site
+    site.stop()
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from app import ai_utils
+from app.ai_utils import _parse_batch_response, generate_batch_summaries
+
+
+def _body(index):
+    return f"기사 {index}의 본문입니다. " * 5
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """
+    배치 호출에는 batch_response를, 개별 호출에는 "개별 요약 N"을 돌려주는 대역. 호출 프롬프트를 기록
+    """
+    calls = {"batch": [], "single": [], "batch_response": ""}
+
+    def fake_generate(prompt, config=None, **kwargs):
+        if config is not None:
+            calls["batch"].append(prompt)
+            return calls["batch_response"]
+        calls["single"].append(prompt)
+        return f"개별 요약 {len(calls['single'])}"
+
+    monkeypatch.setattr(ai_utils, "generate_with_retry", fake_generate)
+    return calls
+
+
+def test_parse_accepts_code_fence_and_line_lists():
+    raw = '```json\n[{"id": 0, "summary": "첫 줄\\n둘째 줄"}, {"id": 1, "summary": ["가", " ", "나"]}]\n```'
+    assert _parse_batch_response(raw) == {0: "첫 줄\n둘째 줄", 1: "가\n나"}
+
+
+def test_parse_skips_malformed_entries():
+    raw = json.dumps([
+        {"id": 0, "summary": "정상"},
+        {"id": "1", "summary": "id가 문자열"},
+        {"id": 2, "summary": "   "},
+        {"id": 3},
+        "문자열 항목",
+    ])
+    assert _parse_batch_response(raw) == {0: "정상"}
+
+
+@pytest.mark.parametrize("raw", ["", "요약을 만들 수 없습니다", '{"id": 0, "summary": "배열 아님"}', "[{"])
+def test_parse_garbled_response_is_empty(raw):
+    assert _parse_batch_response(raw) == {}
+
+
+def test_well_formed_batch_needs_no_fallback(fake_gemini):
+    texts = [_body(f"정상{index}") for index in range(3)]
+    fake_gemini["batch_response"] = json.dumps([{"id": index, "summary": f"배치 요약 {index}"} for index in range(3)])
+
+    assert generate_batch_summaries(texts) == ["배치 요약 0", "배치 요약 1", "배치 요약 2"]
+    assert len(fake_gemini["batch"]) == 1
+    assert fake_gemini["single"] == []
+
+
+def test_partial_batch_falls_back_only_for_missing_items(fake_gemini):
+    texts = [_body(f"부분{index}") for index in range(4)]
+    # 1번은 빠지고, 3번은 요약이 비어 있고, 없는 7번이 섞여 있음
+    fake_gemini["batch_response"] = json.dumps([
+        {"id": 0, "summary": "배치 요약 0"},
+        {"id": 2, "summary": "배치 요약 2"},
+        {"id": 3, "summary": ""},
+        {"id": 7, "summary": "엉뚱한 번호"},
+    ])
+
+    summaries = generate_batch_summaries(texts)
+
+    assert summaries[0] == "배치 요약 0"
+    assert summaries[2] == "배치 요약 2"
+    assert summaries[1].startswith("개별 요약") and summaries[3].startswith("개별 요약")
+    assert len(fake_gemini["single"]) == 2
+    assert texts[1][:100] in fake_gemini["single"][0]
+    assert texts[3][:100] in fake_gemini["single"][1]
+
+
+def test_garbled_batch_falls_back_for_every_item(fake_gemini):
+    texts = [_body(f"깨짐{index}") for index in range(3)]
+    fake_gemini["batch_response"] = "죄송합니다. JSON을 만들 수 없습니다."
+
+    summaries = generate_batch_summaries(texts)
+
+    assert all(summary.startswith("개별 요약") for summary in summaries)
+    assert len(fake_gemini["single"]) == 3
+
+
+def test_cached_and_short_texts_skip_the_batch(fake_gemini):
+    cached = _body("캐시됨")
+    ai_utils.get_cache().set(ai_utils._summary_cache_key(cached), "캐시 요약")
+    fake_gemini["batch_response"] = json.dumps([{"id": 2, "summary": "배치 요약"}])
+
+    summaries = generate_batch_summaries([cached, "짧음", _body("새 기사"), _body("새 기사2")])
+
+    assert summaries[:2] == ["캐시 요약", ai_utils.SHORT_TEXT_MESSAGE]
+    assert summaries[2] == "배치 요약"
+    # 캐시/짧은 본문은 배치 프롬프트에 들어가지 않음
+    assert cached[:50] not in fake_gemini["batch"][0]
+    assert len(fake_gemini["single"]) == 1
@@ -0,0 +1,54 @@
+# tests/test_api.py
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from app.main import app
+from app.models import CrawledArticle
+
+
+def get(path, **kwargs):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get(path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def test_articles_lists_only_approved_articles(db):
+    now = datetime.now()
+    db.add_all([
+        CrawledArticle(title="요약 완료", link="https://n.example/1", summary="3줄 요약", status="APPROVED", created_at=now),
+        # 크롤링 때 저장한 리드 문장이 summary에 있지만 아직 요약 전
+        CrawledArticle(title="대기 중", link="https://n.example/2", summary="리드 문장", status="PENDING", created_at=now),
+        CrawledArticle(title="본문 없음", link="https://n.example/3", summary="리드 문장", status="REJECTED", created_at=now),
+    ])
+    db.commit()
+
+    response = get("/articles")
+
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["요약 완료"]
+
+
+def test_articles_keyset_pages_and_not_modified(db):
+    now = datetime.now()
+    db.add_all([
+        CrawledArticle(title=f"기사 {index}", link=f"https://n.example/{index}", summary="요약",
+                       status="APPROVED", created_at=now)
+        for index in range(5)
+    ])
+    db.commit()
+
+    titles, cursor = [], None
+    while True:
+        page = get("/articles", params={"limit": 2, **({"cursor": cursor} if cursor else {})}).json()
+        titles += [item["title"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(titles) == [f"기사 {index}" for index in range(5)]
+
+    first = get("/articles")
+    assert get("/articles", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
@@ -0,0 +1,65 @@
+from app import crawler
+from app.crawler import RunLinks, crawl_section, save_new_articles
+from app.models import CrawledArticle
+
+
+def _item(path, title):
+    return (
+        f'<li class="sa_item"><a href="{path}"><strong class="sa_text_title">{title}</strong></a>'
+        f'<div class="sa_text_lede">{title} 리드</div></li>'
+    )
+
+
+def _list_page(*items):
+    return 200, f'<html><body><ul class="sa_list_news">{"".join(items)}</ul></body></html>'
+
+
+def _candidate(link, title):
+    return {"link": link, "title": title, "summary": ""}
+
+
+def test_links_inserted_by_someone_else_are_not_counted_as_new(db, monkeypatch):
+    db.add(CrawledArticle(title="먼저 저장된 기사", link="https://example.com/1", status="PENDING"))
+    db.commit()
+    # 조회와 INSERT 사이에 다른 섹션이 먼저 넣은 상황 (조회 결과에는 없음)
+    monkeypatch.setattr(crawler, "find_existing_links", lambda db, links: set())
+
+    new_rows = save_new_articles(db, [
+        _candidate("https://example.com/1", "먼저 저장된 기사"),
+        _candidate("https://example.com/2", "새 기사"),
+    ])
+    db.commit()
+
+    assert [row["link"] for row in new_rows] == ["https://example.com/2"]
+    assert db.query(CrawledArticle).count() == 2
+
+
+def test_page_and_item_failures_are_counted_separately(db, article_site):
+    article_site.pages["/list?page=1"] = _list_page(
+        _item(article_site.url("/article/1"), "첫 기사"),
+        '<li class="sa_item"><span>링크 없는 아이템</span></li>',
+    )
+    article_site.pages["/list?page=2"] = (500, "<html>error</html>")
+
+    stats = crawl_section(article_site.url("/list?page={page}"), max_pages=3, page_window=1)
+
+    assert stats["new"] == 1
+    assert stats["failed_items"] == 1
+    assert stats["failed_pages"] == 1
+
+
+def test_links_saved_by_another_section_in_this_run_do_not_stop_paging(db, article_site):
+    shared = article_site.url("/article/shared")
+    article_site.pages["/a?page=1"] = _list_page(_item(shared, "두 섹션에 걸린 기사"))
+    article_site.pages["/b?page=1"] = _list_page(
+        _item(shared, "두 섹션에 걸린 기사"), _item(article_site.url("/article/b1"), "B 섹션 기사"),
+    )
+    article_site.pages["/b?page=2"] = _list_page(_item(article_site.url("/article/b2"), "B 섹션 다음 페이지"))
+    run_links = RunLinks()
+
+    crawl_section(article_site.url("/a?page={page}"), max_pages=1, page_window=1, run_links=run_links)
+    stats = crawl_section(article_site.url("/b?page={page}"), max_pages=2, page_window=1, run_links=run_links)
+
+    assert stats["new"] == 2
+    assert stats["duplicate"] == 1
+    assert stats["pages"] == 2
@@ -0,0 +1,86 @@
+from app.dedup import DEDUP_MAX_DISTANCE, Deduplicator, SimHashIndex, simhash, text_fingerprint
+from app.models import CrawledArticle
+from app.processor import process_articles
+
+BODY = (
+    "명품 브랜드 샤넬이 서울 성수동에서 가을 겨울 컬렉션을 선보이는 팝업스토어를 연다. "
+    "이번 행사에서는 새로운 트위드 재킷과 가방 라인이 처음 공개되며, 방문객을 위한 체험 공간과 전시도 마련된다. "
+    "업계에서는 최근 성수동이 패션 브랜드들의 팝업 명소로 떠오르면서 주요 명품 브랜드의 행사가 잇따르고 있다고 분석했다. "
+    "팝업스토어는 오는 20일까지 운영된다."
+)
+OTHER_BODY = (
+    "화장품 업계가 3분기 실적을 발표했다. 중국 면세 채널 매출이 줄면서 주요 기업의 영업이익이 감소했고, "
+    "업계는 북미와 일본 시장 확대로 돌파구를 찾고 있다. 증권가에서는 4분기에도 당분간 부진이 이어질 것으로 내다봤다. "
+    "다만 인디 브랜드 중심의 수출은 호조를 보이고 있다."
+)
+
+
+def _distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _flip(fingerprint, bits):
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_lightly_edited_copy_is_near_duplicate():
+    original = simhash(BODY)
+    assert _distance(original, simhash(BODY.replace("샤넬이", "샤넬은"))) <= DEDUP_MAX_DISTANCE
+    assert _distance(original, simhash(BODY + " (종합)")) <= DEDUP_MAX_DISTANCE
+    assert _distance(original, simhash(OTHER_BODY)) > DEDUP_MAX_DISTANCE
+    assert simhash("짧은 제목") is None
+
+
+def test_band_index_finds_items_within_max_distance_only():
+    index = SimHashIndex(max_distance=3)
+    base = simhash(BODY)
+    assert index.find_or_add(1, base) is None
+
+    # 다른 비트가 여러 밴드에 흩어져 있어도 한 밴드는 그대로 → 후보로 찾음
+    assert index.find(_flip(base, (0, 20, 40))) == 1
+    assert index.find(_flip(base, (0, 20, 40, 60))) is None
+    assert index.find_or_add(2, _flip(base, (1, 2))) == 1
+    assert index.find_or_add(3, simhash(OTHER_BODY)) is None
+    assert index.find(simhash(OTHER_BODY)) == 3
+
+
+def test_duplicate_points_at_the_first_article():
+    dedup = Deduplicator()
+    assert dedup.check_body(10, BODY)[0] is None
+    assert dedup.check_body(11, BODY.replace("샤넬이", "샤넬은"))[0] == 10
+    assert dedup.check_body(12, OTHER_BODY)[0] is None
+    assert dedup.duplicates == 1
+
+
+def test_only_approved_canonicals_are_loaded(db):
+    title, lede = "샤넬 성수동 가을 겨울 컬렉션 팝업스토어 개최", "오는 20일까지 운영"
+    for status, canonical_id in (("APPROVED", None), ("REJECTED", None), ("PENDING", None), ("APPROVED", 1)):
+        db.add(CrawledArticle(title=title, link=f"https://example.com/{status}-{canonical_id}", summary=lede,
+                              status=status, canonical_id=canonical_id, simhash=text_fingerprint(title, lede)))
+    db.commit()
+    approved_id = db.query(CrawledArticle.id).filter(
+        CrawledArticle.status == "APPROVED", CrawledArticle.canonical_id.is_(None)
+    ).scalar()
+
+    dedup = Deduplicator().load(db)
+
+    assert dedup.check_title(999, title, lede) == approved_id
+
+
+def test_duplicate_of_approved_canonical_stays_grouped(db):
+    title = "패션 브랜드 가을 겨울 컬렉션 서울 패션위크에서 공개"
+    lede = f"{title} 리드 문장입니다."
+    canonical = CrawledArticle(title=title, link="https://example.com/1", summary="요약",
+                               status="APPROVED", simhash=text_fingerprint(title, lede))
+    duplicate = CrawledArticle(title=title, link="https://example.com/2", summary=lede, status="PENDING")
+    db.add_all([canonical, duplicate])
+    db.commit()
+
+    process_articles()
+
+    db.expire_all()
+    duplicate = db.get(CrawledArticle, duplicate.id)
+    assert duplicate.status == "DUPLICATE"
+    assert duplicate.canonical_id == canonical.id
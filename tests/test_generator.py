@@ -0,0 +1,34 @@
+import types
+
+from app import generator
+from app.generator import create_issue
+from app.models import CrawledArticle, Newsletter
+
+
+def test_issue_streams_articles_into_the_template(db, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # 미리보기 파일 위치
+    for index in range(3):
+        db.add(CrawledArticle(title=f"기사 {index}", link=f"https://example.com/{index}",
+                              summary=f"요약 {index}", status="APPROVED"))
+    db.commit()
+
+    received = []
+    compile_issue = generator.compile_issue
+
+    def spy(articles, insight, today_date=None):
+        received.append(articles)
+        return compile_issue(articles, insight, today_date)
+
+    monkeypatch.setattr(generator, "compile_issue", spy)
+
+    newsletter_id = create_issue()
+
+    # 기사 목록을 리스트로 모으지 않고 제너레이터로 넘김
+    assert isinstance(received[0], types.GeneratorType)
+    newsletter = db.get(Newsletter, newsletter_id)
+    assert [item.article.title for item in sorted(newsletter.items, key=lambda i: i.sort_order)] == [
+        "기사 2", "기사 1", "기사 0",
+    ]
+    assert all(f"기사 {index}" in newsletter.html_content for index in range(3))
+    # 내용이 같으면 지문으로 기존 호 재사용
+    assert create_issue() == newsletter_id
@@ -0,0 +1,93 @@
+import pytest
+import requests
+
+from app import http_client
+from app.http_cache import HttpCache
+
+URL = "https://news.example.com/article/1"
+
+
+def _response(status, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response.url = URL
+    return response
+
+
+class StubSession:
+    """
+    미리 넣어 둔 응답을 순서대로 돌려주고, 요청 헤더를 기록하는 Session 대역
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = HttpCache(path=str(tmp_path / "http_cache.db"))
+    monkeypatch.setattr(http_client, "get_http_cache", lambda: cache)
+    yield cache
+    cache.close()
+
+
+def _use(monkeypatch, session):
+    monkeypatch.setattr(http_client, "get_session", lambda: session)
+
+
+def test_not_modified_reuses_cached_body_and_sends_validators(cache, monkeypatch):
+    validators = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Oct 2025 00:00:00 GMT", "Content-Type": "text/html"}
+    session = StubSession(_response(200, b"<html>v1</html>", validators), _response(304))
+    _use(monkeypatch, session)
+
+    first = http_client.get(URL)
+    second = http_client.get(URL)
+
+    assert first.from_cache is False
+    assert session.sent_headers[0] == {}
+    assert session.sent_headers[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Wed, 01 Oct 2025 00:00:00 GMT",
+    }
+    assert second.status_code == 200
+    assert second.from_cache is True
+    assert second.content == b"<html>v1</html>"
+    assert second.headers["Content-Type"] == "text/html"
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_changed_page_replaces_cache_entry(cache, monkeypatch):
+    session = StubSession(
+        _response(200, b"<html>v1</html>", {"ETag": '"v1"'}),
+        _response(200, b"<html>v2</html>", {"ETag": '"v2"'}),
+        _response(304),
+    )
+    _use(monkeypatch, session)
+
+    http_client.get(URL)
+    updated = http_client.get(URL)
+    reused = http_client.get(URL)
+
+    assert updated.content == b"<html>v2</html>"
+    assert cache.lookup(URL) == ({"ETag": '"v2"'}, b"<html>v2</html>")
+    # 새 검증자로 조건부 요청 → 304면 새 본문 사용
+    assert session.sent_headers[2] == {"If-None-Match": '"v2"'}
+    assert reused.content == b"<html>v2</html>"
+
+
+def test_response_without_validators_is_not_cached(cache, monkeypatch):
+    session = StubSession(_response(200, b"<html>no etag</html>"), _response(200, b"<html>again</html>"))
+    _use(monkeypatch, session)
+
+    http_client.get(URL)
+    http_client.get(URL)
+
+    assert cache.lookup(URL) is None
+    assert session.sent_headers[1] == {}
@@ -0,0 +1,46 @@
+# tests/test_jobs.py
+import asyncio
+
+from app import jobs
+from app.main import _job_event_stream
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def collect_events(job):
+    async def run():
+        return [chunk async for chunk in _job_event_stream(job, ConnectedRequest(), 0)]
+
+    return [
+        line[len("event: "):]
+        for chunk in asyncio.run(run())
+        for line in chunk.splitlines()
+        if line.startswith("event: ")
+    ]
+
+
+def test_finished_job_sets_status_and_terminal_event_together(monkeypatch):
+    monkeypatch.setattr(jobs, "_run_job", lambda job: {"ok": True})
+    manager = jobs.JobManager(workers=1)
+    job = manager.submit("crawl")
+    manager.shutdown(wait=True)
+
+    assert job.status == "SUCCEEDED"
+    assert job.events[-1]["type"] == "succeeded"
+    assert collect_events(job)[-2:] == ["succeeded", "progress"]
+
+
+def test_failed_job_stream_ends_with_failed_event(monkeypatch):
+    def boom(job):
+        raise RuntimeError("크롤링 실패")
+
+    monkeypatch.setattr(jobs, "_run_job", boom)
+    manager = jobs.JobManager(workers=1)
+    job = manager.submit("crawl")
+    manager.shutdown(wait=True)
+
+    assert job.as_dict()["error"] == "크롤링 실패"
+    assert "failed" in collect_events(job)
@@ -0,0 +1,57 @@
+# tests/test_processor.py
+import time
+
+from app.models import CrawledArticle
+from app.processor import ArticleWriter, process_articles
+
+
+def add_article(db, link, title):
+    article = CrawledArticle(title=title, link=link, summary=f"{title} 리드 문장입니다.", status="PENDING")
+    db.add(article)
+    db.commit()
+    return article.id
+
+
+def test_server_error_page_is_retried_not_rejected(db, article_site):
+    # 재시도를 모두 써도 503이면 에러 페이지를 본문으로 보지 않고 다음 실행에서 다시 시도
+    article_site.pages["/article/1"] = (503, "<html><body>Service Unavailable</body></html>")
+    article_id = add_article(db, article_site.url("/article/1"), "명품 브랜드 가을 컬렉션 공개 행사 개최")
+
+    process_articles()
+
+    db.expire_all()
+    article = db.get(CrawledArticle, article_id)
+    assert article.status == "PENDING"
+    assert article.claimed_at is None
+
+
+def test_duplicates_of_unapproved_canonical_go_back_to_pending(db, article_site):
+    # 대표 기사(먼저 처리된 기사)가 본문이 없어 REJECTED → 같은 기사로 묶였던 중복 기사는 다시 처리 대상
+    title = "패션 브랜드 가을 겨울 컬렉션 서울 패션위크에서 공개"
+    article_site.pages["/article/1"] = (200, "<html><body><p>본문 컨테이너 없음</p></body></html>")
+    canonical_id = add_article(db, article_site.url("/article/1"), title)
+    duplicate_id = add_article(db, article_site.url("/article/2"), title)
+
+    process_articles()
+
+    db.expire_all()
+    assert db.get(CrawledArticle, canonical_id).status == "REJECTED"
+    duplicate = db.get(CrawledArticle, duplicate_id)
+    assert duplicate.status == "PENDING"
+    assert duplicate.canonical_id is None
+
+
+def test_writer_flushes_buffered_rows_while_idle(db):
+    article_id = add_article(db, "https://example.com/a", "가을 컬렉션 공개")
+    writer = ArticleWriter(batch_size=50, flush_seconds=0.1)
+    writer.add(article_id, "APPROVED", summary="요약")
+
+    # 더 이상 add()가 없어도 타이머가 반영
+    deadline = time.monotonic() + 5
+    while writer.written == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    writer.close()
+
+    assert writer.written == 1
+    db.expire_all()
+    assert db.get(CrawledArticle, article_id).status == "APPROVED"
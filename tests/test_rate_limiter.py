@@ -0,0 +1,54 @@
+from app import rate_limiter
+from app.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _send_times(limiter, clock, count, tokens=1):
+    """
+    count개 호출이 모두 같은 시각에 들어왔을 때 각각 실제로 보내지는 시각
+    """
+    return [clock.now + limiter._reserve(tokens) for _ in range(count)]
+
+
+def test_requests_stay_within_rpm_in_any_minute(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    limiter = RateLimiter(rpm=15, tpm=None)
+
+    times = _send_times(limiter, clock, 40)
+    assert sum(1 for at in times if at < clock.now + 60) == 15
+
+    # 한참 쉬었다가 다시 몰려와도 1분에 RPM까지만
+    clock.now = times[-1] + 600
+    times = _send_times(limiter, clock, 40)
+    assert sum(1 for at in times if at < clock.now + 60) == 15
+
+
+def test_tokens_stay_within_tpm_in_any_minute(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    limiter = RateLimiter(rpm=6000, tpm=1000)
+
+    for _ in range(2):
+        start = clock.now
+        times = _send_times(limiter, clock, 10, tokens=300)
+        assert sum(1 for at in times if at < start + 60) == 3
+        assert sum(1 for at in times if at < start + 120) == 6
+        clock.now = times[-1] + 600
+
+
+def test_settle_counts_extra_tokens(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    limiter = RateLimiter(rpm=6000, tpm=1000)
+
+    assert limiter._reserve(100) == 0
+    limiter.settle(100, 950)
+    assert limiter._reserve(100) >= 59
@@ -0,0 +1,18 @@
+# tests/test_summary_cache.py
+from app.summary_cache import SummaryCache
+
+
+def test_hit_rates_are_counted_per_prompt_kind(tmp_path):
+    cache = SummaryCache(path=str(tmp_path / "cache.db"))
+    summary_key = cache.make_key("기사 본문", "summary:v1", "model")
+    group_key = cache.make_key("그룹 프롬프트", "insight:v1:group", "model")
+
+    cache.set(summary_key, "요약")
+    cache.get(summary_key)
+    cache.get(group_key)
+    cache.get(group_key)
+
+    assert cache.stats("summary") == {"hits": 1, "misses": 0}
+    assert cache.stats("insight") == {"hits": 0, "misses": 2}
+    assert cache.stats() == {"hits": 1, "misses": 2}
+    cache.close()
@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+
+from app import ai_utils
+from app.topics import group_articles
+
+
+def _article(article_id, title):
+    return SimpleNamespace(id=article_id, title=title, summary="")
+
+
+def _map_reduce(articles, prompts):
+    groups = group_articles(articles, max_size=5)
+    ai_utils.generate_map_reduce_insight([[(a.title, a.summary) for a in group] for group in groups], workers=1)
+    return [prompt for prompt in prompts if "같은 주제로 묶인" in prompt]
+
+
+def test_rerun_with_one_more_article_reuses_unchanged_group_summaries(monkeypatch):
+    prompts = []
+
+    def fake_generate(prompt, **kwargs):
+        prompts.append(prompt)
+        return f"요약 {len(prompts)}"
+
+    monkeypatch.setattr(ai_utils, "generate_with_retry", fake_generate)
+    # 서로 겹치는 키워드가 없는 기사 23건 → 전부 기타 그룹
+    articles = [_article(i, f"topicz{i}x labelz{i}x") for i in range(1, 24)]
+
+    first = _map_reduce(articles, prompts)
+    assert len(first) == 5
+
+    # 새 기사가 #2와 같은 주제 → #2는 기타에서 빠져 새 그룹을 만듦
+    prompts.clear()
+    second = _map_reduce(articles + [_article(100, "topicz2x labelz2x 후속")], prompts)
+
+    # #2가 있던 기타 그룹과 새 그룹만 다시 요청, 나머지 기타 그룹은 캐시 재사용
+    assert len(second) == 2
+    assert any("topicz2x labelz2x 후속" in prompt for prompt in second)
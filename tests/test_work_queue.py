@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.database import SessionLocal
+from app.models import CrawledArticle
+from app.work_queue import (
+    claim_articles,
+    release_articles,
+    release_orphan_duplicates,
+    requeue_stale_claims,
+)
+
+
+def add_pending(db, count):
+    articles = [
+        CrawledArticle(title=f"기사 {index}", link=f"https://example.com/{index}", status="PENDING")
+        for index in range(count)
+    ]
+    db.add_all(articles)
+    db.commit()
+    return [article.id for article in articles]
+
+
+def claim_all(limit, results, start):
+    session = SessionLocal()
+    try:
+        start.wait()
+        while True:
+            claimed = claim_articles(session, limit=limit)
+            if not claimed:
+                return
+            results.extend(article_id for article_id, _ in claimed)
+    finally:
+        session.close()
+
+
+def test_concurrent_claimers_never_get_the_same_article(db):
+    ids = add_pending(db, 60)
+    start = threading.Event()
+    results = [[], []]
+    workers = [threading.Thread(target=claim_all, args=(7, result, start)) for result in results]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join()
+
+    assert not set(results[0]) & set(results[1])
+    assert sorted(results[0] + results[1]) == ids
+    db.expire_all()
+    assert {article.status for article in db.query(CrawledArticle)} == {"PROCESSING"}
+
+
+def test_released_articles_can_be_claimed_again(db):
+    add_pending(db, 3)
+    first = claim_articles(db, limit=3)
+    assert claim_articles(db, limit=3) == []
+
+    done_id = first[0][0]
+    db.query(CrawledArticle).filter(CrawledArticle.id == done_id).update({"status": "APPROVED"})
+    db.commit()
+    released = release_articles(db, [article_id for article_id, _ in first])
+
+    # 처리 완료된 기사는 그대로 두고 나머지만 되돌림
+    assert released == 2
+    assert [article_id for article_id, _ in claim_articles(db, limit=3)] == [
+        article_id for article_id, _ in first[1:]
+    ]
+
+
+def test_orphaned_duplicates_can_be_claimed_again(db):
+    canonical_id, approved_id, duplicate_id, kept_id = add_pending(db, 4)
+    claimed = [article_id for article_id, _ in claim_articles(db, limit=4)]
+    db.query(CrawledArticle).filter(CrawledArticle.id == canonical_id).update({"status": "REJECTED"})
+    db.query(CrawledArticle).filter(CrawledArticle.id == approved_id).update({"status": "APPROVED"})
+    db.query(CrawledArticle).filter(CrawledArticle.id == duplicate_id).update(
+        {"status": "DUPLICATE", "canonical_id": canonical_id})
+    db.query(CrawledArticle).filter(CrawledArticle.id == kept_id).update(
+        {"status": "DUPLICATE", "canonical_id": approved_id})
+    db.commit()
+
+    assert release_orphan_duplicates(db, claimed) == 1
+    assert claim_articles(db) == [(duplicate_id, "https://example.com/2")]
+    db.expire_all()
+    assert db.get(CrawledArticle, duplicate_id).canonical_id is None
+    assert db.get(CrawledArticle, kept_id).status == "DUPLICATE"
+
+
+def test_stale_claims_are_requeued(db):
+    stale_id, fresh_id = add_pending(db, 2)
+    claim_articles(db, limit=2)
+    db.query(CrawledArticle).filter(CrawledArticle.id == stale_id).update(
+        {"claimed_at": datetime.now() - timedelta(hours=2)})
+    db.commit()
+
+    assert requeue_stale_claims(db, timeout_minutes=30) == 1
+    assert [article_id for article_id, _ in claim_articles(db)] == [stale_id]